@@ -1,58 +1,768 @@
-import random
+import copy
+import logging
+import time
+import numpy as np
 import pandas as pd
-from autogluon.tabular import TabularPredictor
+
+from api.batching import Concurrency, MicroBatcher
+from api.distilled import load_distilled
+from api.fast_inference import UnsupportedModelError, compile_predictor, load_exported
+from api.features import load_encoder
+from api.instrumentation import NULL_RECORDER, frame_nbytes
+from api.sequence import DECODE_ALPHABET, EncodedSequence, as_encoded, interval_mask, merge_intervals
+from api.variants import ReferenceScores, ZoneScores
+
+logger = logging.getLogger(__name__)
+
+# Second stage: the pairwise model (training/train_models.py) that separates each zone from the
+# zone it is most often confused with. Its class labels are the two zone names.
+PAIRWISE_MODELS = {"ei": "ei-ie", "ie": "ie-ei", "ze": "ze-ez", "ez": "ze-ez"}
+
+class Checkpoint:
+    """
+    Yielded by iter_evaluate(work_unit=...) after every work unit. 'cells' is the work done
+    since the previous checkpoint: windows scored x window width, summed over the zones.
+    """
+    __slots__ = ("cells",)
+
+    def __init__(self, cells):
+        self.cells = cells
 
 class GeneticZoneEvaluator:
-    def __init__(self, model_paths):
+    def __init__(self, model_paths=None, predictors=None, compile_models=False, exported_paths=None,
+                 distilled_paths=None, feature_encoders=None, persist_models=False, progress=None,
+                 cascade_stride=25, cascade_candidates=5, cascade_margin=0.1,
+                 batch_max_windows=0, batch_max_wait=0.002, pairwise_paths=None, pairwise=None,
+                 pairwise_threshold=0.5):
         """
         Constructor.
 
         :param model_paths: Dictionary with keys 'ei', 'ie', 'ze', 'ez'.
                             The value for each key is a list of strings, each string
                             is a path to a saved AutoGluon model.
+        :param predictors: Optional dictionary with the same keys whose values are already
+                           loaded predictors (or lists of them). Any object exposing
+                           predict_proba(df, as_pandas=True) like TabularPredictor works,
+                           which lets benchmarks run with small stand-in models.
+        :param compile_models: If True, every AutoGluon predictor loaded from model_paths is
+                               compiled to the fast path (api.fast_inference). Zones whose
+                               model type is unsupported keep using predict_proba.
+        :param exported_paths: Optional dictionary zone -> directory written by
+                               training/export_models.py. These zones are served by the
+                               exported LightGBM models only, without loading AutoGluon.
+        :param distilled_paths: Optional dictionary zone -> directory written by
+                                training/distill_models.py. These zones (ZE/EZ) are served by
+                                the distilled position weight matrix (api.distilled).
+        :param feature_encoders: Optional dictionary zone -> FeatureEncoder (api.features) for
+                                 predictors passed in 'predictors'. Predictors loaded from
+                                 model_paths use the encoder saved with them, if any.
+        :param persist_models: If True, the best model (and its ancestors) of every AutoGluon
+                               predictor served through predict_proba is persisted in memory, so
+                               predictions never load model artifacts from disk.
+        :param progress: Optional callable progress(zone, state) told when a zone starts
+                         'loading', is 'loaded', and (in warm_up) is 'warming' and 'ready'.
+        :param cascade_stride: Offset step of the coarse pass of the ZE/EZ cascade scan
+        :param cascade_candidates: In 'top_n' mode, the cascade refines the best
+                                   cascade_candidates * max_predictions coarse windows
+        :param cascade_margin: Coarse windows scoring at least (threshold - cascade_margin) are
+                               refined by the cascade
+        :param batch_max_windows: If > 0, model calls of fewer windows made by concurrent
+                                  evaluations are coalesced into one call of up to this many
+                                  windows per zone (api.batching). 0 disables micro-batching.
+        :param batch_max_wait: Longest time in seconds a batched call waits for calls of other
+                               evaluations
+        :param pairwise_paths: Optional dictionary 'ze-ez' / 'ei-ie' / 'ie-ei' -> path of the
+                               pairwise AutoGluon model, used by the second stage
+                               (evaluate(second_stage=True))
+        :param pairwise: Optional dictionary with the same keys whose values are already loaded
+                         pairwise predictors (predict_proba columns named after the zones)
+        :param pairwise_threshold: The second stage keeps a hit when the pairwise model gives its
+                                   zone at least this probability
         """
+        self.cascade_stride = cascade_stride
+        self.cascade_candidates = cascade_candidates
+        self.cascade_margin = cascade_margin
+        self.batch_max_windows = batch_max_windows
+        self.batch_max_wait = batch_max_wait
+        self.batchers = {}  # Dictionary: zone -> MicroBatcher, created on first use
+        self.concurrency = Concurrency()  # Evaluations in progress, for the batchers
         self.predictor = {}  # Dictionary: zone -> list of TabularPredictor objects
-        for zone, paths in model_paths.items():
-            if not isinstance(paths, list):
-                paths = [paths]
-            self.predictor[zone] = [TabularPredictor.load(path, require_py_version_match=False) for path in paths]
+        self.encoders = dict(feature_encoders or {})  # Dictionary: zone -> FeatureEncoder
+        self.load_report = {}  # Dictionary: zone -> load/persist/warm-up measurements
+        self.progress = progress or (lambda zone, state: None)
+        self.pairwise = dict(pairwise or {})  # Dictionary: pairwise name -> predictor
+        self.pairwise_encoders = {}  # Dictionary: pairwise name -> FeatureEncoder
+        self.pairwise_compiled = {}  # Dictionary: pairwise name -> (CompiledPredictor, class labels)
+        self.pairwise_threshold = pairwise_threshold
+        if model_paths:
+            # Imported here so that the evaluator can be used with stand-in predictors
+            # on machines where AutoGluon is not installed.
+            from autogluon.tabular import TabularPredictor
 
-    def _predict(self, zone, window_strings, method="top_n", max_predictions=10, threshold=0.5):
+            for zone, paths in model_paths.items():
+                if not isinstance(paths, list):
+                    paths = [paths]
+                self.progress(zone, "loading")
+                start = time.perf_counter()
+                self.predictor[zone] = [TabularPredictor.load(path, require_py_version_match=False) for path in paths]
+                self.load_report[zone] = {"load_seconds": time.perf_counter() - start}
+                encoder = load_encoder(paths[0])
+                if encoder is not None:
+                    self.encoders[zone] = encoder
+                    logger.info(f"Zone {zone}: '{encoder.spec()}' features.")
+        for zone, loaded in (predictors or {}).items():
+            self.predictor[zone] = loaded if isinstance(loaded, list) else [loaded]
+
+        self.compiled = {}  # Dictionary: zone -> CompiledPredictor for zones on the fast path
+        if compile_models and model_paths:
+            for zone in model_paths:
+                try:
+                    self.compiled[zone] = compile_predictor(self.predictor[zone][0])
+                    logger.info(f"Zone {zone}: compiled fast-path inference ({len(self.compiled[zone].members)} boosters).")
+                except UnsupportedModelError as e:
+                    logger.info(f"Zone {zone}: fast path unavailable, using predict_proba ({e}).")
+        if persist_models and model_paths:
+            for zone in model_paths:
+                if zone not in self.compiled:
+                    self._persist(zone)
+        for zone in model_paths or {}:
+            self.progress(zone, "loaded")
+        for zone, path in (exported_paths or {}).items():
+            self.progress(zone, "loading")
+            start = time.perf_counter()
+            self.compiled[zone] = load_exported(path)
+            self.predictor[zone] = [self.compiled[zone]]
+            self.load_report[zone] = {"load_seconds": time.perf_counter() - start}
+            logger.info(f"Zone {zone}: loaded exported model from {path}.")
+            self.progress(zone, "loaded")
+        for zone, path in (distilled_paths or {}).items():
+            self.progress(zone, "loading")
+            start = time.perf_counter()
+            self.compiled[zone] = load_distilled(path)
+            self.predictor[zone] = [self.compiled[zone]]
+            self.load_report[zone] = {"load_seconds": time.perf_counter() - start}
+            logger.info(f"Zone {zone}: loaded distilled model from {path}.")
+            self.progress(zone, "loaded")
+        if pairwise_paths:
+            from autogluon.tabular import TabularPredictor
+
+            for name, path in pairwise_paths.items():
+                # A pairwise model that fails to load disables the second stage of its zones
+                # (missing_pairwise) without taking the zone models down with it.
+                self.progress(name, "loading")
+                start = time.perf_counter()
+                try:
+                    self.pairwise[name] = TabularPredictor.load(path, require_py_version_match=False)
+                    encoder = load_encoder(path)
+                    if encoder is not None:
+                        self.pairwise_encoders[name] = encoder
+                    elif compile_models:
+                        # Hits are scored in small calls, where AutoGluon's per-call preprocessing
+                        # costs far more than the boosters themselves.
+                        try:
+                            compiled = compile_predictor(self.pairwise[name])
+                            labels = list(self.pairwise[name].class_labels)
+                            self.pairwise_compiled[name] = (compiled, labels)
+                            logger.info(f"Pairwise model {name}: compiled fast-path inference ({len(compiled.members)} boosters).")
+                        except UnsupportedModelError as e:
+                            logger.info(f"Pairwise model {name}: fast path unavailable, using predict_proba ({e}).")
+                    if persist_models and name not in self.pairwise_compiled:
+                        self.pairwise[name].persist(models="best", with_ancestors=True, max_memory=None)
+                    self.load_report[name] = {"load_seconds": time.perf_counter() - start}
+                    logger.info(f"Pairwise model {name}: loaded from {path}.")
+                    self.progress(name, "loaded")
+                except Exception as e:
+                    self.pairwise.pop(name, None)
+                    self.pairwise_encoders.pop(name, None)
+                    self.pairwise_compiled.pop(name, None)
+                    self.load_report[name] = {"error": str(e)}
+                    logger.error(f"Pairwise model {name}: failed to load from {path}, the second stage is unavailable for its zones. Error: {e}", exc_info=True)
+                    self.progress(name, "failed")
+
+    def missing_pairwise(self):
         """
-        Predicts the labels for multiple window strings using all predictors for the specified zone.
-        Instead of passing a single "sequence" column, this method transforms each window_str into
-        individual columns: B1, B2, ..., B{n}, where n = len(window_str).
-        Returns a list of booleans indicating if the predictions meet the criteria.
-        
-        :param window_strings: List of window strings to predict
-        :param method: Prediction method to use ('top_n' or 'percentage')
-        :param max_predictions: Number of top predictions to return when method is 'top_n'
-        :param threshold: Probability threshold when method is 'percentage'
-        :return: List of boolean predictions
+        :return: Loaded zones without a loaded pairwise model, whose hits the second stage
+                 would leave unchanged
         """
-        if not window_strings:
-            return []
-            
-        # Transform all window strings into a DataFrame with each character in separate columns
-        data = {}
-        for i in range(len(window_strings[0])):
-            data[f"B{i+1}"] = [window[i] for window in window_strings]
-        df = pd.DataFrame(data)
-        
-        # Get predictions from all models
-        preds = self.predictor[zone][0].predict_proba(df, as_pandas=True)
-        
-        if method == "top_n":
-            all_predictions = (
-                    (preds["true"].rank(method="first", ascending=False) <= max_predictions) &
-                    (preds["true"] >= threshold)
-            ).to_list()
-        else:  # percentage method
-            all_predictions = (preds["true"] >= threshold).to_list()
+        return [zone for zone in self.predictor if PAIRWISE_MODELS.get(zone) not in self.pairwise]
+
+    def _persist(self, zone):
+        """
+        Keeps the served model of an AutoGluon predictor in memory. By default AutoGluon loads
+        model artifacts from disk inside predict_proba, which puts disk I/O and unpickling in
+        request latency.
+        """
+        predictor = self.predictor[zone][0]
+        start = time.perf_counter()
+        names = predictor.persist(models="best", with_ancestors=True, max_memory=None)
+        models = predictor._trainer.models
+        persisted_bytes = sum(
+            models[name].get_memory_size(allow_exception=True) or 0 for name in names if not isinstance(models[name], str)
+        )
+        self.load_report[zone].update(
+            persist_seconds=time.perf_counter() - start,
+            persisted_models=len(names),
+            persisted_bytes=persisted_bytes,
+        )
+        logger.info(
+            f"Zone {zone}: loaded in {self.load_report[zone]['load_seconds']:.2f}s, persisted {len(names)} models "
+            f"({persisted_bytes / 2**20:.1f} MiB) in {self.load_report[zone]['persist_seconds']:.2f}s."
+        )
+
+    def warm_up(self, windows=512, seed=0):
+        """
+        Scores every zone twice on a random sequence, so that lazy loading, first-call
+        allocations and thread-pool start-up happen before the first request rather than in it.
+
+        :param windows: Number of sliding windows of the warm-up sequence
+        :return: The load report, with first_call_seconds and second_call_seconds per zone
+        """
+        codes = np.random.default_rng(seed).integers(0, 4, size=windows + 549, dtype=np.uint8)
+        strand = EncodedSequence(codes).forward
+        for zone in ("ei", "ie", "ze", "ez"):
+            if zone not in self.predictor:
+                continue
+            self.progress(zone, "warming")
+            seconds = []
+            for _ in range(2):
+                start = time.perf_counter()
+                for _ in self._iter_zone(zone, [strand], "percentage", threshold=0.5):
+                    pass
+                seconds.append(time.perf_counter() - start)
+            self.load_report.setdefault(zone, {}).update(first_call_seconds=seconds[0], second_call_seconds=seconds[1])
+            logger.info(f"Zone {zone}: warm-up call took {seconds[0]:.3f}s, the next one {seconds[1]:.3f}s.")
+            self.progress(zone, "ready")
+        for name in self.pairwise:
+            self.progress(name, "warming")
+            width = self._enumerator(name[:2])(strand)[2]  # Geometry of the first zone of the pair
+            sample = strand.windows(np.arange(min(windows, len(strand) - width + 1)), width)
+            seconds = []
+            for _ in range(2):
+                start = time.perf_counter()
+                self._pairwise_proba(name, sample)
+                seconds.append(time.perf_counter() - start)
+            self.load_report.setdefault(name, {}).update(first_call_seconds=seconds[0], second_call_seconds=seconds[1])
+            self.progress(name, "ready")
+        return self.load_report
+
+    def with_zones(self, other):
+        """
+        A new evaluator serving the zones of 'other' and every other zone of this one, used to
+        reload some zones without reloading the rest. The untouched zones share their loaded,
+        warmed-up models with this evaluator, which keeps serving unchanged.
+
+        Runtime state stays with this evaluator: the merged one shares its Concurrency and the
+        batchers of the untouched zones. The batchers 'other' created while warming up count
+        'other's evaluations, so they are closed, and the reloaded zones get new batchers on
+        first use. The batchers this evaluator keeps for the reloaded zones are closed with
+        close_batchers once it has drained.
+
+        :param other: GeneticZoneEvaluator holding the newly loaded zones
+        :return: GeneticZoneEvaluator
+        """
+        merged = copy.copy(self)
+        for attribute in ("predictor", "compiled", "encoders"):
+            kept = {zone: value for zone, value in getattr(self, attribute).items() if zone not in other.predictor}
+            setattr(merged, attribute, {**kept, **getattr(other, attribute)})
+        # Pairwise models 'other' loaded replace these; the others (not reloaded, or failed to
+        # reload) keep serving, with their load report.
+        for attribute in ("pairwise", "pairwise_encoders", "pairwise_compiled"):
+            kept = {name: value for name, value in getattr(self, attribute).items() if name not in other.pairwise}
+            setattr(merged, attribute, {**kept, **getattr(other, attribute)})
+        merged.load_report = {
+            **{key: report for key, report in self.load_report.items() if key not in other.predictor},
+            **{key: report for key, report in other.load_report.items() if key in other.predictor or key not in merged.pairwise or key in other.pairwise},
+        }
+        merged.batchers = {zone: batcher for zone, batcher in self.batchers.items() if zone not in other.predictor}
+        other.close_batchers()
+        return merged
+
+    def close_batchers(self, zones=None):
+        """
+        Stops the micro-batcher threads of the given zones (all by default). Calls made through
+        them afterwards run the model directly.
+        """
+        for zone, batcher in list(self.batchers.items()):
+            if zones is None or zone in zones:
+                batcher.close()
+
+    def _feature_kind(self, zone, contiguous):
+        """
+        The input representation a zone's model reads. Zones with the same kind can share the
+        representation when they score the same windows (see _score_group).
+
+        :return: 'segments' (distilled scorer on contiguous starts), 'windows' (compiled or
+                 distilled model on uint8 windows), 'encoder:<spec>' (encoded features) or
+                 'frame' (B1..Bn DataFrame for predict_proba)
+        """
+        compiled = self.compiled.get(zone)
+        if compiled is not None:
+            return "segments" if contiguous and hasattr(compiled, "scan_true_proba") else "windows"
+        encoder = self.encoders.get(zone)
+        if encoder is not None:
+            return f"encoder:{encoder.spec()}"
+        return "frame"
+
+    def _score_group(self, zones, parts, width, recorder=NULL_RECORDER):
+        """
+        Scores the same windows with the predictor of every zone in 'zones' and returns the
+        probability of the 'true' class for each window and zone. The windows of every part are
+        scored in a single model call per zone, so scanning both strands pays the per-call
+        overhead once.
+
+        Each input representation is built once and handed to every zone that reads it:
+        - 'windows': the uint8 code windows, fed straight into compiled models;
+        - 'frame': instead of passing a single "sequence" column, each window is transformed
+          into individual columns B1, B2, ..., B{width} for predict_proba;
+        - 'encoder:<spec>': the features of the zone's encoder (api.features). Contiguous starts
+          (sliding scan, stream tiles) use the encoder's incremental scan of the strand segment;
+        - 'segments': a distilled scorer scores contiguous starts from the strand segment
+          directly, and no window is gathered at all.
+        The 'frame' stage is recorded under the first zone that needs the representation.
 
+        :param zones: Zone names whose models score these windows
+        :param parts: List of (StrandView, starts) pairs; the windows are
+                      strand[start : start + width] for every start
+        :param width: Window width
+        :param recorder: StageRecorder collecting per-stage timings (no-op by default)
+        :return: Dictionary zone -> pandas Series of probabilities, one per start, in parts order
+        """
+        contiguous = all(starts[-1] - starts[0] == len(starts) - 1 for _, starts in parts)
+        n_windows = sum(len(starts) for _, starts in parts)
+        built = {}
+
+        def windows():
+            if "windows" not in built:
+                matrices = [strand.windows(starts, width) for strand, starts in parts]
+                built["windows"] = matrices[0] if len(matrices) == 1 else np.concatenate(matrices)
+            return built["windows"]
+
+        def segments():
+            return [strand.segment(starts[0], starts[-1] + width) for strand, starts in parts]
+
+        def build(zone, kind):
+            if kind == "windows":
+                return windows()
+            if kind == "segments":
+                return segments()
+            if kind == "frame":
+                # Transform all windows into a DataFrame with each character in separate columns
+                return pd.DataFrame(DECODE_ALPHABET[windows()], columns=[f"B{i+1}" for i in range(width)])
+            encoder = self.encoders[zone]
+            if contiguous:
+                encoded = np.concatenate([encoder.scan(segment, width) for segment in segments()])
+            else:
+                encoded = encoder.encode(windows())
+            return encoder.frame(encoded, width)
+
+        def features(zone, kind):
+            if kind not in built:
+                with recorder.stage(zone, "frame") as stage:
+                    built[kind] = build(zone, kind)
+                    stage.record(windows=n_windows, nbytes=lambda: sum(
+                        frame_nbytes(value) if isinstance(value, pd.DataFrame) else getattr(value, "nbytes", 0)
+                        for value in built.values()
+                    ))
+            return built[kind]
+
+        probabilities = {}
+        for zone in zones:
+            kind = self._feature_kind(zone, contiguous)
+            inputs = features(zone, kind)
+            with recorder.stage(zone, "predict_proba") as stage:
+                if kind == "segments":
+                    compiled = self.compiled[zone]
+                    proba = pd.Series(np.concatenate([compiled.scan_true_proba(segment) for segment in inputs]))
+                else:
+                    proba = pd.Series(self._model_call(zone, kind)(inputs))
+                stage.record(windows=len(proba), nbytes=lambda: proba.nbytes)
+            probabilities[zone] = proba
+        return probabilities
+
+    def _predict(self, zone, kind):
+        """
+        The model call of a zone: uint8 windows ('windows') or a DataFrame (frame and encoder
+        kinds) -> numpy array with the probability of the 'true' class per row.
+        """
+        if kind == "windows":
+            return self.compiled[zone].predict_true_proba
+        predictor = self.predictor[zone][0]
+        return lambda frame: predictor.predict_proba(frame, as_pandas=True)["true"].to_numpy()
+
+    def _model_call(self, zone, kind):
+        """
+        _predict, through the zone's MicroBatcher when micro-batching is enabled.
+        """
+        if not self.batch_max_windows:
+            return self._predict(zone, kind)
+        batcher = self.batchers.get(zone)
+        if batcher is None:
+            batcher = self.batchers.setdefault(zone, MicroBatcher(
+                self._predict(zone, kind), self.concurrency, self.batch_max_windows, self.batch_max_wait
+            ))
+        return batcher
+
+    def batch_stats(self):
+        """
+        :return: Dictionary zone -> calls, model_calls and windows of the zone's MicroBatcher
+        """
+        return {zone: batcher.stats() for zone, batcher in self.batchers.items()}
+
+    def _pairwise_proba(self, name, windows):
+        """
+        :param windows: uint8 window matrix
+        :return: DataFrame of the pairwise model's class probabilities, one column per zone
+        """
+        if name in self.pairwise_compiled:
+            compiled, labels = self.pairwise_compiled[name]
+            proba = compiled.predict_true_proba(windows)
+            positive = labels[compiled.positive_index]
+            return pd.DataFrame({label: proba if label == positive else 1.0 - proba for label in labels})
+        encoder = self.pairwise_encoders.get(name)
+        if encoder is not None:
+            frame = encoder.frame(encoder.encode(windows), windows.shape[1])
+        else:
+            frame = pd.DataFrame(DECODE_ALPHABET[windows], columns=[f"B{i+1}" for i in range(windows.shape[1])])
+        return self.pairwise[name].predict_proba(frame, as_pandas=True)
+
+    def _second_stage(self, hits, width, recorder=NULL_RECORDER):
+        """
+        Rescores first-pass hits with the pairwise model of their zone (PAIRWISE_MODELS) and
+        rejects the ones it assigns to the other zone of the pair, i.e. whose own zone gets a
+        probability below pairwise_threshold. Hits are a small fraction of the windows, so this
+        costs little next to the scan.
+
+        Zones that share a pairwise model (ZE and EZ) share its feature matrix: the windows of
+        all their hits are gathered once, a window that is a hit of both zones only once, and
+        scored in a single call. The 'pairwise' stage is recorded under the first zone.
+
+        :param hits: Dictionary zone -> list of (StrandView, window starts of the hits), with
+                     the same strands in the same order for every zone
+        :param width: Window width
+        :return: Dictionary zone -> list of boolean arrays, True for the hits that are kept
+        """
+        keep = {zone: [np.ones(len(starts), dtype=bool) for _, starts in parts] for zone, parts in hits.items()}
+        shared = {}
+        for zone in hits:
+            if PAIRWISE_MODELS.get(zone) in self.pairwise:
+                shared.setdefault(PAIRWISE_MODELS[zone], []).append(zone)
+        for name, zones in shared.items():
+            strands = [strand for strand, _ in hits[zones[0]]]
+            union = [
+                np.unique(np.concatenate([hits[zone][index][1] for zone in zones]))
+                for index in range(len(strands))
+            ]
+            if not any(len(starts) for starts in union):
+                continue
+            with recorder.stage(zones[0], "pairwise") as stage:
+                windows = np.concatenate([strand.windows(starts, width) for strand, starts in zip(strands, union) if len(starts)])
+                proba = self._pairwise_proba(name, windows)
+                stage.record(windows=len(windows), nbytes=lambda: windows.nbytes)
+            offset = 0
+            for index, starts in enumerate(union):
+                for zone in zones:
+                    rows = offset + np.searchsorted(starts, hits[zone][index][1])
+                    keep[zone][index] = proba[zone].to_numpy()[rows] >= self.pairwise_threshold
+                offset += len(starts)
+        return keep
+
+    def _score_units(self, zones, parts, width, recorder=NULL_RECORDER, work_unit=None):
+        """
+        Generator form of _score_group: with work_unit, the windows are scored work_unit starts
+        per strand at a time and a Checkpoint is yielded after each unit, so the caller can
+        interleave other work between units. Returns (via StopIteration) the same dictionary
+        as _score_group.
+        """
+        if not work_unit:
+            return self._score_group(zones, parts, width, recorder)
+        pieces = {zone: [[] for _ in parts] for zone in zones}
+        for lo in range(0, max(len(starts) for _, starts in parts), work_unit):
+            unit = [(index, strand, starts[lo : lo + work_unit]) for index, (strand, starts) in enumerate(parts)]
+            unit = [(index, strand, starts) for index, strand, starts in unit if len(starts)]
+            scored = self._score_group(zones, [(strand, starts) for _, strand, starts in unit], width, recorder)
+            for zone in zones:
+                offset = 0
+                for index, _, starts in unit:
+                    pieces[zone][index].append(scored[zone].iloc[offset : offset + len(starts)])
+                    offset += len(starts)
+            yield Checkpoint(sum(len(starts) for _, _, starts in unit) * width * len(zones))
+        # Back in parts order: every window of the first strand, then of the next one.
+        return {
+            zone: pd.concat([piece for strand_pieces in pieces[zone] for piece in strand_pieces], ignore_index=True)
+            for zone in zones
+        }
+
+    def _score(self, zone, parts, width, recorder=NULL_RECORDER):
+        """
+        Scores windows with the predictor for the specified zone (see _score_group).
+
+        :return: pandas Series of probabilities, one per start, in parts order
+        """
+        return self._score_group([zone], parts, width, recorder)[zone]
+
+    def _select(self, zone, proba, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER):
+        """
+        Applies the prediction method to a Series of probabilities.
+
+        :return: List of booleans, True for the windows that meet the criteria
+        """
+        with recorder.stage(zone, "rank") as stage:
+            if method == "top_n":
+                all_predictions = (
+                        (proba.rank(method="first", ascending=False) <= max_predictions) &
+                        (proba >= threshold)
+                ).to_list()
+            else:  # percentage method
+                all_predictions = (proba >= threshold).to_list()
+            stage.record(windows=len(all_predictions))
         return all_predictions
 
-    def _evaluate_ei(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5):
+    def _scan_cascade(self, zone, strand, window_size, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER, regions=None):
+        """
+        Coarse-to-fine version of the exhaustive sliding scan used for ZE/EZ.
+
+        1. Coarse pass: the full model scores every cascade_stride-th offset (plus the last one).
+        2. Candidates: coarse windows scoring at least (threshold - cascade_margin); for 'top_n'
+           only the best cascade_candidates * max_predictions of those are kept, and the best
+           max_predictions coarse windows are always added whatever their score.
+        3. Fine pass: every offset within cascade_stride - 1 bases of a candidate is scored.
+        4. The prediction method is applied to all scored offsets; offsets never scored are
+           treated as negatives.
+
+        True boundaries are rare and neighbouring 550-base windows overlap almost entirely, so
+        the coarse pass finds the same peaks while the model runs on a small fraction of the
+        offsets. Recall against the exhaustive scan is reported by the benchmark (--scan).
+
+        :param strand: StrandView to scan
+        :param regions: Optional merged [start, end) intervals of window starts in strand
+                        coordinates; each interval is scanned on its own and nothing outside
+                        them is scored
+        :return: List of positions (strand coordinates) where the zone was detected
+        """
+        n_windows = len(strand) - window_size + 1
+        spans = [(0, n_windows)] if regions is None else [
+            (max(start, 0), min(end, n_windows)) for start, end in regions if min(end, n_windows) > max(start, 0)
+        ]
+        if n_windows <= 0 or not spans:
+            return []
+        stride = self.cascade_stride
+
+        with recorder.stage(zone, "enumerate") as stage:
+            coarse = []
+            for start, end in spans:
+                offsets = np.arange(start, end, stride)
+                coarse.append(offsets if offsets[-1] == end - 1 else np.append(offsets, end - 1))
+            coarse = np.concatenate(coarse)
+            stage.record(windows=len(coarse), nbytes=lambda: coarse.nbytes)
+        coarse_proba = self._score(zone, [(strand, coarse)], window_size, recorder)
+        coarse_proba.index = coarse
+
+        with recorder.stage(zone, "cascade") as stage:
+            candidates = coarse_proba[coarse_proba >= threshold - self.cascade_margin]
+            if method == "top_n":
+                # The best max_predictions coarse windows are refined even below the margin: a
+                # peak narrower than the stride can fall between coarse offsets that all miss it.
+                candidates = candidates.nlargest(max_predictions * self.cascade_candidates, keep="first").index.union(
+                    coarse_proba.nlargest(max_predictions, keep="first").index
+                )
+            else:
+                candidates = candidates.index
+            fine = set()
+            for center in candidates:
+                fine.update(range(max(0, center - stride + 1), min(n_windows, center + stride)))
+            fine.difference_update(coarse.tolist())
+            fine = np.array(sorted(fine), dtype=np.intp)
+            if regions is not None:
+                fine = fine[interval_mask(fine, spans)]
+            stage.record(windows=len(fine), nbytes=lambda: fine.nbytes)
+
+        proba = coarse_proba
+        if len(fine):
+            fine_proba = self._score(zone, [(strand, fine)], window_size, recorder)
+            fine_proba.index = fine
+            proba = pd.concat([coarse_proba, fine_proba]).sort_index()
+
+        predictions = self._select(zone, proba, method, max_predictions, threshold, recorder)
+        return [pos for pos, pred in zip(proba.index, predictions) if pred]
+
+    def _enumerate_ei(self, strand):
+        """
+        For each occurrence of "gt", a 12-character window: 5 characters to the left,
+        the "gt" substring, and 5 characters to the right.
+
+        :return: (positions, window starts, window width)
+        """
+        positions = strand.find("gt")
+        positions = positions[(positions - 5 >= 0) & (positions + 7 <= len(strand))]
+        return positions, positions - 5, 12  # Window [pos - 5, pos + 7), length = 12
+
+    def _enumerate_ie(self, strand):
+        """
+        For each occurrence of "ag", intron_end is (pos + 1) and the window has 105 characters:
+        100 characters to the left of intron_end and 5 to the right.
+
+        :return: (positions, window starts, window width)
+        """
+        positions = strand.find("ag")
+        intron_end = positions + 1
+        keep = (intron_end - 100 >= 0) & (intron_end + 5 <= len(strand))
+        return positions[keep], intron_end[keep] - 100, 105  # Window [intron_end - 100, intron_end + 5)
+
+    def _enumerate_sliding(self, strand, window_size=550):
+        """
+        A sliding window of 550 characters moved one character at a time.
+
+        :return: (positions, window starts, window width)
+        """
+        positions = np.arange(max(len(strand) - window_size + 1, 0))  # Window starts
+        return positions, positions, window_size
+
+    def _enumerator(self, zone):
+        """
+        :return: The window enumerator of a zone. Zones with the same enumerator score the same
+                 windows (same geometry) and are evaluated together by _iter_group.
+        """
+        return {
+            "ei": self._enumerate_ei,
+            "ie": self._enumerate_ie,
+        }.get(zone, self._enumerate_sliding)
+
+    def _iter_group(self, zones, strands, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER, scan="exhaustive", tile_size=None, work_unit=None, regions=None, second_stage=False):
+        """
+        Detects zones that share a window geometry (e.g. ZE and EZ, which both score every
+        550-base window) on one or more strands of the same encoded sequence, yielding hits as
+        they are computed.
+
+        The windows are enumerated once and each input representation is built once for all
+        the zones (see _score_group). The windows of all strands are scored in one model call
+        per zone, then the prediction method is applied to each zone and strand separately
+        (top_n keeps max_predictions hits per strand).
+        With tile_size, the 'percentage' method on the sliding ZE/EZ scan scores tile_size window
+        starts at a time and yields each tile's hits, which are final since every window is
+        judged on its own; top_n needs every score first and always runs as a single tile.
+        Events are yielded zone by zone in 'zones' order: the hits of the later zones are kept
+        until the first zone is done, so each zone's events stay contiguous.
+
+        :param zones: Zone names with the same enumerator
+        :param strands: List of StrandView
+        :param tile_size: Optional number of window starts per tile
+        :param work_unit: Optional number of window starts per strand scored at a time; a
+                          Checkpoint is yielded after each unit and after each cascade scan
+        :param regions: Optional merged [start, end) intervals of forward-strand indices (see
+                        api.sequence.merge_intervals); only the windows whose reported position
+                        lies in one of them are enumerated and scored
+        :param second_stage: If True, the hits are rescored by the pairwise models and the ones
+                             assigned to the confusable zone are dropped (see _second_stage)
+        :return: Generator of (zone, strand index, positions in forward coordinates, tile), where
+                 tile is the (start, end) forward-coordinate range of the window starts covered,
+                 or None when the whole strand was scored at once. Every zone and strand yields
+                 at least once.
+        """
+        if scan == "cascade":
+            # Every zone refines around its own coarse peaks, so nothing is shared.
+            for zone in [zone for zone in zones if zone in ("ze", "ez")]:
+                for index, strand in enumerate(strands):
+                    hits = self._scan_cascade(
+                        zone, strand, 550, method, max_predictions, threshold, recorder,
+                        None if regions is None else strand.intervals(regions),
+                    )
+                    if second_stage:
+                        hits = np.array(hits, dtype=np.intp)
+                        hits = hits[self._second_stage({zone: [(strand, hits)]}, 550, recorder)[zone][0]]
+                    yield zone, index, strand.to_forward(hits), None
+                    if work_unit:
+                        yield Checkpoint(len(strand) // self.cascade_stride * 550)
+            zones = [zone for zone in zones if zone not in ("ze", "ez")]
+            if not zones:
+                return
+
+        enumerate_windows = self._enumerator(zones[0])
+        with recorder.stage(zones[0], "enumerate") as stage:
+            enumerated = [enumerate_windows(strand) for strand in strands]
+            if regions is not None:
+                kept = [interval_mask(positions, strand.intervals(regions)) for strand, (positions, _, _) in zip(strands, enumerated)]
+                enumerated = [(positions[keep], starts[keep], width) for keep, (positions, starts, width) in zip(kept, enumerated)]
+            stage.record(
+                windows=sum(len(starts) for _, starts, _ in enumerated),
+                nbytes=lambda: sum(positions.nbytes + starts.nbytes for positions, starts, _ in enumerated),
+            )
+        width = enumerated[0][2]
+        longest = max(len(starts) for _, starts, _ in enumerated)
+        if longest == 0:
+            for zone in zones:
+                for index in range(len(strands)):
+                    yield zone, index, [], None
+            return
+
+        tiled = bool(tile_size) and method == "percentage" and all(zone in ("ze", "ez") for zone in zones)
+        step = tile_size if tiled else longest
+        deferred = {zone: [] for zone in zones[1:]}
+        for lo in range(0, longest, step):
+            hi = lo + step
+            parts = [(strand, starts[lo:hi]) for strand, (_, starts, _) in zip(strands, enumerated)]
+            scored = [(strand, starts) for strand, starts in parts if len(starts)]
+            if regions is not None and enumerate_windows == self._enumerate_sliding:
+                # One part per interval, so every part stays a contiguous run of starts.
+                scored = [
+                    (strand, run) for strand, starts in scored
+                    for run in np.split(starts, np.flatnonzero(np.diff(starts) != 1) + 1)
+                ]
+            probabilities = yield from self._score_units(zones, scored, width, recorder, work_unit)
+
+            selected = {}
+            for zone in zones:
+                offset = 0
+                for index, (strand, starts) in enumerate(parts):
+                    strand_proba = probabilities[zone].iloc[offset : offset + len(starts)].reset_index(drop=True)
+                    offset += len(starts)
+                    predictions = self._select(zone, strand_proba, method, max_predictions, threshold, recorder) if len(starts) else []
+                    selected[zone, index] = np.flatnonzero(predictions)
+            if second_stage:
+                kept = self._second_stage(
+                    {zone: [(strand, starts[selected[zone, index]]) for index, (strand, starts) in enumerate(parts)] for zone in zones},
+                    width, recorder,
+                )
+                for zone in zones:
+                    for index in range(len(parts)):
+                        selected[zone, index] = selected[zone, index][kept[zone][index]]
+
+            for zone in zones:
+                for index, (strand, starts) in enumerate(parts):
+                    positions = enumerated[index][0][lo:hi]
+                    hits = strand.to_forward(positions[selected[zone, index]])
+                    tile = None
+                    if tiled:
+                        first, end = (int(starts[0]), int(starts[-1]) + 1) if len(starts) else (lo, lo)
+                        tile = (first, end) if not strand.reverse else (len(strand) - end, len(strand) - first)
+                    if zone == zones[0]:
+                        yield zone, index, hits, tile
+                    else:
+                        deferred[zone].append((zone, index, hits, tile))
+        for zone in zones[1:]:
+            yield from deferred[zone]
+
+    def _iter_zone(self, zone, strands, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER, scan="exhaustive", tile_size=None):
+        """
+        Detects one zone on one or more strands (see _iter_group).
+
+        :return: Generator of (strand index, positions in forward coordinates, tile)
+        """
+        for _, index, hits, tile in self._iter_group([zone], strands, method, max_predictions, threshold, recorder, scan, tile_size):
+            yield index, hits, tile
+
+    def _evaluate_zone(self, zone, strands, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER, scan="exhaustive"):
+        """
+        Detects one zone on one or more strands of the same encoded sequence (see _iter_zone).
+
+        :param strands: List of StrandView
+        :return: List with, for every strand, the detected positions in forward coordinates
+        """
+        results = [[] for _ in strands]
+        for index, hits, _ in self._iter_zone(zone, strands, method, max_predictions, threshold, recorder, scan):
+            results[index].extend(hits)
+        return results
+
+    def _evaluate_ei(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER):
         """
         Evaluates the nucleotide string for EI zones.
         For each occurrence of "gt", extract a 12-character window (5 characters to the left,
@@ -60,25 +770,10 @@ class GeneticZoneEvaluator:
         Then transform the window into B{i} columns and predict using EI models.
         If the majority vote is positive, record the starting index.
         """
-        positions = []
-        windows = []
-        start_index = 0
-        while True:
-            pos = nucleotide_string.find("gt", start_index)
-            if pos == -1:
-                break
-            if pos - 5 >= 0 and pos + 7 <= len(nucleotide_string):
-                window = nucleotide_string[pos - 5 : pos + 7]  # Length = 12
-                windows.append(window)
-                positions.append(pos)
-            start_index = pos + 1
-            
-        if windows:
-            predictions = self._predict("ei", windows, method, max_predictions, threshold)
-            return [pos for pos, pred in zip(positions, predictions) if pred]
-        return []
-
-    def _evaluate_ie(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5):
+        strand = as_encoded(nucleotide_string).forward
+        return self._evaluate_zone("ei", [strand], method, max_predictions, threshold, recorder)[0]
+
+    def _evaluate_ie(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER):
         """
         Evaluates the nucleotide string for IE zones.
         For each occurrence of "ag", define intron_end as (pos + 1),
@@ -86,66 +781,121 @@ class GeneticZoneEvaluator:
         Transform the window into B{i} columns and predict using IE models.
         If the majority vote is positive, record the starting index.
         """
-        positions = []
-        windows = []
-        start_index = 0
-        while True:
-            pos = nucleotide_string.find("ag", start_index)
-            if pos == -1:
-                break
-            intron_end = pos + 1
-            if intron_end - 100 >= 0 and intron_end + 5 <= len(nucleotide_string):
-                window = nucleotide_string[intron_end - 100 : intron_end + 5]  # Length = 105
-                windows.append(window)
-                positions.append(pos)
-            start_index = pos + 1
-
-        if windows:
-            predictions = self._predict("ie", windows, method, max_predictions, threshold)
-            return [pos for pos, pred in zip(positions, predictions) if pred]
-        return []
-
-    def _evaluate_ze(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5):
+        strand = as_encoded(nucleotide_string).forward
+        return self._evaluate_zone("ie", [strand], method, max_predictions, threshold, recorder)[0]
+
+    def _evaluate_ze(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER, scan="exhaustive"):
         """
         Evaluates the nucleotide string for ZE zones.
         A sliding window of 550 characters is moved one character at a time.
         Each window is transformed into B{i} columns and evaluated using ZE models.
         If the majority vote is positive, record the starting index.
+        With scan="cascade" only a strided subset of offsets and the neighbourhoods of the
+        best ones are scored (see _scan_cascade).
         """
-        positions = []
-        windows = []
-        window_size = 550
-        for i in range(len(nucleotide_string) - window_size + 1):
-            window = nucleotide_string[i : i + window_size]
-            windows.append(window)
-            positions.append(i)
+        strand = as_encoded(nucleotide_string).forward
+        return self._evaluate_zone("ze", [strand], method, max_predictions, threshold, recorder, scan)[0]
 
-        if windows:
-            predictions = self._predict("ze", windows, method, max_predictions, threshold)
-            return [pos for pos, pred in zip(positions, predictions) if pred]
-        return []
-
-    def _evaluate_ez(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5):
+    def _evaluate_ez(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER, scan="exhaustive"):
         """
         Evaluates the nucleotide string for EZ zones.
         A sliding window of 550 characters is moved one character at a time.
         Each window is transformed into B{i} columns and evaluated using EZ models.
         If the majority vote is positive, record the starting index.
+        With scan="cascade" only a strided subset of offsets and the neighbourhoods of the
+        best ones are scored (see _scan_cascade).
+        """
+        strand = as_encoded(nucleotide_string).forward
+        return self._evaluate_zone("ez", [strand], method, max_predictions, threshold, recorder, scan)[0]
+
+    def iter_evaluate(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER, scan="exhaustive", strands="forward", tile_size=None, work_unit=None, cancel=None, regions=None, second_stage=False):
+        """
+        Streaming form of evaluate(): yields the hits of each zone and strand as soon as they
+        are computed, in the order ei, ie, ze, ez.
+
+        :param tile_size: With method 'percentage', the exhaustive ZE/EZ scans are split into
+                          tiles of tile_size window starts and each tile's hits are yielded on
+                          their own (see _iter_zone)
+        :param work_unit: If set, windows are scored at most work_unit starts per strand at a
+                          time and a Checkpoint is yielded between units (used by
+                          api.scheduler to interleave evaluations). The hits are unchanged.
+        :param cancel: Optional CancellationToken (api.cancellation), checked before every zone
+                       and work unit; EvaluationCancelled is raised once it is cancelled. The
+                       work of the Checkpoints passed is added to cancel.done.
+        :param regions: Optional dictionary zone -> list of [start, end) intervals of forward
+                        strand indices. Only that zone's windows whose reported position lies in
+                        an interval are enumerated and scored; zones without an entry scan the
+                        whole sequence. Positions stay in global coordinates.
+        :param second_stage: If True, the hits of every zone with a loaded pairwise model are
+                             rescored by it and those it assigns to the confusable zone are
+                             dropped (see _second_stage)
+        :return: Generator of (zone, strand name, positions, tile). The positions of one zone
+                 and strand are the concatenation of all its events; tile is the
+                 (start, end) range of window starts covered, or None.
+        """
+        views = as_encoded(nucleotide_string).strands(strands)
+        regions = {zone: tuple(merge_intervals(intervals)) for zone, intervals in (regions or {}).items()}
+        # Zones that score the same windows (same geometry and regions) share one enumeration
+        # and one feature build.
+        groups = {}
+        for zone in ("ei", "ie", "ze", "ez"):
+            if zone in self.predictor:
+                groups.setdefault((self._enumerator(zone).__name__, regions.get(zone)), []).append(zone)
+
+        def events():
+            for (_, zone_regions), zones in groups.items():
+                for event in self._iter_group(
+                    zones, views, method, max_predictions, threshold, recorder, scan, tile_size, work_unit,
+                    None if zone_regions is None else list(zone_regions), second_stage,
+                ):
+                    if isinstance(event, Checkpoint):
+                        yield event
+                    else:
+                        zone, index, hits, tile = event
+                        yield zone, views[index].name, hits, tile
+
+        # Only count as a running evaluation (for the micro-batchers) while actually computing,
+        # not while suspended between events or work units.
+        steps = events()
+        while True:
+            if cancel is not None:
+                cancel.check()
+            with self.concurrency:
+                event = next(steps, None)
+            if event is None:
+                return
+            if cancel is not None and isinstance(event, Checkpoint):
+                cancel.done += event.cells
+            yield event
+
+    def estimate_cost(self, nucleotide_string, scan="exhaustive", strands="forward", regions=None):
         """
-        positions = []
-        windows = []
-        window_size = 550
-        for i in range(len(nucleotide_string) - window_size + 1):
-            window = nucleotide_string[i : i + window_size]
-            windows.append(window)
-            positions.append(i)
+        Estimated work of evaluate() on a sequence: windows per loaded zone times the window
+        width (the bases every model call reads), in the same unit as Checkpoint.cells.
 
-        if windows:
-            predictions = self._predict("ez", windows, method, max_predictions, threshold)
-            return [pos for pos, pred in zip(positions, predictions) if pred]
-        return []
+        :param regions: Optional dictionary zone -> [start, end) intervals (see iter_evaluate)
+        """
+        regions = {zone: merge_intervals(intervals) for zone, intervals in (regions or {}).items()}
+        cost = 0
+        for strand in as_encoded(nucleotide_string).strands(strands):
+            n_sliding = max(len(strand) - 549, 0)
+            for zone in self.predictor:
+                zone_regions = regions.get(zone)
+                if zone in ("ei", "ie"):
+                    positions = strand.find("gt" if zone == "ei" else "ag")
+                    if zone_regions is not None:
+                        positions = positions[interval_mask(positions, strand.intervals(zone_regions))]
+                    cost += len(positions) * (12 if zone == "ei" else 105)
+                    continue
+                sliding = n_sliding
+                if zone_regions is not None:
+                    sliding = sum(max(min(end, n_sliding) - max(start, 0), 0) for start, end in strand.intervals(zone_regions))
+                if scan == "cascade":
+                    sliding //= self.cascade_stride
+                cost += sliding * 550
+        return cost
 
-    def evaluate(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5):
+    def evaluate(self, nucleotide_string, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER, scan="exhaustive", strands="forward", work_unit=None, cancel=None, regions=None, second_stage=False):
         """
         Public method to evaluate a nucleotide string for all available genetic zones.
         Returns a dictionary with keys corresponding to the zones present in the predictor dictionary,
@@ -155,15 +905,136 @@ class GeneticZoneEvaluator:
         :param method: Prediction method to use ('top_n' or 'percentage')
         :param max_predictions: Number of top predictions to return when method is 'top_n'
         :param threshold: Probability threshold when method is 'percentage'
+        :param recorder: Optional StageRecorder (api.instrumentation) that collects durations,
+                         window counts and bytes per zone and stage. Defaults to a no-op recorder.
+        :param scan: 'exhaustive' scores every ZE/EZ offset, 'cascade' runs the coarse-to-fine scan
+        :param strands: 'forward' scans the sequence as given. 'both' also scans its reverse
+                        complement and adds a 'reverse' dictionary with the same zone keys.
+                        Reverse-strand positions are forward-strand indices of the base the
+                        forward scan would report (the element then reads towards lower indices).
+        :param work_unit: Optional number of window starts per strand scored at a time, so that
+                          'cancel' is also checked within a zone (see iter_evaluate)
+        :param cancel: Optional CancellationToken (api.cancellation); raises EvaluationCancelled
+                       at the next check once it is cancelled
+        :param regions: Optional dictionary zone -> list of [start, end) intervals restricting
+                        that zone's scan (see iter_evaluate)
+        :param second_stage: If True, the hits are filtered by the pairwise models (see
+                             iter_evaluate)
         :return: Dictionary with zone predictions
         """
         results = {}
-        if "ei" in self.predictor:
-            results["ei"] = self._evaluate_ei(nucleotide_string, method, max_predictions, threshold)
-        if "ie" in self.predictor:
-            results["ie"] = self._evaluate_ie(nucleotide_string, method, max_predictions, threshold)
-        if "ze" in self.predictor:
-            results["ze"] = self._evaluate_ze(nucleotide_string, method, max_predictions, threshold)
-        if "ez" in self.predictor:
-            results["ez"] = self._evaluate_ez(nucleotide_string, method, max_predictions, threshold)
-        return results
\ No newline at end of file
+        reverse = {}
+        for event in self.iter_evaluate(nucleotide_string, method, max_predictions, threshold, recorder, scan, strands, work_unit=work_unit, cancel=cancel, regions=regions, second_stage=second_stage):
+            if isinstance(event, Checkpoint):
+                continue
+            zone, strand, hits, _ = event
+            (reverse if strand == "reverse" else results).setdefault(zone, []).extend(hits)
+        if strands == "both":
+            results["reverse"] = reverse
+        return results
+
+    def _zone_groups(self):
+        """
+        :return: Lists of the loaded zones that share an enumerator, in the order ei, ie, ze, ez
+        """
+        groups = {}
+        for zone in ("ei", "ie", "ze", "ez"):
+            if zone in self.predictor:
+                groups.setdefault(self._enumerator(zone).__name__, []).append(zone)
+        return list(groups.values())
+
+    def score_reference(self, nucleotide_string, recorder=NULL_RECORDER, cancel=None):
+        """
+        Scores every window of every loaded zone on the forward strand, the baseline of
+        score_variants.
+
+        :param cancel: Optional CancellationToken, checked before every group of zones
+        :return: ReferenceScores
+        """
+        sequence = as_encoded(nucleotide_string)
+        strand = sequence.forward
+        scores = {}
+        for zones in self._zone_groups():
+            if cancel is not None:
+                cancel.check()
+            with recorder.stage(zones[0], "enumerate") as stage:
+                positions, starts, width = self._enumerator(zones[0])(strand)
+                stage.record(windows=len(starts), nbytes=lambda: positions.nbytes + starts.nbytes)
+            with self.concurrency:
+                probabilities = self._score_group(zones, [(strand, starts)], width, recorder) if len(starts) else {}
+            for zone in zones:
+                proba = probabilities[zone].to_numpy() if len(starts) else np.zeros(0)
+                scores[zone] = ZoneScores(positions, starts, proba, width)
+            if cancel is not None:
+                cancel.done += len(starts) * width * len(zones)
+        return ReferenceScores(len(sequence), scores)
+
+    def estimate_variant_cost(self, variants):
+        """
+        Upper bound of the work of score_variants with cached reference scores: every window
+        overlapping each edit, times the window width (the unit of estimate_cost).
+
+        :param variants: List of api.variants.Variant
+        """
+        widths = {"ei": 12, "ie": 105}
+        return sum(
+            (widths.get(zone, 550) + len(variant.alt) - 1) * widths.get(zone, 550)
+            for variant in variants for zone in self.predictor
+        )
+
+    def score_variants(self, nucleotide_string, variants, method="top_n", max_predictions=10, threshold=0.5, recorder=NULL_RECORDER, reference=None, min_delta=0.0, cancel=None):
+        """
+        Scores variants of a reference sequence by rescoring only the windows that overlap each
+        edit; every other window keeps its reference probability, at coordinates shifted by the
+        indels before it (see api.variants). The hits are those evaluate() returns for the
+        edited sequence (forward strand, exhaustive scan).
+
+        Each variant is applied to the reference on its own. The windows of all the variants are
+        enumerated on small segments around the edits and scored in one model call per zone
+        group, like the windows of a single sequence.
+
+        :param nucleotide_string: The reference sequence
+        :param variants: List of api.variants.Variant, whose ref bases match the reference
+        :param reference: ReferenceScores of the reference from an earlier score_reference
+                          call; scored here when None
+        :param min_delta: Smallest absolute probability change of a window that is reported
+        :param cancel: Optional CancellationToken, checked before every group of zones
+        :return: (ReferenceScores, list with one dictionary zone -> delta per variant, see
+                 api.variants.ZoneScores.delta)
+        """
+        sequence = as_encoded(nucleotide_string)
+        if reference is None:
+            reference = self.score_reference(sequence, recorder, cancel)
+        results = [{} for _ in variants]
+        for zones in self._zone_groups():
+            if cancel is not None:
+                cancel.check()
+            enumerate_windows = self._enumerator(zones[0])
+            width = reference.zones[zones[0]].width
+            with recorder.stage(zones[0], "enumerate") as stage:
+                edited = []  # Per variant: (segment strand, segment starts, positions, starts)
+                for variant in variants:
+                    segment, offset = variant.segment(sequence.codes, width)
+                    strand = EncodedSequence(segment).forward
+                    positions, starts, _ = enumerate_windows(strand)
+                    keep = variant.overlaps(starts + offset, width)
+                    edited.append((strand, starts[keep], positions[keep] + offset, starts[keep] + offset))
+                n_windows = sum(len(starts) for _, starts, _, _ in edited)
+                stage.record(windows=n_windows)
+            parts = [(strand, starts) for strand, starts, _, _ in edited if len(starts)]
+            with self.concurrency:
+                probabilities = self._score_group(zones, parts, width, recorder) if parts else {}
+            for zone in zones:
+                proba = probabilities[zone].to_numpy() if parts else np.zeros(0)
+                with recorder.stage(zone, "rank") as stage:
+                    offset = 0
+                    for result, variant, (_, _, positions, starts) in zip(results, variants, edited):
+                        result[zone] = reference.zones[zone].delta(
+                            variant, positions, starts, proba[offset : offset + len(starts)],
+                            method, max_predictions, threshold, min_delta,
+                        )
+                        offset += len(starts)
+                    stage.record(windows=n_windows)
+            if cancel is not None:
+                cancel.done += n_windows * width * len(zones)
+        return reference, results
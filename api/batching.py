@@ -0,0 +1,183 @@
+"""
+Cross-request micro-batching of model calls for GeneticZoneEvaluator.
+
+Concurrent requests each score their own (often small) set of windows per zone, and every
+model call pays a fixed overhead (AutoGluon's preprocessing, thread-pool start-up), so many
+small calls cost far more than one call on the same windows. A MicroBatcher per zone queues the
+calls, runs the model once on their concatenated inputs and hands each caller its rows.
+"""
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class Concurrency:
+    """
+    Number of evaluations currently running, shared by the batchers of an evaluator (and of the
+    evaluators derived from it by a hot reload).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.active += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._lock:
+            self.active -= 1
+
+
+class _Call:
+    __slots__ = ("inputs", "done", "result", "error")
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent calls of one model into a single call.
+
+    Callers block in __call__ while a worker thread takes the first queued call and, as long as
+    other evaluations are running (they may be about to call the model too), keeps collecting
+    calls until max_windows rows are queued or max_wait seconds have passed. It then runs the
+    model once on the concatenated inputs and hands each caller its slice of the result. A call
+    made while no other evaluation runs is dispatched without waiting, and calls of max_windows
+    rows or more bypass the queue.
+
+    :param fn: Model call, inputs (uint8 window matrix or DataFrame) -> 1-D probabilities
+    :param concurrency: Concurrency tracking the evaluations in progress
+    :param max_windows: Rows per batched model call
+    :param max_wait: Longest time in seconds the first call of a batch waits for more calls
+    """
+    def __init__(self, fn, concurrency, max_windows=4096, max_wait=0.002):
+        self.fn = fn
+        self.concurrency = concurrency
+        self.max_windows = max_windows
+        self.max_wait = max_wait
+        self.calls = 0          # Calls received
+        self.model_calls = 0    # Model invocations made for them
+        self.windows = 0        # Rows scored
+        self.closed = False
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pid = None
+
+    def __call__(self, inputs):
+        if len(inputs) >= self.max_windows:
+            self._count(1, 1, len(inputs))
+            return self.fn(inputs)
+        call = _Call(inputs)
+        if not self._enqueue(call):
+            self._count(1, 1, len(inputs))
+            return self.fn(inputs)
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        return {"calls": self.calls, "model_calls": self.model_calls, "windows": self.windows}
+
+    def _count(self, calls, model_calls, windows):
+        with self._lock:
+            self.calls += calls
+            self.model_calls += model_calls
+            self.windows += windows
+
+    def close(self):
+        """
+        Stops the worker thread once the queued calls are dispatched. Later calls run the model
+        directly, so an evaluation still holding the batcher keeps working.
+        """
+        with self._lock:
+            if not self.closed and self._queue is not None and self._pid == os.getpid():
+                self._queue.put(None)
+            self.closed = True
+
+    def _enqueue(self, call):
+        """
+        :return: False if the batcher is closed and the call was not queued
+        """
+        with self._lock:
+            if self.closed:
+                return False
+            # The worker is started on first use, and again in a forked child (api/serve.py
+            # forks after warm-up, and threads do not survive a fork).
+            if self._pid != os.getpid():
+                self._queue = queue.SimpleQueue()
+                threading.Thread(target=self._run, args=(self._queue,), daemon=True, name="micro-batcher").start()
+                self._pid = os.getpid()
+            self._queue.put(call)
+        return True
+
+    def _run(self, calls):
+        while True:
+            first = calls.get()
+            if first is None:
+                return
+            batch = [first]
+            size = len(first.inputs)
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_windows:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0 and self.concurrency.active > len(batch):
+                        call = calls.get(timeout=remaining)
+                    else:
+                        call = calls.get_nowait()
+                except queue.Empty:
+                    break
+                if call is None:
+                    self._dispatch(batch, size)
+                    return
+                batch.append(call)
+                size += len(call.inputs)
+            self._dispatch(batch, size)
+
+    def _dispatch(self, batch, size):
+        try:
+            if len(batch) == 1:
+                batch[0].result = self.fn(batch[0].inputs)
+            else:
+                inputs = [call.inputs for call in batch]
+                if isinstance(inputs[0], pd.DataFrame):
+                    proba = np.asarray(self.fn(pd.concat(inputs, ignore_index=True)))
+                else:
+                    proba = np.asarray(self.fn(np.concatenate(inputs)))
+                offset = 0
+                for call in batch:
+                    call.result = proba[offset : offset + len(call.inputs)]
+                    offset += len(call.inputs)
+        except Exception as e:
+            for call in batch:
+                call.error = e
+        self._count(len(batch), 1, size)
+        for call in batch:
+            call.done.set()
+
+
+def render_batch_metrics(stats):
+    """
+    :param stats: Dictionary zone -> MicroBatcher.stats()
+    :return: Prometheus text exposition lines for the batchers
+    """
+    lines = []
+    for name, key, description in (
+        ("genetic_zone_batch_calls_total", "calls", "Model calls requested by evaluations per zone."),
+        ("genetic_zone_batch_model_calls_total", "model_calls", "Model invocations after micro-batching per zone."),
+        ("genetic_zone_batch_windows_total", "windows", "Windows scored through the micro-batcher per zone."),
+    ):
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+        lines += [f'{name}{{zone="{zone}"}} {zone_stats[key]}' for zone, zone_stats in sorted(stats.items())]
+    return "\n".join(lines) + "\n" if stats else ""
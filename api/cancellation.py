@@ -0,0 +1,100 @@
+"""
+Cooperative cancellation of evaluations.
+
+An evaluation runs in a worker thread that cannot be interrupted from outside; when its client
+disconnects or its deadline passes, the thread used to build frames and run models to the end
+for a response nobody reads. A CancellationToken is checked by GeneticZoneEvaluator.iter_evaluate
+between zones and between work units, so an abandoned evaluation stops at the next check.
+"""
+import threading
+import time
+
+
+class EvaluationCancelled(Exception):
+    """
+    Raised from an evaluation whose CancellationToken was cancelled. 'reason' is 'disconnect'
+    or 'deadline'.
+    """
+    def __init__(self, reason):
+        super().__init__(f"Evaluation cancelled ({reason}).")
+        self.reason = reason
+
+
+class CancellationToken:
+    """
+    Cancellation state of one evaluation, shared by the API (which cancels it) and the
+    evaluating thread (which checks it).
+
+    :param deadline: Optional time.monotonic() value after which the evaluation is cancelled
+    :param cost: Estimated work of the evaluation (GeneticZoneEvaluator.estimate_cost)
+    """
+    def __init__(self, deadline=None, cost=0):
+        self.deadline = deadline
+        self.cost = cost
+        self.done = 0  # Work completed so far, from the Checkpoints passed
+        self.reason = None
+
+    @classmethod
+    def after(cls, seconds, cost=0):
+        """
+        :param seconds: Seconds from now until the deadline, or None for no deadline
+        """
+        return cls(None if seconds is None else time.monotonic() + seconds, cost)
+
+    def cancel(self, reason):
+        if self.reason is None:
+            self.reason = reason
+
+    @property
+    def cancelled(self):
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = "deadline"
+        return self.reason is not None
+
+    def check(self):
+        """
+        :raises EvaluationCancelled: If the token was cancelled or its deadline has passed
+        """
+        if self.cancelled:
+            raise EvaluationCancelled(self.reason)
+
+    @property
+    def saved(self):
+        """
+        Estimated work the cancellation skipped.
+        """
+        return max(self.cost - self.done, 0)
+
+
+class CancellationStats:
+    """
+    Process-wide count of cancelled evaluations and of the work they skipped, for /metrics.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cancelled = {}  # reason -> evaluations
+        self.saved = {}      # reason -> estimated work skipped
+        self.done = {}       # reason -> work completed before the cancellation
+
+    def observe(self, token):
+        with self._lock:
+            self.cancelled[token.reason] = self.cancelled.get(token.reason, 0) + 1
+            self.saved[token.reason] = self.saved.get(token.reason, 0) + token.saved
+            self.done[token.reason] = self.done.get(token.reason, 0) + min(token.done, token.cost)
+
+    def render(self):
+        """
+        :return: Prometheus text exposition lines for the cancelled evaluations
+        """
+        with self._lock:
+            lines = []
+            for name, counts, description in (
+                ("genetic_zone_cancelled_evaluations_total", self.cancelled, "Evaluations cancelled per reason."),
+                ("genetic_zone_cancelled_work_saved_total", self.saved,
+                 "Estimated work (windows x window width) skipped by cancelled evaluations."),
+                ("genetic_zone_cancelled_work_done_total", self.done,
+                 "Work (windows x window width) done by evaluations before they were cancelled."),
+            ):
+                lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+                lines += [f'{name}{{reason="{reason}"}} {value}' for reason, value in sorted(counts.items())]
+        return "\n".join(lines) + "\n"
@@ -19,3 +19,134 @@ MODEL_PATHS = {
 }
 
 MIN_SEQUENCE_LENGTH = 550 # For ZE/EZ models
+
+# Per-stage instrumentation of GeneticZoneEvaluator, aggregated on the /metrics endpoint.
+# When disabled the evaluator runs with a no-op recorder unless a request sets include_timings.
+INSTRUMENTATION_ENABLED = True
+
+# On-demand profiling of evaluator.evaluate through the /admin/profile endpoints.
+# The endpoints answer 404 unless profiling is enabled, and require the X-Admin-Token header
+# to match GENETIC_ZONE_ADMIN_TOKEN.
+PROFILING_ENABLED = os.environ.get("GENETIC_ZONE_PROFILING", "0") == "1"
+PROFILING_ADMIN_TOKEN = os.environ.get("GENETIC_ZONE_ADMIN_TOKEN")
+PROFILING_OUTPUT_DIR = os.path.join(PROJECT_ROOT, "profiles")
+PROFILING_SAMPLE_INTERVAL = 0.005 # Seconds between stack samples in 'sampling' mode
+PROFILING_MAX_CALLS = 100
+PROFILING_MAX_SECONDS = 600
+
+# Compile the loaded AutoGluon predictors to the fast path (api/fast_inference.py): encoded
+# windows are scored directly by the best model's boosters instead of going through
+# predict_proba. Unsupported model types fall back to predict_proba per zone.
+FAST_PATH_ENABLED = True
+
+# Start-up: persist the AutoGluon models served through predict_proba in memory (AutoGluon
+# otherwise loads model artifacts from disk during prediction) and score WARMUP_WINDOWS random
+# windows per zone before the API reports ready. WARMUP_WINDOWS = 0 skips the warm-up.
+PERSIST_MODELS = True
+WARMUP_WINDOWS = 512
+
+# Hot reload: POST /admin/reload (X-Admin-Token = GENETIC_ZONE_ADMIN_TOKEN) loads some or all
+# zones again in the background while the current models keep serving, then swaps them in.
+# With MODEL_WATCH_INTERVAL > 0 the model directories are also polled every that many seconds
+# and a zone whose files changed (and stayed unchanged for one more poll) is reloaded. The
+# replaced models are released once the requests using them finish, or after
+# RELOAD_DRAIN_SECONDS.
+MODEL_RELOAD_ENABLED = os.environ.get("GENETIC_ZONE_MODEL_RELOAD", "0") == "1"
+MODEL_WATCH_INTERVAL = float(os.environ.get("GENETIC_ZONE_MODEL_WATCH_INTERVAL", "0"))
+RELOAD_DRAIN_SECONDS = 300.0
+
+# Serving backend: "autogluon" loads MODEL_PATHS with TabularPredictor, "exported" loads the
+# lean models written by training/export_models.py from EXPORTED_MODEL_PATHS, which only needs
+# numpy and lightgbm (AutoGluon is never imported).
+MODEL_BACKEND = os.environ.get("GENETIC_ZONE_MODEL_BACKEND", "autogluon")
+EXPORTED_MODEL_PATHS = {
+    zone: os.path.join(PROJECT_ROOT, "models", zone, "exported") for zone in MODEL_PATHS
+}
+
+# Distilled ZE/EZ students written by training/distill_models.py. Zones listed in
+# GENETIC_ZONE_DISTILLED_ZONES (e.g. "ze,ez") are served by their student instead of the
+# backend above, which then does not load those zones at all.
+DISTILLED_MODEL_PATHS = {
+    zone: os.path.join(PROJECT_ROOT, "models", zone, "distilled") for zone in ("ze", "ez")
+}
+DISTILLED_ZONES = [
+    zone.strip() for zone in os.environ.get("GENETIC_ZONE_DISTILLED_ZONES", "").split(",") if zone.strip()
+]
+
+# Second stage (PredictionRequest.second_stage): the pairwise models trained by
+# training/train_models.py rescore the hits of the zones they separate (ze-ez for ZE and EZ,
+# ei-ie for EI, ie-ei for IE) and drop those whose own zone gets a probability below
+# PAIRWISE_THRESHOLD. The models are AutoGluon predictors, loaded only with
+# GENETIC_ZONE_PAIRWISE=1.
+PAIRWISE_ENABLED = os.environ.get("GENETIC_ZONE_PAIRWISE", "0") == "1"
+PAIRWISE_MODEL_PATHS = {
+    "ze-ez": os.path.join(PROJECT_ROOT, "models", "ze-ez", "ZE-EZ"),
+    "ei-ie": os.path.join(PROJECT_ROOT, "models", "ei-ie", "EI-IE"),
+    "ie-ei": os.path.join(PROJECT_ROOT, "models", "ie-ei", "IE-EI"),
+}
+PAIRWISE_THRESHOLD = 0.5
+
+# Coarse-to-fine ZE/EZ scan (PredictionRequest.scan = "cascade"): the full model scores every
+# CASCADE_STRIDE-th offset, then re-scores at single-base resolution around the coarse windows
+# scoring >= threshold - CASCADE_MARGIN (the best CASCADE_CANDIDATES * N of them for top_n, plus
+# the best N coarse windows whatever their score).
+CASCADE_STRIDE = 25
+CASCADE_CANDIDATES = 5
+CASCADE_MARGIN = 0.1
+
+# Variant scoring (POST /predict/variants, api/variants.py): at most VARIANT_MAX_COUNT variants
+# per request, each replacing at most VARIANT_MAX_BASES reference bases by at most as many. The
+# window scores of the last VARIANT_CACHE_ENTRIES references are kept (about 32 bytes per base
+# with all four zones), so later variants of the same reference only rescore the windows around
+# their edits. VARIANT_CACHE_ENTRIES = 0 disables the cache.
+VARIANT_MAX_COUNT = 1000
+VARIANT_MAX_BASES = 50
+VARIANT_CACHE_ENTRIES = 4
+
+# Micro-batching (api/batching.py): model calls of fewer than BATCH_MAX_WINDOWS windows made by
+# concurrent requests for the same zone are coalesced into one call of up to BATCH_MAX_WINDOWS
+# windows. While other requests are being evaluated, the first call of a batch waits at most
+# BATCH_MAX_WAIT seconds for theirs; a lone request never waits. BATCH_MAX_WINDOWS = 0 disables it.
+BATCH_MAX_WINDOWS = 4096
+BATCH_MAX_WAIT = 0.002
+
+# Scheduling (api/scheduler.py): /predict evaluations run on SCHEDULER_WORKERS threads, one work
+# unit of at most SCHEDULER_WORK_UNIT window starts per strand at a time, shortest job first by
+# estimated remaining work (windows x window width). A waiting job's cost counts half every
+# SCHEDULER_AGING_HALF_LIFE seconds, so long jobs are delayed but never starved.
+# SCHEDULER_RESERVED_WORKERS of the threads only run jobs with at most SCHEDULER_SMALL_JOB_COST
+# work left (one ZE/EZ work unit), so a short request never waits for a long job's unit.
+# SCHEDULER_WORKERS = 0 runs every evaluation directly in the default executor instead. The
+# default allows as many evaluations at once as that executor did (min(32, CPUs + 4)), which
+# also leaves the micro-batcher concurrent calls to merge.
+SCHEDULER_WORKERS = int(os.environ.get("GENETIC_ZONE_SCHEDULER_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+SCHEDULER_RESERVED_WORKERS = 1
+SCHEDULER_WORK_UNIT = 16_384
+SCHEDULER_SMALL_JOB_COST = SCHEDULER_WORK_UNIT * 550
+SCHEDULER_AGING_HALF_LIFE = 0.5
+
+# Cancellation (api/cancellation.py): an evaluation stops at its next zone or work unit once its
+# client has disconnected (checked every DISCONNECT_POLL_INTERVAL seconds) or its deadline has
+# passed (504). Requests may set 'deadline_seconds' up to MAX_DEADLINE_SECONDS; requests without
+# one get DEFAULT_DEADLINE_SECONDS (0 = no deadline).
+DEFAULT_DEADLINE_SECONDS = float(os.environ.get("GENETIC_ZONE_DEADLINE_SECONDS", "0"))
+MAX_DEADLINE_SECONDS = 3600.0
+DISCONNECT_POLL_INTERVAL = 0.25
+
+# /predict/upload: streamed FASTA or 2-bit bodies, optionally gzip/zstd compressed. Decoding
+# stops with 413 once the sequence exceeds UPLOAD_MAX_BASES.
+UPLOAD_MAX_BASES = 100_000_000
+
+# /predict/stream: with the 'percentage' method the ZE/EZ scans are scored and streamed in
+# tiles of this many window starts per strand. At most STREAM_QUEUE_EVENTS hit lines wait for
+# a slow client; the evaluation then pauses until it has read them.
+STREAM_TILE_SIZE = 50_000
+STREAM_QUEUE_EVENTS = 16
+
+# Pre-fork server (python -m api.serve): the master loads the models once and forks the
+# workers, which share the model memory copy-on-write. Each worker refreshes its heartbeat in
+# a shared table every WORKER_HEARTBEAT_INTERVAL seconds; /health/workers reports a worker
+# whose heartbeat is older than WORKER_STALE_SECONDS as not ready.
+SERVE_WORKERS = int(os.environ.get("GENETIC_ZONE_WORKERS", os.cpu_count() or 1))
+WORKER_HEARTBEAT_INTERVAL = 1.0
+WORKER_STALE_SECONDS = 5.0
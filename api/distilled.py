@@ -0,0 +1,111 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from api.sequence import ENCODE_TABLE, UNKNOWN_CODE
+
+# Distilled model directories contain this manifest next to the weight matrix.
+DISTILLED_FORMAT = "genetic-zone-pwm/1"
+MANIFEST_FILE = "manifest.json"
+WEIGHTS_FILE = "weights.npy"
+
+
+class DistilledScorer:
+    """
+    Compact student of a ZE/EZ zone model, written by training/distill_models.py.
+
+    The student is a logistic model on one-hot nucleotides, i.e. a position weight matrix: the
+    logit of a window is bias + sum_j weights[j, code_j]. Scoring every start of a sliding scan
+    is then a correlation of the sequence with the matrix, computed here with FFTs over blocks
+    of chunk_size starts, so a whole strand is scored without gathering any window matrix.
+
+    It exposes predict_true_proba like CompiledPredictor, so GeneticZoneEvaluator uses it for
+    scattered windows (cascade scan) the same way as a compiled model.
+
+    :param weights: float array (width, len(NUCLEOTIDES) + 1), one column per nucleotide code
+    :param bias: Intercept of the logit
+    """
+    def __init__(self, weights, bias, chunk_size=1 << 16, metadata=None):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.width = len(self.weights)
+        self.chunk_size = chunk_size
+        self.metadata = metadata or {}
+        # FFT length covering one block of starts plus the window overhang, and the spectrum of
+        # the reversed matrix per nucleotide (correlation = convolution with the reversed kernel).
+        self._fft_size = 1 << int(np.ceil(np.log2(chunk_size + self.width - 1)))
+        self._kernels = np.fft.rfft(self.weights[::-1].T, n=self._fft_size, axis=1)
+
+    def predict_true_proba(self, windows):
+        """
+        :param windows: uint8 matrix (n_windows, width) of nucleotide codes
+        :return: float64 array with the probability of the positive ('true') class per window
+        """
+        logits = self.weights[np.arange(self.width), windows].sum(axis=1) + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def scan_true_proba(self, codes):
+        """
+        Scores every window of a contiguous segment.
+
+        :param codes: uint8 array of nucleotide codes
+        :return: float64 array with the probability of codes[s : s + width] for every start s
+        """
+        n_windows = len(codes) - self.width + 1
+        if n_windows <= 0:
+            return np.empty(0, dtype=np.float64)
+        logits = np.empty(n_windows, dtype=np.float64)
+        channels = np.arange(UNKNOWN_CODE + 1, dtype=np.uint8)[:, None]
+        for lo in range(0, n_windows, self.chunk_size):
+            hi = min(lo + self.chunk_size, n_windows)
+            segment = codes[lo : hi + self.width - 1]
+            one_hot = (segment[None, :] == channels).astype(np.float64)
+            spectrum = (np.fft.rfft(one_hot, n=self._fft_size, axis=1) * self._kernels).sum(axis=0)
+            full = np.fft.irfft(spectrum, n=self._fft_size)
+            logits[lo:hi] = full[self.width - 1 : self.width - 1 + hi - lo]
+        logits += self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def predict_proba(self, df, as_pandas=True):
+        """
+        TabularPredictor-compatible entry point for B1..Bn DataFrames.
+        """
+        values = df[[f"B{i + 1}" for i in range(self.width)]].to_numpy(dtype="U1")
+        windows = ENCODE_TABLE[np.minimum(values.view(np.uint32), 255)]
+        proba_true = self.predict_true_proba(windows)
+        if not as_pandas:
+            return np.column_stack([1.0 - proba_true, proba_true])
+        return pd.DataFrame({"false": 1.0 - proba_true, "true": proba_true}, index=df.index)
+
+    def save(self, directory):
+        """
+        Writes the weight matrix and a JSON manifest holding the bias and the metadata (teacher
+        and agreement report).
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, WEIGHTS_FILE), self.weights)
+        manifest = {
+            "format": DISTILLED_FORMAT,
+            "width": self.width,
+            "bias": self.bias,
+            "metadata": self.metadata,
+        }
+        with open(os.path.join(directory, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+
+def load_distilled(directory, chunk_size=1 << 16):
+    """
+    Loads a student written by DistilledScorer.save (numpy only).
+
+    :param directory: Directory containing manifest.json
+    :return: DistilledScorer
+    """
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != DISTILLED_FORMAT:
+        raise ValueError(f"{directory} is not a distilled zone model (format {manifest.get('format')!r})")
+    weights = np.load(os.path.join(directory, WEIGHTS_FILE))
+    return DistilledScorer(weights, manifest["bias"], chunk_size=chunk_size, metadata=manifest["metadata"])
@@ -0,0 +1,281 @@
+import json
+import logging
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from api.sequence import NUCLEOTIDES, UNKNOWN_CODE, ENCODE_TABLE
+
+logger = logging.getLogger(__name__)
+
+FEATURE_NAME = re.compile(r"^B(\d+)$")
+
+# Exported model directories contain this manifest next to the LightGBM text models.
+EXPORT_FORMAT = "genetic-zone-lightgbm/1"
+MANIFEST_FILE = "manifest.json"
+LUTS_FILE = "luts.npz"
+
+
+class UnsupportedModelError(Exception):
+    """Raised when a predictor cannot be compiled to the fast path."""
+
+
+class CompiledMember:
+    """
+    One LightGBM booster of a compiled predictor.
+
+    :param booster: lightgbm.Booster
+    :param columns: Raw window positions (0-based) feeding each booster feature, in booster order
+    :param lut: float32 array (len(columns), len(NUCLEOTIDES) + 1) mapping a nucleotide code at
+                each feature to the value the booster was trained on (NaN for unseen categories)
+    :param weight: Weight of this booster in the final probability
+    """
+    def __init__(self, booster, columns, lut, weight):
+        self.booster = booster
+        self.columns = np.asarray(columns, dtype=np.intp)
+        self.lut = lut
+        self.weight = weight
+        self._rows = np.arange(len(self.columns))
+
+    def predict(self, windows):
+        features = self.lut[self._rows, windows[:, self.columns]]
+        return self.booster.predict(features)
+
+
+class CompiledPredictor:
+    """
+    Fast-path scorer extracted from a fitted TabularPredictor.
+
+    AutoGluon's predict_proba runs the full feature pipeline (type inference, category mapping,
+    DataFrame copies) on every call. For the fixed B1..Bn categorical schema that work is
+    identical each time, so it is done once here: the fitted category mappings are folded into
+    per-feature lookup tables and the best model's LightGBM boosters are called directly on
+    NumPy arrays built from encoded uint8 windows.
+    """
+    def __init__(self, members, width, positive_index=1, chunk_size=16384):
+        self.members = members
+        self.width = width
+        self.positive_index = positive_index
+        self.chunk_size = chunk_size
+
+    def predict_true_proba(self, windows):
+        """
+        :param windows: uint8 matrix (n_windows, width) of nucleotide codes
+        :return: float64 array with the probability of the positive ('true') class per window
+        """
+        proba = np.zeros(len(windows), dtype=np.float64)
+        for start in range(0, len(windows), self.chunk_size):
+            chunk = windows[start : start + self.chunk_size]
+            for member in self.members:
+                proba[start : start + len(chunk)] += member.weight * member.predict(chunk)
+        if self.positive_index == 0:
+            proba = 1.0 - proba
+        return proba
+
+    def predict_proba(self, df, as_pandas=True):
+        """
+        TabularPredictor-compatible entry point for B1..Bn DataFrames, so an exported model can
+        stand in wherever a predictor is expected.
+        """
+        values = df[[f"B{i + 1}" for i in range(self.width)]].to_numpy(dtype="U1")
+        windows = ENCODE_TABLE[np.minimum(values.view(np.uint32), 255)]
+        proba_true = self.predict_true_proba(windows)
+        if not as_pandas:
+            return np.column_stack([1.0 - proba_true, proba_true])
+        return pd.DataFrame({"false": 1.0 - proba_true, "true": proba_true}, index=df.index)
+
+    def save(self, directory, metadata=None):
+        """
+        Writes the compiled predictor as plain LightGBM text models plus a JSON manifest and the
+        lookup tables. Loading it back (load_exported) only needs numpy and lightgbm.
+
+        :param directory: Output directory (created if needed)
+        :param metadata: Optional JSON-serializable dictionary stored in the manifest
+        """
+        os.makedirs(directory, exist_ok=True)
+        members = []
+        luts = {}
+        for i, member in enumerate(self.members):
+            model_file = f"member_{i}.txt"
+            member.booster.save_model(os.path.join(directory, model_file))
+            luts[f"member_{i}"] = member.lut
+            members.append({
+                "model_file": model_file,
+                "weight": member.weight,
+                "columns": member.columns.tolist(),
+            })
+        np.savez(os.path.join(directory, LUTS_FILE), **luts)
+        manifest = {
+            "format": EXPORT_FORMAT,
+            "width": self.width,
+            "positive_index": self.positive_index,
+            "members": members,
+            "metadata": metadata or {},
+        }
+        with open(os.path.join(directory, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+
+def compile_predictor(predictor, verify_rows=512, tolerance=1e-6, seed=0):
+    """
+    Compiles a binary TabularPredictor trained on B1..Bn nucleotide columns into a
+    CompiledPredictor.
+
+    Supported best models are LightGBM, bagged LightGBM and weighted ensembles of those. The
+    compiled scorer is checked against predictor.predict_proba on random windows before it is
+    returned.
+
+    :param predictor: Loaded autogluon.tabular.TabularPredictor
+    :param verify_rows: Number of random windows used for the equivalence check
+    :param tolerance: Maximum absolute probability difference accepted by the check
+    :return: CompiledPredictor
+    :raises UnsupportedModelError: if the model type or schema is not supported, or the check fails
+    """
+    if predictor.problem_type != "binary":
+        raise UnsupportedModelError(f"problem type '{predictor.problem_type}' is not binary")
+    features = list(predictor.original_features)
+    if features != [f"B{i + 1}" for i in range(len(features))]:
+        raise UnsupportedModelError("input features are not B1..Bn")
+    width = len(features)
+
+    trainer = predictor._trainer
+    members = []
+    for model, weight in _leaf_models(trainer, trainer.load_model(predictor.model_best), 1.0):
+        members.append(_compile_lgb(predictor, model, weight, width))
+
+    positive_index = predictor._learner.label_cleaner.inv_map[predictor.positive_class]
+    compiled = CompiledPredictor(members, width, positive_index=positive_index)
+
+    max_error = verify_compiled(predictor, compiled, rows=verify_rows, seed=seed)
+    if max_error > tolerance:
+        raise UnsupportedModelError(
+            f"compiled probabilities differ from predict_proba by up to {max_error:.3g}"
+        )
+    return compiled
+
+
+def load_exported(directory, chunk_size=16384):
+    """
+    Loads a predictor written by CompiledPredictor.save without importing AutoGluon.
+
+    :param directory: Export directory containing manifest.json
+    :return: CompiledPredictor
+    """
+    import lightgbm
+
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != EXPORT_FORMAT:
+        raise ValueError(f"{directory} is not an exported zone model (format {manifest.get('format')!r})")
+    luts = np.load(os.path.join(directory, LUTS_FILE))
+    members = [
+        CompiledMember(
+            lightgbm.Booster(model_file=os.path.join(directory, member["model_file"])),
+            member["columns"],
+            luts[f"member_{i}"],
+            member["weight"],
+        )
+        for i, member in enumerate(manifest["members"])
+    ]
+    return CompiledPredictor(members, manifest["width"], manifest["positive_index"], chunk_size=chunk_size)
+
+
+def verify_compiled(predictor, compiled, rows=512, seed=0):
+    """
+    Scores random windows through both the compiled path and predictor.predict_proba.
+
+    :return: Maximum absolute difference between the two positive-class probabilities
+    """
+    rng = np.random.default_rng(seed)
+    windows = rng.integers(0, len(NUCLEOTIDES), size=(rows, compiled.width), dtype=np.uint8)
+    alphabet = np.array(list(NUCLEOTIDES), dtype=object)
+    df = pd.DataFrame(alphabet[windows], columns=[f"B{i + 1}" for i in range(compiled.width)])
+    expected = predictor.predict_proba(df, as_pandas=True)[predictor.positive_class].to_numpy()
+    return float(np.max(np.abs(compiled.predict_true_proba(windows) - expected)))
+
+
+def _leaf_models(trainer, model, weight):
+    """
+    Flattens weighted ensembles and bags into (leaf model, weight) pairs.
+    """
+    from autogluon.core.models import BaggedEnsembleModel
+    from autogluon.core.models.ensemble.weighted_ensemble_model import WeightedEnsembleModel
+
+    if isinstance(model, WeightedEnsembleModel):
+        leaves = []
+        for name, base_weight in model._get_model_weights().items():
+            if base_weight > 0:
+                leaves += _leaf_models(trainer, trainer.load_model(name), weight * base_weight)
+        return leaves
+    if isinstance(model, BaggedEnsembleModel):
+        if not model.models:
+            raise UnsupportedModelError(f"bagged model '{model.name}' has no children")
+        if getattr(model, "stack_column_prefix_lst", None):
+            raise UnsupportedModelError(f"stacked model '{model.name}' uses other models' predictions")
+        children = [model.load_child(child) for child in model.models]
+        return [(child, weight / len(children)) for child in children]
+    return [(model, weight)]
+
+
+def _compile_lgb(predictor, model, weight, width):
+    from autogluon.tabular.models import LGBModel
+
+    if not isinstance(model, LGBModel):
+        raise UnsupportedModelError(f"model '{model.name}' ({type(model).__name__}) is not LightGBM")
+    booster = model.model
+    if booster.params.get("objective") not in ("binary", None):
+        raise UnsupportedModelError(f"model '{model.name}' uses objective '{booster.params.get('objective')}'")
+
+    # Push one probe row per nucleotide code through the fitted pipeline to learn, for every
+    # booster feature, which value each nucleotide becomes.
+    alphabet = list(NUCLEOTIDES) + [None]
+    probe = pd.DataFrame([[n] * width for n in alphabet], columns=[f"B{i + 1}" for i in range(width)])
+    X = model.preprocess(predictor.transform_features(probe))
+    if list(X.columns) != booster.feature_name():
+        raise UnsupportedModelError(f"model '{model.name}' reorders or renames its features")
+
+    columns = []
+    lut = np.full((len(X.columns), UNKNOWN_CODE + 1), np.nan, dtype=np.float32)
+    pandas_categorical = iter(booster.pandas_categorical or [])
+    for j, name in enumerate(X.columns):
+        match = FEATURE_NAME.match(name)
+        if match is None:
+            raise UnsupportedModelError(f"model '{model.name}' uses derived feature '{name}'")
+        columns.append(int(match.group(1)) - 1)
+        values = X[name]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # LightGBM replaces category values by their index in the training categories.
+            categories = list(next(pandas_categorical))
+            for code, value in enumerate(values):
+                if not pd.isna(value) and value in categories:
+                    lut[j, code] = categories.index(value)
+        elif pd.api.types.is_numeric_dtype(values.dtype):
+            lut[j, :] = values.to_numpy(dtype=np.float32)
+        else:
+            raise UnsupportedModelError(f"model '{model.name}' feature '{name}' has dtype {values.dtype}")
+    return CompiledMember(booster, columns, lut, weight)
+
+
+if __name__ == "__main__":
+    # Equivalence check of the fast path for every configured zone:
+    #   python -m api.fast_inference [rows]
+    import sys
+
+    from autogluon.tabular import TabularPredictor
+
+    from api.config import MODEL_PATHS
+
+    logging.basicConfig(level=logging.INFO)
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for zone, paths in MODEL_PATHS.items():
+        for path in paths if isinstance(paths, list) else [paths]:
+            predictor = TabularPredictor.load(path, require_py_version_match=False)
+            try:
+                compiled = compile_predictor(predictor)
+            except UnsupportedModelError as e:
+                logger.info(f"{zone} ({path}): not compiled, {e}")
+                continue
+            error = verify_compiled(predictor, compiled, rows=rows, seed=1)
+            logger.info(f"{zone} ({path}): {len(compiled.members)} boosters, max |diff| over {rows} windows = {error:.3g}")
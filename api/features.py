@@ -0,0 +1,255 @@
+"""
+Feature encoders shared by training (training/train_models.py) and serving (GeneticZoneEvaluator).
+
+The zone models were trained on one categorical column per window position (B1..Bn), which
+for ZE/EZ means 550 categorical features per row. An encoder turns the uint8 code windows into
+a compact numeric feature matrix instead:
+
+    kmer:k=3        counts of every k-mer in the window (4**k features)
+    gc:size=50      GC fraction of consecutive sub-windows of 'size' bases
+    onehot          one uint8 0/1 column per (position, nucleotide)
+
+Encoders combine with '+', e.g. 'kmer:k=3+gc:size=50'. A predictor trained on encoded
+features carries its encoder spec in feature_encoder.json, which the evaluator reads at load
+time so the same features are built at inference.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from api.sequence import NUCLEOTIDES, UNKNOWN_CODE, window_matrix
+
+FEATURE_ENCODER_FILE = "feature_encoder.json"
+
+
+class FeatureEncoder:
+    """
+    Base class. Subclasses implement feature_names and encode; scan may be overridden with an
+    incremental version for contiguous sliding windows.
+    """
+    name = None
+
+    def params(self):
+        return {}
+
+    def spec(self):
+        params = ",".join(f"{key}={value}" for key, value in self.params().items())
+        return f"{self.name}:{params}" if params else self.name
+
+    def feature_names(self, width):
+        raise NotImplementedError
+
+    def encode(self, windows):
+        """
+        :param windows: uint8 matrix (n_windows, width) of nucleotide codes
+        :return: Feature matrix (n_windows, len(feature_names(width)))
+        """
+        raise NotImplementedError
+
+    def scan(self, codes, width):
+        """
+        Features of every window codes[s : s + width] of a contiguous segment.
+        """
+        n_windows = max(len(codes) - width + 1, 0)
+        return self.encode(window_matrix(codes, np.arange(n_windows), width))
+
+    def frame(self, features, width):
+        """
+        :return: DataFrame with the columns the model was trained on
+        """
+        return pd.DataFrame(features, columns=self.feature_names(width))
+
+
+class KmerCountEncoder(FeatureEncoder):
+    """
+    Count of every k-mer in the window. k-mers containing an unknown base are not counted.
+    """
+    name = "kmer"
+
+    DEFAULT_CHUNK_SIZE = 16384
+
+    def __init__(self, k=3, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.k = int(k)
+        self.n_kmers = len(NUCLEOTIDES) ** self.k
+        self.chunk_size = int(chunk_size)  # Windows per scan step; does not change the features
+
+    def params(self):
+        # chunk_size only when set, so that the specs saved with existing models stay unchanged.
+        if self.chunk_size != self.DEFAULT_CHUNK_SIZE:
+            return {"k": self.k, "chunk_size": self.chunk_size}
+        return {"k": self.k}
+
+    def feature_names(self, width):
+        names = [""]
+        for _ in range(self.k):
+            names = [prefix + nucleotide for prefix in names for nucleotide in NUCLEOTIDES]
+        return [f"kmer_{name}" for name in names]
+
+    def kmer_ids(self, codes):
+        """
+        :param codes: uint8 codes, k-mers are read along the last axis
+        :return: intp k-mer index of every k-mer start, -1 where the k-mer has an unknown base
+        """
+        length = codes.shape[-1] - self.k + 1
+        ids = np.zeros(codes.shape[:-1] + (max(length, 0),), dtype=np.intp)
+        valid = np.ones(ids.shape, dtype=bool)
+        for i in range(self.k):
+            part = codes[..., i : i + length]
+            ids = ids * len(NUCLEOTIDES) + np.minimum(part, len(NUCLEOTIDES) - 1)
+            valid &= part < UNKNOWN_CODE
+        ids[~valid] = -1
+        return ids
+
+    def encode(self, windows):
+        ids = self.kmer_ids(windows)
+        rows = np.broadcast_to(np.arange(len(windows))[:, None], ids.shape)
+        keep = ids >= 0
+        counts = np.bincount(rows[keep] * self.n_kmers + ids[keep], minlength=len(windows) * self.n_kmers)
+        return counts.reshape(len(windows), self.n_kmers).astype(np.float32)
+
+    def scan(self, codes, width):
+        """
+        Sliding counts: the first window of each block is counted, then each one-base slide
+        adds the k-mer entering the window and removes the one leaving it (a cumulative sum
+        of +1/-1 updates), so every window costs O(1) updates instead of O(width).
+        """
+        n_windows = max(len(codes) - width + 1, 0)
+        per_window = width - self.k + 1
+        counts = np.empty((n_windows, self.n_kmers), dtype=np.float32)
+        for lo in range(0, n_windows, self.chunk_size):
+            hi = min(lo + self.chunk_size, n_windows)
+            ids = self.kmer_ids(codes[lo : hi + width - 1])
+            updates = np.zeros((hi - lo, self.n_kmers), dtype=np.int32)
+            first = ids[:per_window]
+            updates[0] = np.bincount(first[first >= 0], minlength=self.n_kmers)
+            rows = np.arange(1, hi - lo)
+            entering, leaving = ids[per_window : per_window + len(rows)], ids[: len(rows)]
+            updates[rows[entering >= 0], entering[entering >= 0]] += 1
+            updates[rows[leaving >= 0], leaving[leaving >= 0]] -= 1
+            counts[lo:hi] = np.cumsum(updates, axis=0)
+        return counts
+
+
+class GCContentEncoder(FeatureEncoder):
+    """
+    GC fraction of consecutive sub-windows of 'size' bases (the last one may be shorter).
+    """
+    name = "gc"
+
+    def __init__(self, size=50):
+        self.size = int(size)
+
+    def params(self):
+        return {"size": self.size}
+
+    def edges(self, width):
+        return np.append(np.arange(0, width, self.size), width)
+
+    def feature_names(self, width):
+        return [f"gc_{start}" for start in self.edges(width)[:-1]]
+
+    def _fractions(self, prefix, starts, width):
+        edges = self.edges(width)
+        sums = prefix[starts[:, None] + edges[None, :]]
+        return (np.diff(sums, axis=1) / np.diff(edges)).astype(np.float32)
+
+    def encode(self, windows):
+        is_gc = (windows == 1) | (windows == 2)  # c, g
+        prefix = np.zeros((len(windows), windows.shape[1] + 1), dtype=np.int32)
+        np.cumsum(is_gc, axis=1, out=prefix[:, 1:])
+        edges = self.edges(windows.shape[1])
+        return (np.diff(prefix[:, edges], axis=1) / np.diff(edges)).astype(np.float32)
+
+    def scan(self, codes, width):
+        """
+        One prefix sum over the segment serves every window.
+        """
+        n_windows = max(len(codes) - width + 1, 0)
+        prefix = np.zeros(len(codes) + 1, dtype=np.int64)
+        np.cumsum((codes == 1) | (codes == 2), out=prefix[1:])
+        return self._fractions(prefix, np.arange(n_windows), width)
+
+
+class OneHotEncoder(FeatureEncoder):
+    """
+    One uint8 0/1 column per (position, nucleotide); an unknown base has all four at 0. One byte
+    per cell instead of a Python string object per categorical cell.
+    """
+    name = "onehot"
+
+    def feature_names(self, width):
+        return [f"B{i + 1}_{nucleotide}" for i in range(width) for nucleotide in NUCLEOTIDES]
+
+    def encode(self, windows):
+        one_hot = windows[:, :, None] == np.arange(len(NUCLEOTIDES), dtype=np.uint8)
+        return one_hot.reshape(len(windows), -1).view(np.uint8)
+
+
+class CombinedEncoder(FeatureEncoder):
+    """
+    Concatenation of several encoders ('kmer:k=3+gc:size=50').
+    """
+    def __init__(self, parts):
+        self.parts = parts
+
+    def spec(self):
+        return "+".join(part.spec() for part in self.parts)
+
+    def feature_names(self, width):
+        return [name for part in self.parts for name in part.feature_names(width)]
+
+    def encode(self, windows):
+        return np.hstack([part.encode(windows).astype(np.float32) for part in self.parts])
+
+    def scan(self, codes, width):
+        return np.hstack([part.scan(codes, width).astype(np.float32) for part in self.parts])
+
+
+ENCODERS = {encoder.name: encoder for encoder in (KmerCountEncoder, GCContentEncoder, OneHotEncoder)}
+
+
+def get_encoder(spec):
+    """
+    Builds an encoder from a spec such as 'kmer:k=3', 'gc:size=50', 'onehot' or a '+' combination.
+
+    :raises ValueError: for an unknown encoder or parameter
+    """
+    parts = []
+    for part in spec.split("+"):
+        name, _, params = part.strip().partition(":")
+        if name not in ENCODERS:
+            raise ValueError(f"Unknown feature encoder '{name}' (use one of {', '.join(ENCODERS)})")
+        kwargs = dict(param.split("=", 1) for param in params.split(",") if param)
+        try:
+            parts.append(ENCODERS[name](**kwargs))
+        except TypeError as e:
+            raise ValueError(f"Invalid parameters for feature encoder '{name}': {e}") from None
+    return parts[0] if len(parts) == 1 else CombinedEncoder(parts)
+
+
+def save_encoder(encoder, directory):
+    with open(os.path.join(directory, FEATURE_ENCODER_FILE), "w") as f:
+        json.dump({"spec": encoder.spec()}, f)
+
+
+def load_encoder(directory):
+    """
+    :return: The encoder a predictor directory was trained with, or None for raw B1..Bn columns
+    """
+    path = os.path.join(directory, FEATURE_ENCODER_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return get_encoder(json.load(f)["spec"])
+
+
+def frame_to_codes(df):
+    """
+    Converts categorical B columns (categories in DECODE_ALPHABET order, as read by
+    training/train_models.read_zone_data) into a uint8 code matrix; missing values become 'n'.
+    """
+    codes = np.stack([df[col].cat.codes.to_numpy() for col in df.columns], axis=1)
+    codes[codes < 0] = UNKNOWN_CODE
+    return codes.astype(np.uint8)
@@ -0,0 +1,218 @@
+import threading
+import time
+
+# Upper bounds (seconds) of the duration histogram buckets exposed on /metrics.
+DEFAULT_DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Stage:
+    """
+    One timed stage of a zone evaluation (e.g. 'enumerate', 'frame', 'predict_proba', 'rank').
+    """
+    __slots__ = ("zone", "name", "seconds", "windows", "bytes", "_start")
+
+    def __init__(self, zone, name):
+        self.zone = zone
+        self.name = name
+        self.seconds = 0.0
+        self.windows = 0
+        self.bytes = 0
+        self._start = 0.0
+
+    def record(self, windows=None, nbytes=None):
+        """
+        Attaches the stage's window count and allocated bytes.
+
+        :param windows: Number of windows handled by the stage
+        :param nbytes: Callable returning the size in bytes of what the stage built. It is only
+                       called when instrumentation is enabled.
+        """
+        if windows is not None:
+            self.windows = windows
+        if nbytes is not None:
+            self.bytes = int(nbytes())
+
+    def as_dict(self):
+        return {"seconds": self.seconds, "windows": self.windows, "bytes": self.bytes}
+
+
+class StageRecorder:
+    """
+    Collects per-zone, per-stage measurements for a single evaluation.
+
+    Usage inside the evaluator:
+
+        with recorder.stage("ze", "frame") as stage:
+            df = ...
+            stage.record(windows=len(df), nbytes=lambda: frame_nbytes(df))
+    """
+    enabled = True
+
+    def __init__(self):
+        self.stages = []
+
+    def stage(self, zone, name):
+        return _StageContext(self, Stage(zone, name))
+
+    def summary(self):
+        """
+        :return: Dictionary zone -> stage -> {'seconds', 'windows', 'bytes'}. Repeated stages
+                 of the same zone are summed.
+        """
+        summary = {}
+        for stage in self.stages:
+            entry = summary.setdefault(stage.zone, {}).setdefault(
+                stage.name, {"seconds": 0.0, "windows": 0, "bytes": 0}
+            )
+            entry["seconds"] += stage.seconds
+            entry["windows"] += stage.windows
+            entry["bytes"] += stage.bytes
+        return summary
+
+
+class _StageContext:
+    __slots__ = ("recorder", "stage")
+
+    def __init__(self, recorder, stage):
+        self.recorder = recorder
+        self.stage = stage
+
+    def __enter__(self):
+        self.stage._start = time.perf_counter()
+        return self.stage
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stage.seconds = time.perf_counter() - self.stage._start
+        self.recorder.stages.append(self.stage)
+        return False
+
+
+class _NullStage:
+    """Stage stand-in used when instrumentation is disabled; every call is a no-op."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def record(self, windows=None, nbytes=None):
+        pass
+
+
+class NullRecorder:
+    """
+    Recorder used when instrumentation is disabled. stage() returns a shared no-op context,
+    so the instrumented code paths cost a method call per stage and nothing else.
+    """
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, zone, name):
+        return self._stage
+
+    def summary(self):
+        return {}
+
+
+NULL_RECORDER = NullRecorder()
+
+
+def frame_nbytes(df):
+    """Shallow size in bytes of a DataFrame (column buffers and index)."""
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus sense (le buckets, sum and count)."""
+    def __init__(self, buckets=DEFAULT_DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Process-wide aggregation of StageRecorder results, rendered in the Prometheus text
+    exposition format by the /metrics endpoint.
+    """
+    def __init__(self, buckets=DEFAULT_DURATION_BUCKETS):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self.stage_seconds = {}   # (zone, stage) -> Histogram
+        self.stage_windows = {}   # (zone, stage) -> total windows
+        self.stage_bytes = {}     # (zone, stage) -> total bytes
+        self.request_seconds = Histogram(buckets)
+
+    def observe(self, recorder, request_seconds=None):
+        """
+        Adds every stage collected by a recorder (and optionally the request duration).
+        """
+        with self._lock:
+            for stage in recorder.stages if recorder.enabled else ():
+                key = (stage.zone, stage.name)
+                if key not in self.stage_seconds:
+                    self.stage_seconds[key] = Histogram(self._buckets)
+                    self.stage_windows[key] = 0
+                    self.stage_bytes[key] = 0
+                self.stage_seconds[key].observe(stage.seconds)
+                self.stage_windows[key] += stage.windows
+                self.stage_bytes[key] += stage.bytes
+            if request_seconds is not None:
+                self.request_seconds.observe(request_seconds)
+
+    def render(self):
+        """
+        :return: The metrics as Prometheus text exposition format (version 0.0.4).
+        """
+        with self._lock:
+            lines = [
+                "# HELP genetic_zone_stage_duration_seconds Duration of each evaluation stage per zone.",
+                "# TYPE genetic_zone_stage_duration_seconds histogram",
+            ]
+            for (zone, stage), histogram in sorted(self.stage_seconds.items()):
+                labels = f'zone="{zone}",stage="{stage}"'
+                lines.extend(_render_histogram("genetic_zone_stage_duration_seconds", labels, histogram))
+
+            lines += [
+                "# HELP genetic_zone_stage_windows_total Windows processed by each evaluation stage per zone.",
+                "# TYPE genetic_zone_stage_windows_total counter",
+            ]
+            for (zone, stage), windows in sorted(self.stage_windows.items()):
+                lines.append(f'genetic_zone_stage_windows_total{{zone="{zone}",stage="{stage}"}} {windows}')
+
+            lines += [
+                "# HELP genetic_zone_stage_bytes_total Bytes allocated by each evaluation stage per zone.",
+                "# TYPE genetic_zone_stage_bytes_total counter",
+            ]
+            for (zone, stage), nbytes in sorted(self.stage_bytes.items()):
+                lines.append(f'genetic_zone_stage_bytes_total{{zone="{zone}",stage="{stage}"}} {nbytes}')
+
+            lines += [
+                "# HELP genetic_zone_request_duration_seconds Duration of /predict evaluations.",
+                "# TYPE genetic_zone_request_duration_seconds histogram",
+            ]
+            lines.extend(_render_histogram("genetic_zone_request_duration_seconds", "", self.request_seconds))
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(name, labels, histogram):
+    prefix = f"{labels}," if labels else ""
+    lines = [
+        f'{name}_bucket{{{prefix}le="{bound}"}} {count}'
+        for bound, count in zip(histogram.buckets, histogram.counts)
+    ]
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
@@ -1,9 +1,17 @@
 import sys
 import os
+import json
+import time
+import secrets
 import asyncio
+import concurrent.futures
+import contextlib
+import gc
 import logging
-from fastapi import FastAPI, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from typing import Annotated
+from fastapi import FastAPI, Header, HTTPException, Query, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.exceptions import RequestValidationError
 
 # Get the absolute path of the current file's directory (api)
@@ -15,9 +23,53 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # Now imports from the 'api' package should work
-from api.GeneticZoneEvaluator import GeneticZoneEvaluator # Import your class
-from api.config import MODEL_PATHS                 # Import model paths from config
-from api.models import PredictionRequest, PredictionResponse # Import Pydantic models
+from api.config import (                           # Import settings from config
+    MODEL_PATHS,
+    MIN_SEQUENCE_LENGTH,
+    MODEL_BACKEND,
+    EXPORTED_MODEL_PATHS,
+    DISTILLED_MODEL_PATHS,
+    DISTILLED_ZONES,
+    FAST_PATH_ENABLED,
+    PERSIST_MODELS,
+    WARMUP_WINDOWS,
+    MODEL_RELOAD_ENABLED,
+    MODEL_WATCH_INTERVAL,
+    RELOAD_DRAIN_SECONDS,
+    BATCH_MAX_WINDOWS,
+    BATCH_MAX_WAIT,
+    SCHEDULER_WORKERS,
+    SCHEDULER_WORK_UNIT,
+    SCHEDULER_AGING_HALF_LIFE,
+    SCHEDULER_RESERVED_WORKERS,
+    SCHEDULER_SMALL_JOB_COST,
+    DEFAULT_DEADLINE_SECONDS,
+    DISCONNECT_POLL_INTERVAL,
+    PAIRWISE_ENABLED,
+    PAIRWISE_MODEL_PATHS,
+    PAIRWISE_THRESHOLD,
+    CASCADE_STRIDE,
+    CASCADE_CANDIDATES,
+    CASCADE_MARGIN,
+    VARIANT_CACHE_ENTRIES,
+    INSTRUMENTATION_ENABLED,
+    PROFILING_ENABLED,
+    PROFILING_ADMIN_TOKEN,
+    PROFILING_OUTPUT_DIR,
+    PROFILING_SAMPLE_INTERVAL,
+    STREAM_QUEUE_EVENTS,
+    STREAM_TILE_SIZE,
+    UPLOAD_MAX_BASES,
+    WORKER_HEARTBEAT_INTERVAL,
+    WORKER_STALE_SECONDS,
+)
+from api.models import PredictionParameters, PredictionRequest, PredictionResponse, ProfileRequest, ReloadRequest, VariantRequest, VariantResponse # Import Pydantic models
+from api.cancellation import CancellationStats, CancellationToken, EvaluationCancelled
+from api.instrumentation import NULL_RECORDER, MetricsRegistry, StageRecorder
+from api.profiling import Profiler
+from api.sequence import InvalidSequenceError
+from api.upload import SequenceDecoder, UnsupportedUploadError, UploadError, UploadTooLargeError
+from api.variants import ReferenceCache, Variant, render_variant_metrics, sequence_digest
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,28 +84,312 @@ app = FastAPI(
 # --- Global Variables ---
 # Load the evaluator globally when the application starts.
 evaluator = None
+# Progress of the model load, served on /readyz: overall status ('starting', 'loading',
+# 'ready' or 'failed'), per-zone state, start/finish timestamps and the load error.
+load_state = {"status": "starting", "zones": {}, "started": None, "finished": None, "error": None}
+# Background task loading the models under plain uvicorn (kept referenced until it finishes).
+loader_task = None
+# Progress of the last hot reload, served on GET /admin/reload.
+reload_state = {"status": "idle", "zones": {}, "started": None, "finished": None, "error": None, "generation": 0}
+reload_task = None
+# Number of requests still using each evaluator, keyed by the evaluator itself (not its id,
+# which a later object may reuse), so a replaced one is released only once they finish.
+in_flight = {}
+# Aggregated per-stage instrumentation served on /metrics.
+metrics = MetricsRegistry()
+# Evaluations cancelled by a client disconnect or deadline, served on /metrics.
+cancellations = CancellationStats()
+# Window scores of recent references for /predict/variants, keyed by (reload generation, digest)
+reference_cache = ReferenceCache(VARIANT_CACHE_ENTRIES)
+# On-demand profiler; wraps evaluator.evaluate only while an admin session is armed.
+profiler = Profiler(PROFILING_OUTPUT_DIR, sample_interval=PROFILING_SAMPLE_INTERVAL)
+# Shortest-job-first scheduler of evaluations (api/scheduler.py), created on first use.
+scheduler = None
+# Set by the pre-fork server (api/serve.py) in each worker: the shared WorkerTable and this
+# worker's slot in it. None when the app runs under plain uvicorn.
+worker_table = None
+worker_slot = None
 
 # --- Application Startup Event ---
-@app.on_event("startup")
-async def load_models():
+def set_zone_state(zone, state):
+    load_state["zones"][zone] = state
+
+def configured_sources():
     """
-    Load the GeneticZoneEvaluator models when the FastAPI application starts.
+    Where each zone is loaded from under the current configuration.
+
+    :return: Dictionary zone -> (backend, path or list of paths); backend is 'autogluon',
+             'exported' or 'distilled'
+    """
+    paths = EXPORTED_MODEL_PATHS if MODEL_BACKEND == "exported" else MODEL_PATHS
+    return {
+        zone: ("distilled", DISTILLED_MODEL_PATHS[zone]) if zone in DISTILLED_ZONES else (MODEL_BACKEND, path)
+        for zone, path in paths.items()
+    }
+
+def build_evaluator(zones=None, progress=None):
+    """
+    Loads (and warms up) a GeneticZoneEvaluator for the given zones of the configured backend.
+    Raises if a model cannot be loaded.
+
+    :param zones: Zones to load, all configured zones by default
+    :param progress: Passed to GeneticZoneEvaluator (per-zone load states)
+    """
+    # Imported here so that importing the app (and answering /healthz) does not wait for
+    # pandas and the model libraries.
+    from api.GeneticZoneEvaluator import PAIRWISE_MODELS, GeneticZoneEvaluator
+
+    paths = {"autogluon": {}, "exported": {}, "distilled": {}}
+    for zone, (backend, path) in configured_sources().items():
+        if zones is None or zone in zones:
+            paths[backend][zone] = path
+    # A pairwise model is (re)loaded with the zones whose hits it rescores; a reload of only
+    # some of them keeps the loaded one (see with_zones).
+    pairwise_paths = {
+        name: path for name, path in PAIRWISE_MODEL_PATHS.items()
+        if PAIRWISE_ENABLED and (zones is None or all(zone in zones for zone, used in PAIRWISE_MODELS.items() if used == name))
+    }
+    loaded = GeneticZoneEvaluator(
+        paths["autogluon"],
+        compile_models=FAST_PATH_ENABLED,
+        persist_models=PERSIST_MODELS,
+        exported_paths=paths["exported"],
+        distilled_paths=paths["distilled"],
+        progress=progress,
+        cascade_stride=CASCADE_STRIDE,
+        cascade_candidates=CASCADE_CANDIDATES,
+        cascade_margin=CASCADE_MARGIN,
+        batch_max_windows=BATCH_MAX_WINDOWS,
+        batch_max_wait=BATCH_MAX_WAIT,
+        pairwise_paths=pairwise_paths,
+        pairwise_threshold=PAIRWISE_THRESHOLD,
+    )
+    if WARMUP_WINDOWS:
+        # Readiness (a non-None evaluator) is only reported once every zone has run.
+        loaded.warm_up(WARMUP_WINDOWS)
+    return loaded
+
+def create_evaluator():
+    """
+    Builds the GeneticZoneEvaluator for the configured backend, recording its progress in
+    load_state. Returns None (and logs the error) if the models cannot be loaded.
     """
-    global evaluator
     logger.info("Loading Genetic Zone Evaluator models...")
+    load_state.update(status="loading", started=time.time(), finished=None, error=None)
+    load_state["zones"] = {zone: "pending" for zone in configured_sources()}
     try:
-        evaluator = GeneticZoneEvaluator(MODEL_PATHS)
+        loaded = build_evaluator(progress=set_zone_state)
+        for zone, state in load_state["zones"].items():
+            if state == "loaded":
+                load_state["zones"][zone] = "ready"
+        load_state.update(status="ready", finished=time.time())
         logger.info("Models loaded successfully.")
+        return loaded
     except Exception as e:
+        load_state.update(status="failed", finished=time.time(), error=str(e))
+        for zone, state in load_state["zones"].items():
+            if state != "ready":
+                load_state["zones"][zone] = "failed"
         logger.error(f"Fatal error: Could not load models. API will not function correctly. Error: {e}", exc_info=True)
-        evaluator = None # Ensure evaluator is None if loading failed
+        return None # Ensure evaluator is None if loading failed
+
+@app.on_event("startup")
+async def load_models():
+    """
+    Starts loading the GeneticZoneEvaluator models in the background, so the server listens
+    (and answers /healthz) right away; /readyz reports the progress and /predict answers 503
+    until the load is done. Under the pre-fork server (api/serve.py) the master has already
+    loaded them and the worker only reports itself ready.
+    """
+    global loader_task
+    if evaluator is None:
+        loader_task = asyncio.get_running_loop().create_task(load_in_background())
+    else:
+        report_worker_ready()
+    if MODEL_WATCH_INTERVAL > 0:
+        asyncio.get_running_loop().create_task(watch_models())
+
+async def load_in_background():
+    """
+    Runs create_evaluator in a thread so the event loop keeps serving while the models load.
+    """
+    global evaluator
+    loaded = await asyncio.get_running_loop().run_in_executor(None, create_evaluator)
+    if loaded is not None:
+        evaluator = loaded
+        report_worker_ready()
+
+def report_worker_ready():
+    if worker_table is not None and evaluator is not None:
+        worker_table.mark_ready(worker_slot, evaluator.predictor)
+        asyncio.get_running_loop().create_task(worker_heartbeat())
+
+async def worker_heartbeat():
+    """
+    Refreshes this worker's heartbeat in the shared worker table; a stale heartbeat marks the
+    worker unready on /health/workers (e.g. a blocked event loop).
+    """
+    while True:
+        worker_table.heartbeat(worker_slot)
+        await asyncio.sleep(WORKER_HEARTBEAT_INTERVAL)
+
+# --- Hot Reload ---
+@contextlib.contextmanager
+def lease_evaluator():
+    """
+    Hands out the current evaluator and counts the request as using it until the block exits,
+    so a reload swapping in a new evaluator knows when the replaced one has drained.
+    """
+    current = evaluator
+    in_flight[current] = in_flight.get(current, 0) + 1
+    try:
+        yield current
+    finally:
+        in_flight[current] -= 1
+        if not in_flight[current]:
+            del in_flight[current]
+
+def set_reload_zone_state(zone, state):
+    reload_state["zones"][zone] = state
+
+async def reload_models(zones):
+    """
+    Loads and warms up the given zones in a thread while the current evaluator keeps serving,
+    then swaps in an evaluator with the new zones and the untouched ones of the current
+    evaluator (a single assignment, so every request sees either the old or the new models).
+    The replaced evaluator is released, and its micro-batchers of the reloaded zones stopped,
+    once the requests using it finish. If the load fails
+    the current evaluator stays in place.
+
+    :param zones: Zones to reload
+    """
+    global evaluator
+    loop = asyncio.get_running_loop()
+    logger.info(f"Reloading models of zone(s) {', '.join(zones)}...")
+    try:
+        loaded = await loop.run_in_executor(None, build_evaluator, zones, set_reload_zone_state)
+    except Exception as e:
+        reload_state.update(status="failed", finished=time.time(), error=str(e))
+        for zone, state in reload_state["zones"].items():
+            if state != "ready":
+                reload_state["zones"][zone] = "failed"
+        logger.error(f"Reload of zone(s) {', '.join(zones)} failed, keeping the current models. Error: {e}", exc_info=True)
+        return
+
+    previous = evaluator
+    evaluator = previous.with_zones(loaded) if previous is not None else loaded
+    reload_state["generation"] += 1
+    if previous is None:
+        # A full reload after a failed start-up makes the API ready.
+        load_state.update(status="ready", zones=dict.fromkeys(evaluator.predictor, "ready"), finished=time.time(), error=None)
+        report_worker_ready()
+    logger.info(f"Swapped in the reloaded models of zone(s) {', '.join(zones)}.")
+
+    reload_state["status"] = "draining"
+    deadline = time.monotonic() + RELOAD_DRAIN_SECONDS
+    while in_flight.get(previous) and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    if in_flight.get(previous):
+        logger.warning(f"{in_flight[previous]} request(s) still use the replaced models after {RELOAD_DRAIN_SECONDS}s.")
+    if previous is not None:
+        # The new evaluator shares the Concurrency and the batchers of the untouched zones;
+        # those of the replaced zones count only the drained requests. A straggler past the
+        # deadline keeps working, its calls just skip the batcher.
+        previous.close_batchers(zones)
+    del previous, loaded
+    gc.collect()
+    reload_state.update(status="done", finished=time.time())
+
+def start_reload(zones):
+    """
+    Starts a background reload unless one is already running.
+
+    :return: False if a reload is already in progress
+    """
+    global reload_task
+    if reload_task is not None and not reload_task.done():
+        return False
+    reload_state.update(
+        status="loading", zones={zone: "pending" for zone in zones}, started=time.time(), finished=None, error=None
+    )
+    reload_task = asyncio.get_running_loop().create_task(reload_models(zones))
+    return True
+
+def model_signatures():
+    """
+    :return: Dictionary zone -> (name, size, mtime) of the files at the top of the zone's
+             model directories; retraining or re-exporting a model changes it
+    """
+    signatures = {}
+    for zone, (_, paths) in configured_sources().items():
+        entries = []
+        for path in paths if isinstance(paths, list) else [paths]:
+            try:
+                entries.extend(
+                    (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                    for entry in os.scandir(path) if entry.is_file()
+                )
+            except OSError:
+                pass
+        signatures[zone] = sorted(entries)
+    return signatures
+
+async def watch_models():
+    """
+    Polls the model directories every MODEL_WATCH_INTERVAL seconds and reloads the zones whose
+    files changed, once they have stayed unchanged for a whole interval (so a model still
+    being written is not loaded).
+    """
+    loop = asyncio.get_running_loop()
+    served = await loop.run_in_executor(None, model_signatures)
+    previous = served
+    while True:
+        await asyncio.sleep(MODEL_WATCH_INTERVAL)
+        current = await loop.run_in_executor(None, model_signatures)
+        changed = [zone for zone in current if current[zone] != served.get(zone) and current[zone] == previous.get(zone)]
+        previous = current
+        if changed and evaluator is not None and start_reload(changed):
+            logger.info(f"Model files of zone(s) {', '.join(changed)} changed.")
+            served.update({zone: current[zone] for zone in changed})
+
+# --- Readiness Gate ---
+class ReadinessGate:
+    """
+    ASGI middleware answering every /predict* request with 503 (and Retry-After) while the
+    models load, before the request body is read, so clients are turned away immediately
+    instead of uploading a sequence that cannot be scored yet.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and evaluator is None and scope["path"].startswith("/predict"):
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Models are not loaded yet. Retry later.", "status": load_state["status"]},
+                headers={"Retry-After": "5"},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+app.add_middleware(ReadinessGate)
 
 # --- Custom Exception Handlers ---
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    # Sequences may be megabases long. Their errors name the first invalid position and
+    # character, so neither the errors nor the echoed body repeat the sequence itself.
+    errors = [
+        {key: value for key, value in error.items() if key != "input" or error["loc"][-1] != "sequence"}
+        for error in exc.errors()
+    ]
+    body = exc.body
+    if isinstance(body, dict) and isinstance(body.get("sequence"), str):
+        body = {**body, "sequence": f"<{len(body['sequence'])} characters>"}
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={"detail": exc.errors(), "body": exc.body},
+        content=jsonable_encoder({"detail": errors, "body": body}),
     )
 
 @app.exception_handler(Exception)
@@ -72,20 +408,163 @@ async def read_root():
     """
     return {"message": "Welcome to the Genetic Zone Prediction API. Use the /predict endpoint to analyze sequences."}
 
-@app.post("/predict",
-          response_model=PredictionResponse,
-          summary="Predict Genetic Zones",
-          description="Accepts a nucleotide sequence and returns predicted start positions for EI, IE, ZE, and EZ zones. Supports two prediction methods: 'top_n' for top N predictions or 'percentage' for predictions above a probability threshold.",
-          status_code=status.HTTP_200_OK)
-async def predict_zones(request: PredictionRequest):
+@app.get("/healthz", summary="Liveness", description="200 as soon as the server is listening, whether or not the models are loaded.")
+async def liveness():
+    return {"status": "alive"}
+
+@app.get("/readyz",
+         summary="Readiness",
+         description="Model load progress per zone. 200 once the models are loaded and warmed up, 503 otherwise.")
+async def readiness():
     """
-    Takes a nucleotide sequence and uses the pre-loaded GeneticZoneEvaluator
-    to predict the start positions of different genetic zones.
+    Zone states go pending -> loading -> loaded -> warming -> ready, or 'failed' if the load
+    raised (the error is in 'error').
+    """
+    ready = evaluator is not None
+    started, finished = load_state["started"], load_state["finished"]
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else load_state["status"],
+            "zones": load_state["zones"],
+            "elapsed_seconds": ((finished or time.time()) - started) if started else None,
+            "error": load_state["error"],
+        },
+    )
 
-    Handles potentially long prediction times by running the evaluation
-    in a separate thread pool.
+@app.get("/health/workers",
+         summary="Worker Health",
+         description="Reports whether every worker process has its models loaded. 200 when all are ready, 503 otherwise.")
+async def worker_health():
+    """
+    Under the pre-fork server this reads the table shared by all workers, so any worker
+    answers for all of them; under plain uvicorn it reports the single process. 'models' holds
+    the per-zone load, persist and warm-up measurements of the loaded evaluator.
+    """
+    if worker_table is None:
+        workers = [{
+            "slot": 0,
+            "pid": os.getpid(),
+            "ready": evaluator is not None,
+            "zones": sorted(evaluator.predictor) if evaluator is not None else [],
+        }]
+    else:
+        workers = worker_table.snapshot(stale_after=WORKER_STALE_SECONDS)
+    ready = all(worker["ready"] for worker in workers)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "unavailable",
+            "workers": workers,
+            "models": evaluator.load_report if evaluator is not None else {},
+        },
+    )
+
+@app.get("/metrics",
+         summary="Prometheus Metrics",
+         description="Per-zone, per-stage evaluation histograms in the Prometheus text exposition format.",
+         response_class=PlainTextResponse)
+async def read_metrics():
+    """
+    Exposes the instrumentation collected by GeneticZoneEvaluator (and its micro-batchers) for
+    scraping.
+    """
+    body = metrics.render() + cancellations.render() + render_variant_metrics(reference_cache.stats())
+    if evaluator is not None:
+        from api.batching import render_batch_metrics  # Loaded with the evaluator (pandas)
+        body += render_batch_metrics(evaluator.batch_stats())
+    if scheduler is not None:
+        from api.scheduler import render_scheduler_metrics
+        body += render_scheduler_metrics(scheduler.stats())
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+# --- Admin: On-Demand Profiling ---
+def require_admin(token, enabled):
+    """
+    Guards the admin endpoints: hidden unless their feature is enabled, and only usable with
+    the configured admin token.
+    """
+    if not enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not PROFILING_ADMIN_TOKEN or not token or not secrets.compare_digest(token, PROFILING_ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token.")
+
+@app.post("/admin/profile", summary="Start Profiling", include_in_schema=False)
+async def start_profiling(request: ProfileRequest, x_admin_token: str = Header(default=None)):
+    """
+    Arms a profiling session covering the next N evaluations and/or a time window.
+    """
+    require_admin(x_admin_token, PROFILING_ENABLED)
+    try:
+        session = profiler.start(request.mode, request.calls, request.seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    logger.info(f"Profiling session started: {session}")
+    return session
+
+@app.get("/admin/profile", summary="Profiling Status", include_in_schema=False)
+async def profiling_status(x_admin_token: str = Header(default=None)):
+    """
+    Reports the active session, if any, and the stored profile artifacts.
+    """
+    require_admin(x_admin_token, PROFILING_ENABLED)
+    return {**profiler.status(), "artifacts": profiler.artifacts()}
+
+@app.delete("/admin/profile", summary="Stop Profiling", include_in_schema=False)
+async def stop_profiling(x_admin_token: str = Header(default=None)):
+    """
+    Ends the active session early and writes its artifacts.
+    """
+    require_admin(x_admin_token, PROFILING_ENABLED)
+    return {"artifacts": await asyncio.get_running_loop().run_in_executor(None, profiler.stop)}
+
+@app.get("/admin/profile/artifacts/{name}", summary="Download Profile Artifact", include_in_schema=False)
+async def download_profile_artifact(name: str, x_admin_token: str = Header(default=None)):
+    """
+    Downloads a stored .pstats or .collapsed file.
+    """
+    require_admin(x_admin_token, PROFILING_ENABLED)
+    path = profiler.artifact_path(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Artifact '{name}' not found.")
+    return FileResponse(path, filename=name, media_type="application/octet-stream")
+
+# --- Admin: Model Hot Reload ---
+@app.post("/admin/reload", summary="Reload Models", include_in_schema=False, status_code=status.HTTP_202_ACCEPTED)
+async def reload_zones(request: ReloadRequest, x_admin_token: str = Header(default=None)):
+    """
+    Starts reloading some or all zones from their configured paths; poll GET /admin/reload.
+    """
+    require_admin(x_admin_token, MODEL_RELOAD_ENABLED)
+    configured = configured_sources()
+    zones = [zone for zone in configured if request.zones is None or zone in request.zones]
+    missing = sorted(set(request.zones or []) - set(configured))
+    if missing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Zones not configured: {', '.join(missing)}.")
+    if evaluator is None and len(zones) < len(configured):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="No models are loaded; only a reload of every zone can bring the API up.",
+        )
+    if not start_reload(zones):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A reload is already in progress.")
+    return reload_state
+
+@app.get("/admin/reload", summary="Reload Status", include_in_schema=False)
+async def reload_status(x_admin_token: str = Header(default=None)):
+    """
+    Progress of the last reload: status ('idle', 'loading', 'draining', 'done' or 'failed'),
+    per-zone load states and the number of swaps so far ('generation').
+    """
+    require_admin(x_admin_token, MODEL_RELOAD_ENABLED)
+    return {**reload_state, "in_flight": sum(in_flight.values())}
+
+def require_evaluator():
+    """
+    Raises 503 while the models are not loaded.
     """
-    global evaluator
     if evaluator is None:
         logger.error("Evaluator models are not loaded. Prediction cannot proceed.")
         raise HTTPException(
@@ -93,22 +572,172 @@ async def predict_zones(request: PredictionRequest):
             detail="Models are not loaded or failed to load. Please check server logs."
         )
 
-    logger.info(f"Received prediction request for sequence of length {len(request.sequence)} with method {request.method}.")
+def require_second_stage(params):
+    """
+    Raises 409 when the second stage is requested while a loaded zone has no pairwise model,
+    rather than answering with first-pass hits as if they had been rescored.
+    """
+    if params.second_stage:
+        missing = evaluator.missing_pairwise()
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"second_stage needs a pairwise model, none is loaded for zone(s) {', '.join(missing)}.",
+            )
+
+def new_recorder(params):
+    """
+    Only pay for instrumentation when it is enabled or the caller asked for timings.
+    """
+    if INSTRUMENTATION_ENABLED or params.include_timings:
+        return StageRecorder()
+    return NULL_RECORDER
+
+def record_metrics(recorder, elapsed):
+    """
+    Adds a finished evaluation to /metrics and logs its per-zone stage summary.
+    """
+    if INSTRUMENTATION_ENABLED:
+        metrics.observe(recorder, request_seconds=elapsed)
+        for zone, stages in recorder.summary().items():
+            logger.info(
+                f"Zone {zone}: " + ", ".join(
+                    f"{name} {stage['seconds']:.3f}s/{stage['windows']} windows"
+                    for name, stage in stages.items()
+                )
+            )
+
+def get_scheduler():
+    """
+    :return: The evaluation scheduler, or None when SCHEDULER_WORKERS = 0 or while a profiling
+             session is armed (the profiler profiles evaluate() as a single call)
+    """
+    global scheduler
+    if not SCHEDULER_WORKERS or profiler.session is not None:
+        return None
+    if scheduler is None:
+        from api.scheduler import InferenceScheduler  # Imports the evaluator (pandas)
+        scheduler = InferenceScheduler(
+            SCHEDULER_WORKERS, SCHEDULER_AGING_HALF_LIFE, SCHEDULER_RESERVED_WORKERS, SCHEDULER_SMALL_JOB_COST,
+        )
+    return scheduler
+
+def requested_regions(params):
+    """
+    :return: The per-zone regions of a request, or None. Only JSON bodies (PredictionRequest)
+             carry regions; /predict/upload scans whole sequences.
+    """
+    return getattr(params, "regions", None)
+
+async def new_cancellation(current, sequence, params):
+    """
+    :return: CancellationToken with the request's deadline (or DEFAULT_DEADLINE_SECONDS) and
+             the estimated cost of the evaluation
+    """
+    cancel = CancellationToken.after(params.deadline_seconds or DEFAULT_DEADLINE_SECONDS or None)
+    loop = asyncio.get_running_loop()
+    cancel.cost = await loop.run_in_executor(
+        None, current.estimate_cost, sequence, params.scan, params.strands, requested_regions(params)
+    )
+    return cancel
+
+async def watch_disconnect(request, cancel):
+    """
+    Cancels the evaluation once its client has disconnected. Runs until cancelled itself.
+    """
+    while not cancel.cancelled:
+        if await request.is_disconnected():
+            cancel.cancel("disconnect")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+def cancelled_response(e):
+    """
+    Answers a request whose evaluation was cancelled.
+
+    :return: For a client that disconnected, an empty response: uvicorn drops what is sent to a
+             closed connection, so the request ends without an error being raised or logged
+    :raises HTTPException: 504 when the deadline passed
+    """
+    if e.reason == "deadline":
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Evaluation did not finish before its deadline.")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+async def schedule_evaluation(current, sequence, params, recorder, on_event, cancel, tile_size=None):
+    """
+    Runs current.iter_evaluate in work units through the scheduler, prioritized by its
+    estimated cost (cancel.cost). on_event is called in a scheduler thread with every event.
+    """
+    steps = current.iter_evaluate(
+        sequence, params.method, params.max_number_of_predictions, params.threshold, recorder,
+        params.scan, params.strands, tile_size, SCHEDULER_WORK_UNIT, cancel, requested_regions(params),
+        params.second_stage,
+    )
+    await asyncio.wrap_future(get_scheduler().submit(steps, cancel.cost, on_event))
+
+async def run_prediction(sequence, params, request):
+    """
+    Runs the pre-loaded GeneticZoneEvaluator on an encoded sequence and builds the
+    PredictionResponse body. Shared by /predict and /predict/upload.
+
+    Handles potentially long prediction times by running the evaluation
+    in a separate thread pool. The evaluation is cancelled when the client disconnects or
+    the deadline passes (504).
+
+    :param sequence: EncodedSequence from request validation or an upload decoder
+    :param params: PredictionParameters (or PredictionRequest)
+    :param request: Starlette Request, watched for a client disconnect
+    """
+    require_evaluator()
+    require_second_stage(params)
+    logger.info(f"Received prediction request for sequence of length {len(sequence)} with method {params.method}, {params.scan} scan and {params.strands} strand(s).")
+    recorder = new_recorder(params)
 
     try:
         # Get the current asyncio event loop
         loop = asyncio.get_running_loop()
 
         logger.info("Starting evaluation in executor thread...")
-        results = await loop.run_in_executor(
-            None,  # Use default executor
-            evaluator.evaluate,
-            request.sequence.lower(),  # Pass the sequence from the validated request
-            request.method,  # Pass the prediction method
-            request.max_number_of_predictions,  # Pass max predictions for top_n method
-            request.threshold  # Pass threshold for percentage method
-        )
-        logger.info("Evaluation complete.")
+        started = time.perf_counter()
+        with lease_evaluator() as current:  # Keeps using these models if a reload swaps them meanwhile
+            cancel = await new_cancellation(current, sequence, params)
+            watcher = loop.create_task(watch_disconnect(request, cancel))
+            try:
+                if get_scheduler() is not None:
+                    results, reverse = {}, {}
+
+                    def collect(event):
+                        zone, strand, hits, _ = event
+                        (reverse if strand == "reverse" else results).setdefault(zone, []).extend(hits)
+
+                    await schedule_evaluation(current, sequence, params, recorder, collect, cancel)
+                    if params.strands == "both":
+                        results["reverse"] = reverse
+                else:
+                    results = await loop.run_in_executor(
+                        None,  # Use default executor
+                        profiler.wrap(current.evaluate),  # Returns evaluate itself unless profiling is armed
+                        sequence,  # Encoded, validated sequence
+                        params.method,  # Pass the prediction method
+                        params.max_number_of_predictions,  # Pass max predictions for top_n method
+                        params.threshold,  # Pass threshold for percentage method
+                        recorder,  # Collects per-stage timings
+                        params.scan,  # ZE/EZ scan strategy
+                        params.strands,  # Forward strand only, or both strands
+                        SCHEDULER_WORK_UNIT,  # Chunks between which 'cancel' is checked
+                        cancel,  # Set on client disconnect or deadline
+                        requested_regions(params),  # Optional per-zone intervals to scan
+                        params.second_stage,  # Pairwise rescoring of the hits
+                    )
+            except EvaluationCancelled as e:
+                cancellations.observe(cancel)
+                logger.info(f"Evaluation cancelled ({e.reason}) after {cancel.done} of ~{cancel.cost} cells.")
+                raise
+            finally:
+                watcher.cancel()
+        elapsed = time.perf_counter() - started
+        logger.info(f"Evaluation complete in {elapsed:.3f}s.")
+        record_metrics(recorder, elapsed)
 
         # Ensure all expected keys are present in the results, even if empty
         final_results = {
@@ -117,14 +746,254 @@ async def predict_zones(request: PredictionRequest):
             "ze": results.get("ze", []),
             "ez": results.get("ez", []),
         }
+        if "reverse" in results:
+            final_results["reverse"] = {zone: results["reverse"].get(zone, []) for zone in ("ei", "ie", "ze", "ez")}
+        if params.include_timings:
+            final_results["timings"] = recorder.summary()
 
-        logger.info(f"Prediction completed with method {request.method}")
+        logger.info(f"Prediction completed with method {params.method}")
 
         return final_results
 
+    except EvaluationCancelled as e:
+        return cancelled_response(e)
     except Exception as e:
         logger.error(f"Error during prediction evaluation: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Prediction failed due to an internal error: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@app.post("/predict",
+          response_model=PredictionResponse,
+          response_model_exclude_none=True,
+          summary="Predict Genetic Zones",
+          description="Accepts a nucleotide sequence and returns predicted start positions for EI, IE, ZE, and EZ zones. Supports two prediction methods: 'top_n' for top N predictions or 'percentage' for predictions above a probability threshold.",
+          status_code=status.HTTP_200_OK)
+async def predict_zones(request: PredictionRequest, http_request: Request):
+    """
+    Takes a nucleotide sequence and uses the pre-loaded GeneticZoneEvaluator
+    to predict the start positions of different genetic zones.
+    """
+    return await run_prediction(request.sequence, request, http_request)
+
+@app.post("/predict/stream",
+          summary="Predict Genetic Zones (Streaming)",
+          description="Same request as /predict. The response is NDJSON: one line per zone and strand as soon as its hits are known (per tile of STREAM_TILE_SIZE windows for ZE/EZ with the 'percentage' method), 'zone_complete' lines, then a final 'complete' line.",
+          response_class=StreamingResponse)
+async def predict_zones_stream(request: PredictionRequest, http_request: Request):
+    """
+    Streams the hits of each zone while the remaining zones are still being evaluated, so
+    EI/IE results arrive before the slow ZE/EZ scans finish and neither side buffers the
+    whole result. The evaluation is cancelled when the client disconnects or the deadline
+    passes (the latter is reported in-band with a 'cancelled' line).
+    """
+    require_evaluator()
+    require_second_stage(request)
+    logger.info(f"Received streaming prediction request for sequence of length {len(request.sequence)} with method {request.method}.")
+    recorder = new_recorder(request)
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue(maxsize=STREAM_QUEUE_EVENTS)
+    finished = object()
+
+    def deliver(event, cancel):
+        # Called from the evaluating thread. Blocks while the queue is full, so a slow client
+        # slows its evaluation down instead of having the hits buffered here, and stops the
+        # evaluation once the stream is cancelled.
+        cancel.check()
+        put = asyncio.run_coroutine_threadsafe(events.put(event), loop)
+        while True:
+            try:
+                return put.result(DISCONNECT_POLL_INTERVAL)
+            except concurrent.futures.TimeoutError:
+                if cancel.cancelled:
+                    put.cancel()
+                    cancel.check()
+
+    def produce(current, cancel):
+        from api.GeneticZoneEvaluator import Checkpoint  # Already imported with the evaluator
+
+        for event in current.iter_evaluate(
+            request.sequence,
+            request.method,
+            request.max_number_of_predictions,
+            request.threshold,
+            recorder,
+            request.scan,
+            request.strands,
+            STREAM_TILE_SIZE,
+            SCHEDULER_WORK_UNIT,
+            cancel,
+            request.regions,
+            request.second_stage,
+        ):
+            if not isinstance(event, Checkpoint):
+                deliver(event, cancel)
+
+    async def evaluate(current, cancel):
+        try:
+            if get_scheduler() is not None:
+                await schedule_evaluation(
+                    current, request.sequence, request, recorder, lambda event: deliver(event, cancel), cancel, STREAM_TILE_SIZE
+                )
+            else:
+                await loop.run_in_executor(None, profiler.wrap(produce), current, cancel)
+        except EvaluationCancelled as e:
+            cancellations.observe(cancel)
+            logger.info(f"Streaming evaluation cancelled ({e.reason}) after {cancel.done} of ~{cancel.cost} cells.")
+            await events.put(e)
+        except Exception as e:
+            await events.put(e)
+        finally:
+            await events.put(finished)
+
+    async def ndjson():
+        started = time.perf_counter()
+        with lease_evaluator() as current:  # Held until the last event, across a reload
+            cancel = await new_cancellation(current, request.sequence, request)
+            evaluation = loop.create_task(evaluate(current, cancel))  # Referenced until the stream ends
+            watcher = loop.create_task(watch_disconnect(http_request, cancel))
+            current_zone = None
+            counts = {}
+            try:
+                while True:
+                    event = await events.get()
+                    if isinstance(event, EvaluationCancelled):
+                        if event.reason == "deadline":  # After a disconnect nobody reads the line
+                            yield json.dumps({"type": "cancelled", "reason": event.reason}) + "\n"
+                        return
+                    if isinstance(event, Exception):
+                        # The status line is already sent; report the failure in-band.
+                        logger.error(f"Error during streaming prediction: {event}", exc_info=event)
+                        yield json.dumps({"type": "error", "detail": f"Prediction failed due to an internal error: {event}"}) + "\n"
+                        return
+                    if event is finished or event[0] != current_zone:
+                        if current_zone is not None:
+                            yield json.dumps({"type": "zone_complete", "zone": current_zone, "hits": counts}) + "\n"
+                        if event is finished:
+                            break
+                        current_zone, counts = event[0], {}
+                    zone, strand, hits, tile = event
+                    counts[strand] = counts.get(strand, 0) + len(hits)
+                    line = {"type": "hits", "zone": zone, "strand": strand, "positions": hits}
+                    if tile is not None:
+                        line["tile"] = list(tile)
+                    yield json.dumps(line) + "\n"
+            finally:
+                # Also reached when the response is closed early: the client has gone away.
+                if not evaluation.done():
+                    cancel.cancel("disconnect")
+                    # Nobody reads the queue any more; make room for the last events.
+                    while not events.empty():
+                        events.get_nowait()
+                watcher.cancel()
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Streaming evaluation complete in {elapsed:.3f}s.")
+        record_metrics(recorder, elapsed)
+        complete = {"type": "complete", "seconds": elapsed}
+        if request.include_timings:
+            complete["timings"] = recorder.summary()
+        yield json.dumps(complete) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@app.post("/predict/upload",
+          response_model=PredictionResponse,
+          response_model_exclude_none=True,
+          summary="Predict Genetic Zones From an Uploaded Sequence",
+          description="Same as /predict, but the sequence is the raw request body: FASTA or plain text (text/x-fasta, text/plain) or 2-bit packed (application/x-nucleotide-2bit), optionally with Content-Encoding gzip or zstd. Prediction parameters are query parameters.",
+          status_code=status.HTTP_200_OK)
+async def predict_zones_upload(
+    request: Request,
+    params: Annotated[PredictionParameters, Query()],
+    content_encoding: str = Header(default=None),
+):
+    """
+    Decodes the streamed body chunk by chunk into the evaluator's encoded representation,
+    skipping JSON parsing and holding neither the raw nor the decompressed body in memory.
+    """
+    try:
+        decoder = SequenceDecoder.for_request(
+            request.headers.get("content-type"), content_encoding, max_bases=UPLOAD_MAX_BASES
+        )
+        async for chunk in request.stream():
+            decoder.feed(chunk)
+        sequence = decoder.finish()
+    except UnsupportedUploadError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except (UploadError, InvalidSequenceError) as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    if len(sequence) < MIN_SEQUENCE_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Sequence must have at least {MIN_SEQUENCE_LENGTH} bases, got {len(sequence)}."
+        )
+    return await run_prediction(sequence, params, request)
+
+@app.post("/predict/variants",
+          response_model=VariantResponse,
+          summary="Score Sequence Variants",
+          description="Scores SNVs and small indels of a reference sequence. Only the windows overlapping each edit are rescored; the other windows keep their reference probability (cached across requests). Returns the reference hits and, per variant and zone, the hits gained and lost and the windows whose probability changed.",
+          status_code=status.HTTP_200_OK)
+async def predict_variants(request: VariantRequest, http_request: Request):
+    """
+    Runs GeneticZoneEvaluator.score_variants in the default executor, with the reference
+    scores from reference_cache when the same reference was scored by the current models.
+    """
+    require_evaluator()
+    logger.info(f"Received variant request: {len(request.variants)} variant(s) of a sequence of length {len(request.sequence)}.")
+    recorder = new_recorder(request)
+    variants = [Variant(variant.position, variant.ref, variant.alt) for variant in request.variants]
+
+    try:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        with lease_evaluator() as current:
+            # Read with the lease: a reload swaps the evaluator and bumps the generation together.
+            key = (reload_state["generation"], sequence_digest(request.sequence))
+            reference = reference_cache.get(key)
+            cancel = CancellationToken.after(request.deadline_seconds or DEFAULT_DEADLINE_SECONDS or None)
+            cancel.cost = current.estimate_variant_cost(variants)
+            if reference is None:
+                cancel.cost += await loop.run_in_executor(None, current.estimate_cost, request.sequence)
+            watcher = loop.create_task(watch_disconnect(http_request, cancel))
+            try:
+                scored, deltas = await loop.run_in_executor(
+                    None, current.score_variants, request.sequence, variants, request.method,
+                    request.max_number_of_predictions, request.threshold, recorder, reference,
+                    request.min_delta, cancel,
+                )
+            except EvaluationCancelled as e:
+                cancellations.observe(cancel)
+                logger.info(f"Variant scoring cancelled ({e.reason}) after {cancel.done} of ~{cancel.cost} cells.")
+                raise
+            finally:
+                watcher.cancel()
+            reference_cache.put(key, scored)
+        elapsed = time.perf_counter() - started
+        logger.info(f"Scored {len(variants)} variant(s) in {elapsed:.3f}s (reference {'cached' if reference is not None else 'scored'}).")
+        record_metrics(recorder, elapsed)
+
+        reference_hits = scored.hits(request.method, request.max_number_of_predictions, request.threshold)
+        return {
+            "reference": {zone: reference_hits.get(zone, []) for zone in ("ei", "ie", "ze", "ez")},
+            "reference_cached": reference is not None,
+            "variants": [
+                {"position": variant.position, "ref": variant.ref, "alt": variant.alt, "zones": zones}
+                for variant, zones in zip(variants, deltas)
+            ],
+            "timings": recorder.summary() if request.include_timings else None,
+        }
+
+    except EvaluationCancelled as e:
+        return cancelled_response(e)
+    except Exception as e:
+        logger.error(f"Error during variant scoring: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Variant scoring failed due to an internal error: {str(e)}"
+        )
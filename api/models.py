@@ -1,15 +1,15 @@
 from pydantic import BaseModel, Field, validator
-from typing import List, Dict, Literal
-import re
+from typing import List, Dict, Literal, Optional, Tuple
 
-from .config import MIN_SEQUENCE_LENGTH
+import numpy as np
 
-class PredictionRequest(BaseModel):
-    sequence: str = Field(
-        ...,
-        min_length=MIN_SEQUENCE_LENGTH,
-        description=f"Nucleotide sequence (ATGC only). Minimum length {MIN_SEQUENCE_LENGTH} required for full evaluation including ze/ez zones."
-    )
+from .sequence import EncodedSequence, encode_sequence, normalize_sequence
+from .config import (
+    MAX_DEADLINE_SECONDS, MIN_SEQUENCE_LENGTH, PROFILING_MAX_CALLS, PROFILING_MAX_SECONDS, VARIANT_MAX_BASES,
+    VARIANT_MAX_COUNT,
+)
+
+class SelectionParameters(BaseModel):
     method: Literal["top_n", "percentage"] = Field(
         default="top_n",
         description="Prediction method to use: 'top_n' for top N predictions or 'percentage' for predictions above threshold"
@@ -27,15 +27,6 @@ class PredictionRequest(BaseModel):
         description="Probability threshold for predictions when method is 'percentage'"
     )
 
-    @validator("sequence")
-    def sequence_must_contain_only_atgc(cls, v: str) -> str:
-        if not v:
-            raise ValueError("Sequence cannot be empty")
-        v = v.lower()  # keep it lower‑case
-        if not re.fullmatch(r"[atgc]+", v):
-            raise ValueError("Sequence must contain only A, T, G, C characters")
-        return v
-
     @validator("max_number_of_predictions")
     def validate_max_predictions(cls, v, values):
         if "method" in values and values["method"] == "top_n":
@@ -50,8 +41,201 @@ class PredictionRequest(BaseModel):
                 raise ValueError("threshold must be between 0 and 1 when using percentage method")
         return v
 
-class PredictionResponse(BaseModel):
+class PredictionParameters(SelectionParameters):
+    scan: Literal["exhaustive", "cascade"] = Field(
+        default="exhaustive",
+        description="ZE/EZ scan strategy: 'exhaustive' scores every offset, 'cascade' scores a strided subset and refines around the best candidates"
+    )
+    strands: Literal["forward", "both"] = Field(
+        default="forward",
+        description="'forward' scans the sequence as given, 'both' also scans its reverse complement (reported under 'reverse' in forward coordinates)"
+    )
+    second_stage: bool = Field(
+        default=False,
+        description="If true, the hits are rescored by the pairwise models (ze-ez, ei-ie, ie-ei) and those assigned to the confusable zone are dropped. Needs the server's pairwise models"
+    )
+    include_timings: bool = Field(
+        default=False,
+        description="If true, the response includes per-zone, per-stage timings, window counts and allocated bytes"
+    )
+    deadline_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=MAX_DEADLINE_SECONDS,
+        description="Seconds after which the evaluation is abandoned and the request answered with 504. Defaults to the server's DEFAULT_DEADLINE_SECONDS"
+    )
+
+class PredictionRequest(PredictionParameters):
+    sequence: str = Field(
+        ...,
+        min_length=MIN_SEQUENCE_LENGTH,
+        description=f"Nucleotide sequence (ATGC only). Minimum length {MIN_SEQUENCE_LENGTH} required for full evaluation including ze/ez zones."
+    )
+
+    regions: Optional[Dict[Literal["ei", "ie", "ze", "ez"], List[Tuple[int, int]]]] = Field(
+        default=None,
+        description="Per-zone lists of [start, end) intervals (0-based, forward-strand indices). Only windows whose reported position lies in an interval are scored for that zone; zones without an entry scan the whole sequence"
+    )
+
+    @validator("sequence")
+    def sequence_must_contain_only_atgc(cls, v: str) -> EncodedSequence:
+        # Validates case-insensitively and encodes in one pass; after validation
+        # request.sequence is the EncodedSequence the evaluator consumes.
+        return normalize_sequence(v)
+
+    @validator("regions")
+    def validate_regions(cls, v):
+        for zone, intervals in (v or {}).items():
+            for start, end in intervals:
+                if start < 0 or end <= start:
+                    raise ValueError(f"regions of {zone} must be [start, end) intervals with 0 <= start < end, got [{start}, {end}]")
+        return v
+
+class VariantSpec(BaseModel):
+    position: int = Field(
+        ...,
+        ge=0,
+        description="0-based forward-strand index of the first reference base replaced; for an insertion, of the base before which alt is inserted"
+    )
+    ref: str = Field(
+        default="",
+        max_length=VARIANT_MAX_BASES,
+        description="Reference bases replaced, as they appear in the sequence. Empty for an insertion"
+    )
+    alt: str = Field(
+        default="",
+        max_length=VARIANT_MAX_BASES,
+        description="Bases replacing them. Empty for a deletion"
+    )
+
+    @validator("ref", "alt")
+    def bases_must_be_atgc(cls, v: str) -> str:
+        if v.strip("ACGTacgt"):
+            raise ValueError(f"ref and alt must contain only A, T, G, C characters, got {v!r}")
+        return v.lower()
+
+    @validator("alt")
+    def must_change_the_sequence(cls, v, values):
+        if "ref" in values and values["ref"] == v:
+            raise ValueError("ref and alt must differ")
+        return v
+
+class VariantRequest(SelectionParameters):
+    sequence: str = Field(
+        ...,
+        min_length=MIN_SEQUENCE_LENGTH,
+        description=f"Reference nucleotide sequence (ATGC only), at least {MIN_SEQUENCE_LENGTH} bases."
+    )
+    variants: List[VariantSpec] = Field(
+        ...,
+        min_length=1,
+        max_length=VARIANT_MAX_COUNT,
+        description="SNVs and small indels, each applied to the reference on its own"
+    )
+    min_delta: float = Field(
+        default=0.05,
+        ge=0.0,
+        le=1.0,
+        description="Smallest absolute probability change of a window listed in 'windows'. Windows without a counterpart are always listed"
+    )
+    include_timings: bool = Field(
+        default=False,
+        description="If true, the response includes per-zone, per-stage timings, window counts and allocated bytes"
+    )
+    deadline_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=MAX_DEADLINE_SECONDS,
+        description="Seconds after which the scoring is abandoned and the request answered with 504. Defaults to the server's DEFAULT_DEADLINE_SECONDS"
+    )
+
+    @validator("sequence")
+    def sequence_must_contain_only_atgc(cls, v: str) -> EncodedSequence:
+        return normalize_sequence(v)
+
+    @validator("variants")
+    def variants_must_match_reference(cls, v, values):
+        sequence = values.get("sequence")
+        if sequence is None:
+            return v
+        for index, variant in enumerate(v):
+            end = variant.position + len(variant.ref)
+            if end > len(sequence):
+                raise ValueError(f"variant {index} at {variant.position} extends past the end of the sequence ({len(sequence)} bases)")
+            if not np.array_equal(sequence.codes[variant.position : end], encode_sequence(variant.ref)):
+                raise ValueError(f"variant {index}: ref {variant.ref!r} does not match the sequence at {variant.position}")
+        return v
+
+class StageTiming(BaseModel):
+    seconds: float = Field(..., description="Wall time spent in the stage.")
+    windows: int = Field(..., description="Number of windows handled by the stage.")
+    bytes: int = Field(..., description="Approximate bytes allocated by the stage.")
+
+class ZonePredictions(BaseModel):
     ei: List[int] = Field(..., description="List of start positions for detected EI zones.")
     ie: List[int] = Field(..., description="List of start positions for detected IE zones.")
     ze: List[int] = Field(..., description="List of start positions for detected ZE zones.")
-    ez: List[int] = Field(..., description="List of start positions for detected EZ zones.")
\ No newline at end of file
+    ez: List[int] = Field(..., description="List of start positions for detected EZ zones.")
+
+class PredictionResponse(ZonePredictions):
+    reverse: Optional[ZonePredictions] = Field(
+        default=None,
+        description="Reverse-strand detections, as forward-strand indices. Only present when strands is 'both'."
+    )
+    timings: Optional[Dict[str, Dict[str, StageTiming]]] = Field(
+        default=None,
+        description="Per-zone, per-stage instrumentation ('enumerate', 'frame', 'predict_proba', 'rank'). Only present when include_timings is true."
+    )
+
+class VariantWindow(BaseModel):
+    position: Optional[int] = Field(..., description="Reported position in the variant sequence, or null for a window on deleted bases.")
+    reference_position: Optional[int] = Field(..., description="Position of the reference window, or null for a window only the variant has (e.g. a new GT/AG motif).")
+    reference: Optional[float] = Field(..., description="Probability on the reference.")
+    variant: Optional[float] = Field(..., description="Probability on the variant.")
+
+class ZoneDelta(BaseModel):
+    hits: List[int] = Field(..., description="Hits on the variant sequence, in variant coordinates.")
+    gained: List[int] = Field(..., description="Hits of the variant that are not reference hits, in variant coordinates.")
+    lost: List[int] = Field(..., description="Reference hits that are not hits of the variant, in reference coordinates.")
+    max_delta: float = Field(..., description="Largest absolute probability change of a window read by both sequences.")
+    windows: List[VariantWindow] = Field(..., description="Windows overlapping the edit whose probability changed by at least min_delta, or without a counterpart.")
+
+class VariantResult(BaseModel):
+    position: int
+    ref: str
+    alt: str
+    zones: Dict[str, ZoneDelta] = Field(..., description="Deltas per zone.")
+
+class VariantResponse(BaseModel):
+    reference: ZonePredictions = Field(..., description="Hits on the reference sequence.")
+    reference_cached: bool = Field(..., description="True if the reference window scores came from the server's cache.")
+    variants: List[VariantResult] = Field(..., description="One entry per requested variant, in request order.")
+    timings: Optional[Dict[str, Dict[str, StageTiming]]] = Field(
+        default=None,
+        description="Per-zone, per-stage instrumentation. Null unless include_timings is true."
+    )
+
+class ProfileRequest(BaseModel):
+    mode: Literal["cprofile", "sampling"] = Field(
+        default="cprofile",
+        description="'cprofile' for deterministic profiling, 'sampling' for a low-overhead stack sampler"
+    )
+    calls: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=PROFILING_MAX_CALLS,
+        description="Profile the next N evaluations"
+    )
+    seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=PROFILING_MAX_SECONDS,
+        description="Profile every evaluation during this time window. At least one of calls/seconds is required"
+    )
+
+class ReloadRequest(BaseModel):
+    zones: Optional[List[Literal["ei", "ie", "ze", "ez"]]] = Field(
+        default=None,
+        min_length=1,
+        description="Zones to reload from their configured paths. Omit to reload every zone"
+    )
@@ -0,0 +1,272 @@
+import cProfile
+import datetime
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILING_MODES = ("cprofile", "sampling")
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileSession:
+    """
+    One armed profiling request: profile the next `calls` evaluations and/or every evaluation
+    until `seconds` have elapsed, whichever ends first.
+    """
+    def __init__(self, mode, calls=None, seconds=None, sample_interval=0.005):
+        if mode not in PROFILING_MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}'. Expected one of {PROFILING_MODES}")
+        if calls is None and seconds is None:
+            raise ValueError("Either calls or seconds must be given")
+        self.mode = mode
+        self.remaining_calls = calls
+        self.deadline = time.monotonic() + seconds if seconds is not None else None
+        self.sample_interval = sample_interval
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.profiled_calls = 0
+        self.in_flight = 0
+        self.stats = None               # pstats.Stats merged over all calls (cprofile mode)
+        self.stacks = Counter()         # collapsed stack -> weight (sampling mode)
+
+    def claim(self):
+        """
+        Reserves one call for profiling. Must be called with the Profiler lock held.
+
+        :return: True if the call should be profiled
+        """
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return False
+        if self.remaining_calls is not None:
+            if self.remaining_calls <= 0:
+                return False
+            self.remaining_calls -= 1
+        self.in_flight += 1
+        return True
+
+    def exhausted(self):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return self.remaining_calls is not None and self.remaining_calls <= 0
+
+    def status(self):
+        return {
+            "mode": self.mode,
+            "started_at": self.started_at.isoformat(),
+            "profiled_calls": self.profiled_calls,
+            "remaining_calls": self.remaining_calls,
+            "seconds_left": max(0.0, self.deadline - time.monotonic()) if self.deadline is not None else None,
+        }
+
+
+class Profiler:
+    """
+    Opt-in profiler for GeneticZoneEvaluator.evaluate.
+
+    An admin arms a session with start(); wrap() then routes the matching evaluations through
+    cProfile or a stack sampler. When the session is exhausted its artifacts are written to
+    `output_dir`:
+
+      - <name>.pstats     : pstats dump, loadable with pstats.Stats or snakeviz (cprofile mode)
+      - <name>.collapsed  : 'frame;frame;frame weight' lines for flamegraph.pl / speedscope,
+                            from the stacks sampled in sampling mode. cProfile only records
+                            caller edges, not stacks, so cprofile mode writes no flame graph.
+
+    The artifacts of a session that ends with a profiled call are written by a background
+    thread, so that call's request does not wait for them. If writing fails, the error is
+    logged and reported by status() as 'last_error'.
+
+    While no session is armed wrap() returns the function unchanged, so profiling costs nothing.
+    """
+    def __init__(self, output_dir, sample_interval=0.005):
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.session = None
+        self.last_artifacts = []
+        self.last_error = None
+        self._writers = 0  # Background writes in progress
+        self._lock = threading.Lock()
+
+    def start(self, mode="cprofile", calls=None, seconds=None):
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError("A profiling session is already active")
+            self.session = ProfileSession(mode, calls, seconds, self.sample_interval)
+            return self.session.status()
+
+    def stop(self):
+        """
+        Ends the active session early and writes whatever was collected so far. Blocks until
+        the artifacts are written; call it from a worker thread, not the event loop.
+        """
+        with self._lock:
+            session = self.session
+            self.session = None
+        if session is not None:
+            artifacts = self._write(session)
+            with self._lock:
+                self.last_artifacts = artifacts
+                self.last_error = None
+        return list(self.last_artifacts)
+
+    def status(self):
+        self._expire()
+        with self._lock:
+            session = self.session
+            return {
+                "active": session is not None,
+                "session": session.status() if session is not None else None,
+                "writing": self._writers > 0,
+                "last_artifacts": list(self.last_artifacts),
+                "last_error": self.last_error,
+            }
+
+    def artifacts(self):
+        """
+        :return: Names of the artifact files available in the output directory, newest first.
+        """
+        if not os.path.isdir(self.output_dir):
+            return []
+        names = [n for n in os.listdir(self.output_dir) if n.endswith((".pstats", ".collapsed"))]
+        return sorted(names, reverse=True)
+
+    def artifact_path(self, name):
+        """
+        Resolves an artifact name to a path inside the output directory, or None.
+        """
+        if os.path.basename(name) != name or name not in self.artifacts():
+            return None
+        return os.path.join(self.output_dir, name)
+
+    def wrap(self, fn):
+        """
+        Returns `fn` itself when no session is armed, otherwise a wrapper that profiles the call
+        if the session still has budget left.
+        """
+        if self.session is None:
+            return fn
+
+        def profiled(*args, **kwargs):
+            with self._lock:
+                session = self.session
+                if session is None or not session.claim():
+                    session = None
+            if session is None:
+                self._expire()
+                return fn(*args, **kwargs)
+            try:
+                if session.mode == "cprofile":
+                    return self._run_cprofile(session, fn, args, kwargs)
+                return self._run_sampling(session, fn, args, kwargs)
+            finally:
+                self._release(session)
+
+        return profiled
+
+    def _run_cprofile(self, session, fn, args, kwargs):
+        # One Profile per call: cProfile hooks only the thread that enabled it, and executor
+        # threads may run several profiled calls concurrently.
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(fn, *args, **kwargs)
+        finally:
+            profile.create_stats()
+            with self._lock:
+                if session.stats is None:
+                    session.stats = pstats.Stats(profile, stream=io.StringIO())
+                else:
+                    session.stats.add(profile)
+
+    def _run_sampling(self, session, fn, args, kwargs):
+        target = threading.get_ident()
+        stop = threading.Event()
+        samples = Counter()
+
+        def sample():
+            while not stop.wait(session.sample_interval):
+                frame = sys._current_frames().get(target)
+                if frame is not None:
+                    samples[_collapse(frame)] += 1
+
+        sampler = threading.Thread(target=sample, name="evaluate-sampler", daemon=True)
+        sampler.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stop.set()
+            sampler.join()
+            with self._lock:
+                session.stacks.update(samples)
+
+    def _release(self, session):
+        with self._lock:
+            session.in_flight -= 1
+            session.profiled_calls += 1
+            if session is not self.session or not session.exhausted() or session.in_flight:
+                return
+            self.session = None
+        self._write_in_background(session)
+
+    def _expire(self):
+        # Time-window sessions can run out while no evaluation is in flight; close them here.
+        with self._lock:
+            session = self.session
+            if session is None or session.in_flight or not session.exhausted():
+                return
+            self.session = None
+        self._write_in_background(session)
+
+    def _write_in_background(self, session):
+        def write():
+            try:
+                artifacts = self._write(session)
+            except Exception as e:
+                logger.exception("Writing the profile artifacts failed.")
+                with self._lock:
+                    self.last_error = f"{type(e).__name__}: {e}"
+            else:
+                with self._lock:
+                    self.last_artifacts = artifacts
+                    self.last_error = None
+            finally:
+                with self._lock:
+                    self._writers -= 1
+
+        with self._lock:
+            self._writers += 1
+        threading.Thread(target=write, name="profile-writer", daemon=True).start()
+
+    def _write(self, session):
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = f"{session.started_at:%Y%m%dT%H%M%S%f}-{session.mode}"
+        written = []
+        if session.stats is not None:
+            path = os.path.join(self.output_dir, f"{name}.pstats")
+            session.stats.dump_stats(path)
+            written.append(os.path.basename(path))
+        if session.stacks:
+            path = os.path.join(self.output_dir, f"{name}.collapsed")
+            with open(path, "w") as f:
+                for stack, weight in sorted(session.stacks.items()):
+                    f.write(f"{stack} {weight}\n")
+            written.append(os.path.basename(path))
+        return written
+
+
+def _frame_label(filename, lineno, funcname):
+    return f"{funcname} ({os.path.basename(filename)}:{lineno})"
+
+
+def _collapse(frame):
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
@@ -0,0 +1,178 @@
+"""
+Cost-aware scheduling of evaluations (shortest job first with aging).
+
+The API used to hand every evaluation to the default executor, a FIFO queue: a single
+megabase ZE/EZ scan kept a thread busy from start to end and short EI/IE requests queued
+behind it. The InferenceScheduler instead runs evaluations one work unit at a time and always
+picks the job with the least (aged) work left, so short requests run between the units of a
+long one.
+"""
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from api.GeneticZoneEvaluator import Checkpoint
+
+
+class ScheduledJob:
+    """
+    One evaluation in the scheduler.
+
+    :param steps: Generator from GeneticZoneEvaluator.iter_evaluate(work_unit=...)
+    :param cost: Estimated work (GeneticZoneEvaluator.estimate_cost); decreases with every
+                 Checkpoint
+    :param on_event: Called in a scheduler thread with every (zone, strand, positions, tile)
+    """
+    def __init__(self, steps, cost, on_event):
+        self.steps = steps
+        self.remaining = max(cost, 1)
+        self.on_event = on_event
+        self.queued_at = None
+        self.waited = 0.0  # Seconds spent queued before the current wait
+        self.units = 0
+        self.future = Future()  # Result None once the generator is exhausted, or its exception
+
+
+class InferenceScheduler:
+    """
+    Runs evaluation generators on 'workers' threads, one work unit at a time.
+
+    A worker takes the queued job with the lowest priority value, advances it to its next
+    Checkpoint (delivering the events on the way) and queues it again with its remaining cost,
+    until the generator is exhausted. The priority value is the remaining cost halved for every
+    aging_half_life seconds the job has spent queued (not running), so short jobs go first and
+    a long job waiting behind a stream of short ones still moves ahead after a bounded time.
+    Every queued job ages at the same rate, so the order only depends on
+    log2(remaining) + (queued_at - waited) / aging_half_life, which is what the heaps store.
+
+    Jobs are in one of two lanes: small (remaining cost up to small_cost) and large. Large jobs
+    may hold at most workers - reserved_workers threads, so a short request arriving while
+    large units occupy the other threads starts without waiting for one of them to finish.
+
+    :param workers: Evaluations advanced at the same time
+    :param aging_half_life: Seconds of waiting after which a job's cost counts half
+    :param reserved_workers: Threads only small jobs may use
+    :param small_cost: Largest remaining cost of a job in the small lane
+    """
+    def __init__(self, workers=2, aging_half_life=0.5, reserved_workers=1, small_cost=16_384 * 550):
+        self.workers = workers
+        self.aging_half_life = aging_half_life
+        self.large_workers = max(workers - reserved_workers, 1)
+        self.small_cost = small_cost
+        self.completed = 0  # Jobs finished
+        self.units = 0      # Work units run
+        self._condition = threading.Condition()
+        self._small = []
+        self._large = []
+        self._running_large = 0
+        self._order = itertools.count()
+        self._pid = None
+
+    def submit(self, steps, cost, on_event):
+        """
+        Queues an evaluation.
+
+        :return: concurrent.futures.Future resolved when the evaluation is done
+        """
+        job = ScheduledJob(steps, cost, on_event)
+        with self._condition:
+            self._start_workers()
+            self._push(job)
+        return job.future
+
+    def stats(self):
+        with self._condition:
+            return {"queued": len(self._small) + len(self._large), "completed": self.completed, "units": self.units}
+
+    def _start_workers(self):
+        # Started on first use, and again in a forked child (threads do not survive a fork).
+        if self._pid != os.getpid():
+            self._small, self._large, self._running_large = [], [], 0
+            for _ in range(self.workers):
+                threading.Thread(target=self._work, daemon=True, name="inference-scheduler").start()
+            self._pid = os.getpid()
+
+    def _push(self, job):
+        job.queued_at = time.monotonic()
+        priority = math.log2(job.remaining) + (job.queued_at - job.waited) / self.aging_half_life
+        lane = self._small if job.remaining <= self.small_cost else self._large
+        heapq.heappush(lane, (priority, next(self._order), job))
+        self._condition.notify()
+
+    def _pop(self):
+        """
+        :return: (job, is_large) for the best job this thread may run, or (None, False)
+        """
+        lanes = [self._small]
+        if self._running_large < self.large_workers:
+            lanes.append(self._large)
+        lanes = [lane for lane in lanes if lane]
+        if not lanes:
+            return None, False
+        lane = min(lanes, key=lambda queued: queued[0][:2])
+        _, _, job = heapq.heappop(lane)
+        job.waited += time.monotonic() - job.queued_at
+        return job, lane is self._large
+
+    def _work(self):
+        while True:
+            with self._condition:
+                job, large = self._pop()
+                while job is None:
+                    self._condition.wait()
+                    job, large = self._pop()
+                self._running_large += large
+            more, error = self._run_unit(job)
+            with self._condition:
+                self._running_large -= large
+                self.units += 1
+                if more:
+                    self._push(job)
+                else:
+                    self.completed += 1
+                if large:
+                    # A large slot is free again for a thread waiting on a large job.
+                    self._condition.notify()
+            if error is not None:
+                job.future.set_exception(error)
+            elif not more:
+                job.future.set_result(None)
+
+    def _run_unit(self, job):
+        """
+        Advances a job to its next Checkpoint.
+
+        :return: (True if the job has work left, exception raised by the job or None)
+        """
+        try:
+            for event in job.steps:
+                if isinstance(event, Checkpoint):
+                    job.remaining = max(job.remaining - event.cells, 1)
+                    job.units += 1
+                    return True, None
+                job.on_event(event)
+        except BaseException as e:
+            return False, e
+        return False, None
+
+
+def render_scheduler_metrics(stats):
+    """
+    :param stats: InferenceScheduler.stats()
+    :return: Prometheus text exposition lines for the scheduler
+    """
+    return "\n".join([
+        "# HELP genetic_zone_scheduler_queued_jobs Evaluations waiting for a scheduler thread.",
+        "# TYPE genetic_zone_scheduler_queued_jobs gauge",
+        f"genetic_zone_scheduler_queued_jobs {stats['queued']}",
+        "# HELP genetic_zone_scheduler_jobs_total Evaluations completed by the scheduler.",
+        "# TYPE genetic_zone_scheduler_jobs_total counter",
+        f"genetic_zone_scheduler_jobs_total {stats['completed']}",
+        "# HELP genetic_zone_scheduler_units_total Work units run by the scheduler.",
+        "# TYPE genetic_zone_scheduler_units_total counter",
+        f"genetic_zone_scheduler_units_total {stats['units']}",
+    ]) + "\n"
@@ -0,0 +1,239 @@
+import numpy as np
+
+# Nucleotide codes used by every encoded representation in the API.
+NUCLEOTIDES = "acgt"
+UNKNOWN_CODE = len(NUCLEOTIDES)  # Any byte that is not a/c/g/t (either case)
+
+# Byte -> nucleotide code lookup table.
+ENCODE_TABLE = np.full(256, UNKNOWN_CODE, dtype=np.uint8)
+for _code, _nucleotide in enumerate(NUCLEOTIDES):
+    ENCODE_TABLE[ord(_nucleotide)] = _code
+    ENCODE_TABLE[ord(_nucleotide.upper())] = _code
+
+
+def encode_sequence(nucleotide_string):
+    """
+    Encodes a nucleotide string as a uint8 array of codes (a=0, c=1, g=2, t=3, other=4).
+
+    :param nucleotide_string: str or bytes-like sequence
+    :return: numpy array of dtype uint8 with one code per base
+    """
+    if isinstance(nucleotide_string, str):
+        nucleotide_string = nucleotide_string.encode("ascii", errors="replace")
+    return ENCODE_TABLE[np.frombuffer(nucleotide_string, dtype=np.uint8)]
+
+
+class InvalidSequenceError(ValueError):
+    """
+    Raised by normalize_sequence; carries the first offending position and character.
+    """
+    def __init__(self, position, character):
+        self.position = position
+        self.character = character
+        super().__init__(
+            f"Sequence must contain only A, T, G, C characters; found {character!r} at position {position}"
+        )
+
+
+def normalize_sequence(sequence):
+    """
+    Validates and encodes a request sequence in a single pass over its bytes.
+
+    Upper- and lower-case a/c/g/t are accepted. The lookup table is case-insensitive, so no
+    lower-cased copy is made and the encoded buffer is what the evaluator consumes.
+
+    :param sequence: str or bytes-like sequence
+    :return: EncodedSequence
+    :raises InvalidSequenceError: for an empty sequence or any other character
+    """
+    if len(sequence) == 0:
+        raise ValueError("Sequence cannot be empty")
+    if isinstance(sequence, str):
+        try:
+            sequence = sequence.encode("ascii")
+        except UnicodeEncodeError as e:
+            # Non-ASCII character: report it unless an ASCII one before it is already invalid.
+            _check_codes(ENCODE_TABLE[np.frombuffer(sequence[:e.start].encode("ascii"), dtype=np.uint8)], sequence)
+            raise InvalidSequenceError(e.start, sequence[e.start]) from None
+    codes = ENCODE_TABLE[np.frombuffer(sequence, dtype=np.uint8)]
+    _check_codes(codes, sequence)
+    return EncodedSequence(codes)
+
+
+def _check_codes(codes, sequence):
+    # max() is a reduction without temporaries; the position is only searched on failure.
+    if len(codes) and codes.max() == UNKNOWN_CODE:
+        position = int(np.argmax(codes == UNKNOWN_CODE))
+        character = sequence[position]
+        if isinstance(character, int):
+            character = chr(character)
+        raise InvalidSequenceError(position, character)
+
+
+def window_matrix(codes, starts, width):
+    """
+    Gathers the windows codes[start:start + width] for every start into a (len(starts), width)
+    uint8 matrix.
+
+    :param codes: Encoded sequence from encode_sequence
+    :param starts: Sequence of window start offsets (all windows must fit in the sequence)
+    :param width: Window width
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(codes, width)
+    return windows[np.asarray(starts, dtype=np.intp)]
+
+
+# Code -> complementary code (a<->t, c<->g, unknown stays unknown).
+COMPLEMENT_CODES = np.array([3, 2, 1, 0, UNKNOWN_CODE], dtype=np.uint8)
+
+# Code -> lower-case nucleotide, used to rebuild the B1..Bn character columns.
+DECODE_ALPHABET = np.array(list(NUCLEOTIDES) + ["n"], dtype=object)
+
+STRAND_CHOICES = ("forward", "both")
+
+
+class EncodedSequence:
+    """
+    An encoded sequence and the strand views scanned by the evaluator.
+
+    Both strands read the same uint8 buffer: the reverse complement is a negative-stride view
+    of it, complemented by lookup table only on the windows that are gathered. The
+    dinucleotide index used to find motifs is also built once and shared by both strands.
+    """
+    def __init__(self, codes):
+        self.codes = codes
+        self._dinucleotides = None
+        self.forward = StrandView(self, reverse=False)
+        self.reverse = StrandView(self, reverse=True)
+
+    @classmethod
+    def from_string(cls, nucleotide_string):
+        return cls(encode_sequence(nucleotide_string))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def dinucleotides(self):
+        """
+        :return: uint8 array with codes[i] * 5 + codes[i + 1] for every position, built lazily
+        """
+        if self._dinucleotides is None:
+            self._dinucleotides = self.codes[:-1] * np.uint8(UNKNOWN_CODE + 1) + self.codes[1:]
+        return self._dinucleotides
+
+    def strands(self, strands="forward"):
+        """
+        :param strands: 'forward' or 'both'
+        :return: List of StrandView to scan
+        """
+        if strands == "forward":
+            return [self.forward]
+        if strands == "both":
+            return [self.forward, self.reverse]
+        raise ValueError(f"strands must be one of {STRAND_CHOICES}, got {strands!r}")
+
+
+class StrandView:
+    """
+    One strand of an EncodedSequence, indexed 5' to 3' along that strand.
+    """
+    def __init__(self, sequence, reverse=False):
+        self.sequence = sequence
+        self.reverse = reverse
+
+    @property
+    def name(self):
+        return "reverse" if self.reverse else "forward"
+
+    def __len__(self):
+        return len(self.sequence.codes)
+
+    def windows(self, starts, width):
+        """
+        :return: uint8 matrix (len(starts), width) of the strand's windows (see window_matrix)
+        """
+        if not self.reverse:
+            return window_matrix(self.sequence.codes, starts, width)
+        return COMPLEMENT_CODES[window_matrix(self.sequence.codes[::-1], starts, width)]
+
+    def segment(self, start, stop):
+        """
+        :return: uint8 codes of the strand bases [start, stop), read 5' to 3' along this strand
+        """
+        if not self.reverse:
+            return self.sequence.codes[start:stop]
+        return COMPLEMENT_CODES[self.sequence.codes[::-1][start:stop]]
+
+    def find(self, motif):
+        """
+        Positions, in strand coordinates and ascending order, of every (overlapping) occurrence
+        of a two-base motif such as 'gt'.
+        """
+        first, second = ENCODE_TABLE[np.frombuffer(motif.encode("ascii"), dtype=np.uint8)]
+        base = np.uint8(UNKNOWN_CODE + 1)
+        pairs = self.sequence.dinucleotides()
+        if not self.reverse:
+            return np.flatnonzero(pairs == first * base + second)
+        # The motif read on the reverse strand is its reverse complement read forwards.
+        hits = np.flatnonzero(pairs == COMPLEMENT_CODES[second] * base + COMPLEMENT_CODES[first])
+        return (len(self) - 2 - hits)[::-1]
+
+    def to_forward(self, positions):
+        """
+        Maps strand positions to forward-strand indices of the same bases, sorted ascending.
+        """
+        if not self.reverse:
+            return [int(position) for position in positions]
+        last = len(self) - 1
+        return sorted(last - int(position) for position in positions)
+
+    def intervals(self, regions):
+        """
+        Maps merged [start, end) intervals of forward-strand indices (see merge_intervals) to
+        the same bases in strand coordinates, ascending.
+        """
+        if not self.reverse:
+            return regions
+        return [(len(self) - end, len(self) - start) for start, end in reversed(regions)]
+
+
+def merge_intervals(intervals):
+    """
+    Sorts [start, end) intervals and merges the ones that overlap or touch.
+
+    :param intervals: Iterable of (start, end) pairs
+    :return: List of disjoint (start, end) tuples in ascending order, without empty intervals
+    """
+    merged = []
+    for start, end in sorted((int(start), int(end)) for start, end in intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def interval_mask(positions, intervals):
+    """
+    :param positions: Integer array
+    :param intervals: Merged [start, end) intervals (see merge_intervals)
+    :return: Boolean array, True for the positions inside one of the intervals
+    """
+    if not intervals:
+        return np.zeros(len(positions), dtype=bool)
+    starts, ends = np.array(intervals, dtype=np.int64).T
+    index = np.searchsorted(ends, positions, side="right")  # First interval ending after the position
+    inside = index < len(ends)
+    inside[inside] &= positions[inside] >= starts[index[inside]]
+    return inside
+
+
+def as_encoded(sequence):
+    """
+    Returns an EncodedSequence for a str, bytes or already encoded sequence.
+    """
+    if isinstance(sequence, EncodedSequence):
+        return sequence
+    return EncodedSequence.from_string(sequence)
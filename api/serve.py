@@ -0,0 +1,255 @@
+"""
+Pre-fork server for the prediction API.
+
+The master process loads GeneticZoneEvaluator once, freezes the garbage collector and forks
+the workers. Each worker runs uvicorn on the listening socket inherited from the master and
+serves with the master's models, whose memory pages stay shared copy-on-write: RAM grows with
+the per-request working set, not with the model size times the worker count.
+
+Usage (from the project root):
+
+    python -m api.serve --workers 4 --port 8000
+"""
+import argparse
+import gc
+import logging
+import mmap
+import os
+import signal
+import socket
+import sys
+import time
+
+import numpy as np
+
+# Make the 'api' package importable when running this file directly.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from api.config import SERVE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+ZONES = ("ei", "ie", "ze", "ez")
+RESPAWN_DELAY = 1.0  # Seconds to wait before replacing a worker that died
+
+
+class WorkerTable:
+    """
+    Per-worker status kept in an anonymous shared mapping created by the master before
+    forking, so every worker can read every other worker's state (/health/workers) without
+    any IPC.
+    """
+    DTYPE = np.dtype([
+        ("pid", "<i8"),
+        ("ready", "u1"),
+        ("zones", "u1"),       # Bit i set when ZONES[i] is loaded
+        ("started", "<f8"),
+        ("heartbeat", "<f8"),
+    ])
+
+    def __init__(self, workers):
+        self._mmap = mmap.mmap(-1, self.DTYPE.itemsize * workers)
+        self.slots = np.frombuffer(self._mmap, dtype=self.DTYPE)
+
+    def claim(self, slot, pid):
+        self.slots[slot] = (pid, 0, 0, time.time(), 0.0)
+
+    def release(self, slot):
+        self.slots[slot] = (0, 0, 0, 0.0, 0.0)
+
+    def mark_ready(self, slot, zones):
+        """
+        :param zones: Loaded zone names (e.g. evaluator.predictor)
+        """
+        self.slots[slot]["zones"] = sum(1 << i for i, zone in enumerate(ZONES) if zone in zones)
+        self.slots[slot]["heartbeat"] = time.time()
+        self.slots[slot]["ready"] = 1
+
+    def heartbeat(self, slot):
+        self.slots[slot]["heartbeat"] = time.time()
+
+    def snapshot(self, stale_after=5.0):
+        """
+        :return: One dictionary per slot. A worker is ready once its models are loaded and as
+                 long as its heartbeat is fresher than stale_after seconds.
+        """
+        now = time.time()
+        workers = []
+        for slot, row in enumerate(self.slots.copy()):
+            age = float(now - row["heartbeat"]) if row["heartbeat"] else None
+            worker = {
+                "slot": slot,
+                "pid": int(row["pid"]),
+                "ready": bool(row["ready"]) and age is not None and age <= stale_after,
+                "zones": [zone for i, zone in enumerate(ZONES) if row["zones"] & (1 << i)],
+                "uptime_s": float(now - row["started"]) if row["started"] else None,
+                "heartbeat_age_s": age,
+            }
+            worker.update(memory_usage(int(row["pid"])))
+            workers.append(worker)
+        return workers
+
+
+def memory_usage(pid):
+    """
+    Proportional (PSS) and private resident memory of a process in MiB, from
+    /proc/<pid>/smaps_rollup (Linux). PSS splits shared copy-on-write pages between the
+    processes sharing them, so its sum over the workers is their real footprint.
+    """
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Pss", "Private_Clean", "Private_Dirty"):
+                    usage[key] = int(value.split()[0]) / 1024
+    except (OSError, ValueError):
+        return {}
+    return {
+        "pss_mb": usage.get("Pss"),
+        "private_mb": usage.get("Private_Clean", 0.0) + usage.get("Private_Dirty", 0.0),
+    }
+
+
+def bind_socket(host, port, backlog=2048):
+    """
+    Listening socket created by the master and inherited by every worker.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def set_model_threads(threads):
+    """
+    Sets the OpenMP thread count of this process, for the libraries already loaded (through
+    threadpoolctl, installed with scikit-learn) and for those loaded later (OMP_NUM_THREADS).
+    """
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        logger.warning(f"threadpoolctl is not installed; model inference keeps the master's thread count instead of {threads}.")
+        return
+    threadpool_limits(limits=threads, user_api="openmp")
+
+
+def run_worker(app_module, slot, sock, table, log_level, threads_per_worker):
+    """
+    Body of a forked worker: serve the app on the inherited socket until told to stop.
+    """
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # The master ran its model code single-threaded; this worker's OpenMP pool is started
+    # after the fork, with its own share of the CPUs.
+    set_model_threads(threads_per_worker)
+    # Objects inherited from the master stay frozen; only new garbage is collected.
+    gc.enable()
+    app_module.worker_table = table
+    app_module.worker_slot = slot
+    table.claim(slot, os.getpid())
+    config = uvicorn.Config(app_module.app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(app_module, slot, sock, table, log_level, threads_per_worker):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app_module, slot, sock, table, log_level, threads_per_worker)
+        except BaseException:
+            logger.exception(f"Worker {slot} crashed.")
+            code = 1
+        finally:
+            os._exit(code)
+    logger.info(f"Started worker {slot} (pid {pid}).")
+    return pid
+
+
+def serve(workers, host, port, threads_per_worker=None, log_level="info"):
+    """
+    Loads the models in this process, then forks and supervises the workers, replacing any
+    worker that exits until the master receives SIGINT or SIGTERM.
+    """
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    # Model compilation and warm-up run LightGBM in this process. With one OpenMP thread libgomp
+    # starts no thread pool, which would not survive the fork; each worker applies
+    # threads_per_worker once forked.
+    os.environ["OMP_NUM_THREADS"] = "1"
+
+    # Keep the collector from touching (and so copying) model objects while they are built.
+    gc.disable()
+    import api.main as app_module
+
+    app_module.evaluator = app_module.create_evaluator()
+    if app_module.evaluator is None:
+        sys.exit("Models could not be loaded; not starting workers.")
+    # Move everything allocated so far to the permanent generation, so collections in the
+    # workers never write to the pages shared with the master.
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(host, port)
+    table = WorkerTable(workers)
+    children = {spawn(app_module, slot, sock, table, log_level, threads_per_worker): slot for slot in range(workers)}
+    logger.info(f"Serving on {host}:{port} with {workers} workers, {threads_per_worker} model thread(s) each.")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is None:
+            continue
+        table.release(slot)
+        if stopping:
+            continue
+        logger.warning(f"Worker {slot} (pid {pid}) exited with status {status}; restarting.")
+        time.sleep(RESPAWN_DELAY)
+        children[spawn(app_module, slot, sock, table, log_level, threads_per_worker)] = slot
+    sock.close()
+    logger.info("All workers stopped.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-fork server sharing the loaded models between worker processes.")
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS,
+                        help="Number of worker processes (default: GENETIC_ZONE_WORKERS or the CPU count).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="OpenMP threads per worker for model inference (default: CPU count / workers).")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper())
+    serve(args.workers, args.host, args.port, args.threads_per_worker, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import zlib
+
+import numpy as np
+
+from api.sequence import ENCODE_TABLE, UNKNOWN_CODE, EncodedSequence, InvalidSequenceError
+
+# Content types accepted by /predict/upload.
+FASTA_CONTENT_TYPES = ("text/x-fasta", "text/plain", "application/octet-stream", "")
+PACKED_CONTENT_TYPE = "application/x-nucleotide-2bit"
+CONTENT_ENCODINGS = ("identity", "gzip", "zstd")
+
+# 2-bit payload: little-endian uint64 base count, then 4 bases per byte, first base in the two
+# most significant bits, using the encoded codes (a=0, c=1, g=2, t=3).
+PACKED_HEADER_SIZE = 8
+UNPACK_TABLE = np.array(
+    [[(byte >> shift) & 0b11 for shift in (6, 4, 2, 0)] for byte in range(256)], dtype=np.uint8
+)
+
+FASTA_WHITESPACE = b" \t\r\n"
+
+
+class UploadError(ValueError):
+    """Raised for a malformed upload body (as opposed to an invalid nucleotide)."""
+
+
+class UnsupportedUploadError(UploadError):
+    """Raised for a content type or content encoding the endpoint does not handle."""
+
+
+class UploadTooLargeError(UploadError):
+    """Raised once the decoded sequence exceeds max_bases."""
+
+
+class _GzipDecompressor:
+    """
+    gzip decompressor that also reads multi-member bodies (e.g. bgzip-compressed FASTA).
+    """
+    def __init__(self):
+        self._zlib = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        self.eof = False
+
+    def decompress(self, chunk):
+        output = []
+        while chunk:
+            output.append(self._zlib.decompress(chunk))
+            self.eof = self._zlib.eof
+            if not self._zlib.eof:
+                break
+            chunk = self._zlib.unused_data
+            if chunk:
+                self._zlib = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        return b"".join(output)
+
+    def flush(self):
+        return self._zlib.flush()
+
+
+def _decompressor(content_encoding):
+    """
+    :return: Object exposing decompress(chunk) for the given Content-Encoding, or None for identity
+    """
+    if content_encoding in (None, "", "identity"):
+        return None
+    if content_encoding == "gzip":
+        return _GzipDecompressor()
+    if content_encoding == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise UnsupportedUploadError("zstd uploads need the 'zstandard' package on the server") from None
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise UnsupportedUploadError(
+        f"Content-Encoding '{content_encoding}' is not supported (use one of {', '.join(CONTENT_ENCODINGS)})"
+    )
+
+
+class SequenceDecoder:
+    """
+    Incremental decoder turning an upload body into an EncodedSequence.
+
+    Chunks are decompressed, parsed and encoded as they arrive, so only the encoded sequence
+    (one byte per base) is ever held in full; the raw or compressed body is not.
+
+    Usage:
+
+        decoder = SequenceDecoder.for_request(content_type, content_encoding, max_bases)
+        async for chunk in request.stream():
+            decoder.feed(chunk)
+        sequence = decoder.finish()
+    """
+    def __init__(self, packed=False, content_encoding=None, max_bases=None):
+        self.packed = packed
+        self.max_bases = max_bases
+        self._decompressor = _decompressor(content_encoding)
+        self._content_encoding = content_encoding
+        self._codes = bytearray()
+        # FASTA state
+        self._in_header = False
+        # 2-bit state
+        self._header = b""
+        self._expected = None
+
+    @classmethod
+    def for_request(cls, content_type, content_encoding=None, max_bases=None):
+        """
+        :param content_type: Request Content-Type (parameters such as charset are ignored)
+        :param content_encoding: Request Content-Encoding
+        """
+        media_type = (content_type or "").split(";")[0].strip().lower()
+        if media_type == PACKED_CONTENT_TYPE:
+            return cls(packed=True, content_encoding=content_encoding, max_bases=max_bases)
+        if media_type in FASTA_CONTENT_TYPES:
+            return cls(packed=False, content_encoding=content_encoding, max_bases=max_bases)
+        raise UnsupportedUploadError(
+            f"Content-Type '{media_type}' is not supported (use text/x-fasta, text/plain or {PACKED_CONTENT_TYPE})"
+        )
+
+    def feed(self, chunk):
+        """
+        Decodes one chunk of the request body.
+        """
+        if self._decompressor is not None:
+            try:
+                chunk = self._decompressor.decompress(chunk)
+            except Exception as e:  # zlib.error, zstandard.ZstdError
+                raise UploadError(f"Invalid {self._content_encoding} body: {e}") from None
+        self._feed_decompressed(chunk)
+
+    def finish(self):
+        """
+        :return: EncodedSequence of the whole body
+        :raises UploadError, InvalidSequenceError
+        """
+        if self._decompressor is not None:
+            self._feed_decompressed(self._decompressor.flush())
+            if not getattr(self._decompressor, "eof", True):
+                raise UploadError("Compressed body is truncated")
+        if self.packed:
+            if self._expected is None:
+                raise UploadError("2-bit body is shorter than its 8-byte header")
+            if len(self._codes) < self._expected:
+                raise UploadError(f"2-bit body holds {len(self._codes)} bases, header announces {self._expected}")
+            del self._codes[self._expected:]  # Padding of the last byte
+        if not self._codes:
+            raise UploadError("Sequence cannot be empty")
+        return EncodedSequence(np.frombuffer(self._codes, dtype=np.uint8))
+
+    def _feed_decompressed(self, chunk):
+        if chunk:
+            if self.packed:
+                self._feed_packed(chunk)
+            else:
+                self._feed_fasta(chunk)
+
+    def _append(self, codes):
+        if self.max_bases is not None and len(self._codes) + len(codes) > self.max_bases:
+            raise UploadTooLargeError(f"Sequence is longer than the {self.max_bases} bases accepted per upload")
+        self._codes += memoryview(codes)  # A bare ndarray would dispatch to numpy's add
+
+    def _feed_fasta(self, chunk):
+        while chunk:
+            if self._in_header:
+                end = chunk.find(b"\n")
+                if end == -1:
+                    return
+                chunk = chunk[end + 1:]
+                self._in_header = False
+                continue
+            start = chunk.find(b">")
+            if start == -1:
+                self._append_bases(chunk)
+                return
+            self._append_bases(chunk[:start])
+            if self._codes:
+                raise UploadError("Only one FASTA record per upload is supported")
+            self._in_header = True
+            chunk = chunk[start + 1:]
+
+    def _append_bases(self, text):
+        text = text.translate(None, FASTA_WHITESPACE)
+        if not text:
+            return
+        codes = ENCODE_TABLE[np.frombuffer(text, dtype=np.uint8)]
+        if codes.max() == UNKNOWN_CODE:
+            offset = int(np.argmax(codes == UNKNOWN_CODE))
+            raise InvalidSequenceError(len(self._codes) + offset, chr(text[offset]))
+        self._append(codes)
+
+    def _feed_packed(self, chunk):
+        if self._expected is None:
+            missing = PACKED_HEADER_SIZE - len(self._header)
+            self._header += chunk[:missing]
+            chunk = chunk[missing:]
+            if len(self._header) < PACKED_HEADER_SIZE:
+                return
+            self._expected = int.from_bytes(self._header, "little")
+            if self.max_bases is not None and self._expected > self.max_bases:
+                raise UploadTooLargeError(f"Sequence is longer than the {self.max_bases} bases accepted per upload")
+        if chunk:
+            if len(self._codes) + 4 * len(chunk) > -(-self._expected // 4) * 4:
+                raise UploadError(f"2-bit body is longer than the {self._expected} bases its header announces")
+            self._codes += memoryview(UNPACK_TABLE[np.frombuffer(chunk, dtype=np.uint8)].reshape(-1))
+
+
+def pack_sequence(sequence):
+    """
+    Packs a nucleotide string into the 2-bit upload format (client-side helper).
+
+    :param sequence: str or bytes of a/c/g/t (either case)
+    :return: bytes
+    """
+    if isinstance(sequence, str):
+        sequence = sequence.encode("ascii")
+    codes = ENCODE_TABLE[np.frombuffer(sequence, dtype=np.uint8)]
+    if len(codes) and codes.max() == UNKNOWN_CODE:
+        offset = int(np.argmax(codes == UNKNOWN_CODE))
+        raise InvalidSequenceError(offset, chr(sequence[offset]))
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+    packed = (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+    return len(codes).to_bytes(PACKED_HEADER_SIZE, "little") + packed.astype(np.uint8).tobytes()
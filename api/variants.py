@@ -0,0 +1,289 @@
+"""
+Delta scoring of sequence variants against a reference sequence.
+
+Scoring hundreds of alleles of one locus through /predict rebuilds and rescores every window
+of every allele, although a SNV only changes the windows that overlap it (12 for EI, 105 for
+IE, 550 for ZE/EZ) and an indel also just shifts the coordinates of the windows after it.
+GeneticZoneEvaluator.score_variants instead scores the reference once (ReferenceScores, kept
+across requests in a ReferenceCache), enumerates and scores only the windows of each variant
+that overlap its edit, and takes every other window's probability from the reference.
+"""
+import collections
+import hashlib
+import threading
+
+import numpy as np
+
+from api.sequence import encode_sequence
+
+
+class Variant:
+    """
+    A substitution, insertion or deletion applied to the forward strand of a reference: the
+    bases [position, position + len(ref)) are replaced by alt. An insertion has an empty ref,
+    a deletion an empty alt.
+
+    :param position: 0-based forward-strand index of the first replaced base (of the base
+                     before which alt is inserted, for an insertion)
+    :param ref: Reference bases replaced, as in the reference sequence
+    :param alt: Bases replacing them
+    """
+    __slots__ = ("position", "ref", "alt", "alt_codes")
+
+    def __init__(self, position, ref, alt):
+        self.position = position
+        self.ref = ref
+        self.alt = alt
+        self.alt_codes = encode_sequence(alt)
+
+    @property
+    def shift(self):
+        """
+        Offset added to the coordinates of the bases after the edit.
+        """
+        return len(self.alt) - len(self.ref)
+
+    def segment(self, codes, width):
+        """
+        The part of the variant sequence that holds every window of the given width
+        overlapping the edit.
+
+        :param codes: Encoded reference sequence
+        :return: (uint8 codes, variant-coordinate index of their first base)
+        """
+        end = self.position + len(self.ref)
+        first = max(self.position - width, 0)
+        last = min(end + width, len(codes))
+        return np.concatenate([codes[first : self.position], self.alt_codes, codes[end:last]]), first
+
+    def overlaps(self, starts, width):
+        """
+        :param starts: Window starts in variant coordinates
+        :return: Boolean array, True for the windows that read an inserted or substituted base,
+                 or both sides of a deletion
+        """
+        return (starts < self.position + len(self.alt)) & (starts + width > self.position)
+
+    def to_variant(self, positions):
+        """
+        Maps reference indices to the variant indices of the same bases; -1 for deleted bases.
+        """
+        end = self.position + len(self.ref)
+        return np.where(positions < self.position, positions, np.where(positions >= end, positions + self.shift, -1))
+
+
+class ZoneScores:
+    """
+    Every window of one zone on the reference: reported positions, window starts (both
+    ascending, in enumeration order) and probabilities.
+    """
+    def __init__(self, positions, starts, proba, width):
+        self.positions = positions
+        self.starts = starts
+        self.proba = proba
+        self.width = width
+        self._order = None
+        self._selected = {}
+
+    @property
+    def nbytes(self):
+        return self.positions.nbytes + self.starts.nbytes + self.proba.nbytes
+
+    def order(self):
+        """
+        :return: Window indices by decreasing probability, ties in enumeration order (the order
+                 of pandas' rank(method='first') used by GeneticZoneEvaluator._select)
+        """
+        if self._order is None:
+            self._order = np.argsort(-self.proba, kind="stable")
+        return self._order
+
+    def selected(self, method, max_predictions, threshold):
+        """
+        :return: Ascending indices of the windows the prediction method selects on the reference
+        """
+        key = (method, max_predictions, threshold)
+        if key not in self._selected:
+            if method == "top_n":
+                top = self.order()[:max_predictions]
+                selected = np.sort(top[self.proba[top] >= threshold])
+            else:
+                selected = np.flatnonzero(self.proba >= threshold)
+            self._selected[key] = selected
+        return self._selected[key]
+
+    def delta(self, variant, positions, starts, proba, method="top_n", max_predictions=10, threshold=0.5, min_delta=0.0):
+        """
+        Applies the prediction method to the variant sequence, whose windows are the reference
+        windows not overlapping the edit (shifted after it) plus the given rescored windows,
+        and compares the result with the reference.
+
+        :param variant: Variant
+        :param positions: Positions of the variant windows overlapping the edit (variant coordinates)
+        :param starts: Their window starts
+        :param proba: Their probabilities
+        :param min_delta: Smallest absolute probability change of a window that is reported
+        :return: Dictionary with 'hits' (variant coordinates), 'gained' (hits absent from the
+                 reference), 'lost' (reference hits absent from the variant, reference
+                 coordinates), 'max_delta' and 'windows' (changed windows, see below)
+        """
+        # Reference windows overlapping the edit: starts in (position - width, position + len(ref)).
+        first = np.searchsorted(self.starts, variant.position - self.width, side="right")
+        end = np.searchsorted(self.starts, variant.position + len(variant.ref), side="left")
+
+        reference_hits = self.selected(method, max_predictions, threshold)
+        if method == "top_n":
+            # At most end - first of the best windows are among those replaced.
+            kept = self.order()[: max_predictions + end - first]
+        else:
+            kept = reference_hits
+        kept = kept[(kept < first) | (kept >= end)]
+        if method == "top_n":
+            kept = kept[:max_predictions]
+        shift = np.where(kept >= end, variant.shift, 0)
+        candidate_starts = np.concatenate([self.starts[kept] + shift, starts])
+        candidate_positions = np.concatenate([self.positions[kept] + shift, positions])
+        candidate_proba = np.concatenate([self.proba[kept], proba])
+        if method == "top_n":
+            # Starts follow the enumeration order, which breaks ties as _select does.
+            top = np.lexsort((candidate_starts, -candidate_proba))[:max_predictions]
+            chosen = top[candidate_proba[top] >= threshold]
+        else:
+            chosen = np.flatnonzero(candidate_proba >= threshold)
+        hits = np.sort(candidate_positions[chosen])
+
+        reference_positions = self.positions[reference_hits]
+        mapped = variant.to_variant(reference_positions)
+        hit_set = set(hits.tolist())
+        mapped_set = set(mapped.tolist())
+
+        replaced = self.positions[first:end]
+        replaced_proba = self.proba[first:end]
+        rescored = dict(zip(positions.tolist(), proba.tolist()))
+        windows, max_delta = [], 0.0
+        for reference_position, position, reference in zip(replaced.tolist(), variant.to_variant(replaced).tolist(), replaced_proba.tolist()):
+            value = rescored.pop(position, None) if position >= 0 else None
+            if value is not None:
+                max_delta = max(max_delta, abs(value - reference))
+                if abs(value - reference) < min_delta:
+                    continue
+            windows.append({"position": position if position >= 0 else None, "reference_position": reference_position, "reference": reference, "variant": value})
+        # Windows of the variant without a reference counterpart (e.g. a new GT/AG motif).
+        windows += [{"position": position, "reference_position": None, "reference": None, "variant": value} for position, value in rescored.items()]
+        windows.sort(key=lambda window: (
+            window["position"] is None, window["position"] or 0, window["reference_position"] or 0
+        ))
+
+        return {
+            "hits": hits.tolist(),
+            "gained": [position for position in hits.tolist() if position not in mapped_set],
+            "lost": [int(position) for position, moved in zip(reference_positions, mapped.tolist()) if moved not in hit_set],
+            "max_delta": max_delta,
+            "windows": windows,
+        }
+
+
+class ReferenceScores:
+    """
+    Probabilities of every window of every loaded zone on the forward strand of a reference
+    sequence (GeneticZoneEvaluator.score_reference).
+
+    :param length: Reference length in bases
+    :param zones: Dictionary zone -> ZoneScores
+    """
+    def __init__(self, length, zones):
+        self.length = length
+        self.zones = zones
+
+    @property
+    def nbytes(self):
+        # Zones scoring the same windows share their positions and starts.
+        arrays = {}
+        for scores in self.zones.values():
+            for array in (scores.positions, scores.starts, scores.proba):
+                arrays[id(array)] = array.nbytes
+        return sum(arrays.values())
+
+    def hits(self, method="top_n", max_predictions=10, threshold=0.5):
+        """
+        :return: Dictionary zone -> positions the prediction method selects on the reference
+        """
+        return {
+            zone: scores.positions[scores.selected(method, max_predictions, threshold)].tolist()
+            for zone, scores in self.zones.items()
+        }
+
+
+def sequence_digest(sequence):
+    """
+    :param sequence: EncodedSequence
+    :return: Hex digest of its bases, the ReferenceCache key of a reference
+    """
+    return hashlib.sha256(np.ascontiguousarray(sequence.codes)).hexdigest()
+
+
+class ReferenceCache:
+    """
+    Least-recently-used ReferenceScores of the last references scored, so that the variants of
+    one locus sent over several requests pay for the reference only once.
+
+    :param max_entries: References kept; 0 disables the cache
+    """
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        """
+        :return: The cached ReferenceScores, or None
+        """
+        with self._lock:
+            scores = self._entries.get(key)
+            if scores is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return scores
+
+    def put(self, key, scores):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = scores
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(scores.nbytes for scores in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def render_variant_metrics(stats):
+    """
+    :param stats: ReferenceCache.stats()
+    :return: Prometheus text exposition lines for the reference cache
+    """
+    return "\n".join([
+        "# HELP genetic_zone_variant_reference_cache_entries References whose scores are cached for variant scoring.",
+        "# TYPE genetic_zone_variant_reference_cache_entries gauge",
+        f"genetic_zone_variant_reference_cache_entries {stats['entries']}",
+        "# HELP genetic_zone_variant_reference_cache_bytes Bytes held by the cached reference scores.",
+        "# TYPE genetic_zone_variant_reference_cache_bytes gauge",
+        f"genetic_zone_variant_reference_cache_bytes {stats['bytes']}",
+        "# HELP genetic_zone_variant_reference_cache_hits_total Variant requests served from cached reference scores.",
+        "# TYPE genetic_zone_variant_reference_cache_hits_total counter",
+        f"genetic_zone_variant_reference_cache_hits_total {stats['hits']}",
+        "# HELP genetic_zone_variant_reference_cache_misses_total Variant requests that scored their reference.",
+        "# TYPE genetic_zone_variant_reference_cache_misses_total counter",
+        f"genetic_zone_variant_reference_cache_misses_total {stats['misses']}",
+    ]) + "\n"
@@ -0,0 +1,430 @@
+"""
+Sampled benchmark for GeneticZoneEvaluator.
+
+Generates synthetic nucleotide sequences of configurable lengths, runs every zone on its
+own and the full evaluate() call, and writes throughput, latency percentiles, peak RSS and
+the split between feature building and predict_proba time to a JSON file so that runs can
+be compared across commits.
+
+Usage (from the project root):
+
+    python -m benchmarks.benchmark_evaluator --lengths 1k,10k,100k --repeats 5
+    python -m benchmarks.benchmark_evaluator --models real --zones ei,ie
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Make the 'api' package importable when running this file directly.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from api.GeneticZoneEvaluator import GeneticZoneEvaluator
+from api.instrumentation import StageRecorder
+from api.variants import Variant
+from benchmarks.stand_in_models import NUCLEOTIDES, ZONE_WINDOW_SIZES, build_stand_in_pairwise, build_stand_in_predictors
+
+DEFAULT_OUTPUT_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+# Targets whose ZE/EZ scan strategy can be chosen with --scan.
+SCANNED_TARGETS = {"ze", "ez", "evaluate"}
+
+
+def parse_length(value):
+    """
+    Parses lengths such as '1000', '10k' or '2.5M' into a number of bases.
+    """
+    value = value.strip().lower()
+    if value and value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+
+def generate_sequence(length, seed=0):
+    """
+    Returns a random lower-case nucleotide string of the requested length.
+    """
+    rng = np.random.default_rng(seed)
+    alphabet = np.frombuffer(NUCLEOTIDES.encode("ascii"), dtype=np.uint8)
+    return alphabet[rng.integers(0, len(alphabet), size=length)].tobytes().decode("ascii")
+
+
+def peak_rss_mb():
+    """
+    Process high-water resident set size in MiB (ru_maxrss is KiB on Linux, bytes on macOS).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def percentiles(samples):
+    return {
+        "p50": float(np.percentile(samples, 50)),
+        "p95": float(np.percentile(samples, 95)),
+        "p99": float(np.percentile(samples, 99)),
+        "mean": float(np.mean(samples)),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_evaluator(model_source, zones, seed, compile_models=False, distilled_zones=(), batch_max_windows=0, pairwise=False):
+    """
+    Builds the evaluator under test. Zones in distilled_zones are served by their distilled
+    student (DISTILLED_MODEL_PATHS) whatever the model source. batch_max_windows > 0 enables
+    cross-call micro-batching (api/batching.py). With pairwise, the pairwise models of the
+    second stage are loaded too (PAIRWISE_MODEL_PATHS, or stand-ins).
+    """
+    from api.config import DISTILLED_MODEL_PATHS, PAIRWISE_MODEL_PATHS
+
+    distilled = {zone: DISTILLED_MODEL_PATHS[zone] for zone in distilled_zones if zone in zones}
+    zones = [zone for zone in zones if zone not in distilled]
+    if model_source == "real":
+        from api.config import MODEL_PATHS
+        return GeneticZoneEvaluator(
+            {zone: MODEL_PATHS[zone] for zone in zones}, compile_models=compile_models, distilled_paths=distilled,
+            batch_max_windows=batch_max_windows, pairwise_paths=PAIRWISE_MODEL_PATHS if pairwise else None,
+        )
+    predictors = build_stand_in_predictors(zones, seed=seed) if zones else {}
+    return GeneticZoneEvaluator(
+        predictors=predictors, distilled_paths=distilled, batch_max_windows=batch_max_windows,
+        pairwise=build_stand_in_pairwise() if pairwise else None,
+    )
+
+
+def target_call(evaluator, target, scan, strands="forward", second_stage=False):
+    """
+    Returns a callable (sequence, method, max_predictions, threshold, recorder) -> hits, where
+    hits is a dictionary zone -> positions for both zone targets and 'evaluate'. 'strands' and
+    'second_stage' only apply to 'evaluate'.
+    """
+    if target == "evaluate":
+        return lambda *args, recorder: evaluator.evaluate(
+            *args, recorder=recorder, scan=scan, strands=strands, second_stage=second_stage
+        )
+    method = getattr(evaluator, f"_evaluate_{target}")
+    if target in SCANNED_TARGETS:
+        return lambda *args, recorder: {target: method(*args, recorder=recorder, scan=scan)}
+    return lambda *args, recorder: {target: method(*args, recorder=recorder)}
+
+
+def scan_recall(hits, reference):
+    """
+    Fraction of the exhaustive-scan ZE/EZ hits that the cascade scan also found.
+    """
+    expected = found = 0
+    for zone in ("ze", "ez"):
+        if zone in reference:
+            expected += len(reference[zone])
+            found += len(set(reference[zone]) & set(hits.get(zone, [])))
+    return found / expected if expected else 1.0
+
+
+def count_hits(hits):
+    """
+    Number of positions in an evaluate() result, over every zone and strand.
+    """
+    return sum(count_hits(value) if isinstance(value, dict) else len(value) for value in hits.values())
+
+
+def run_case(evaluator, target, sequence, args):
+    """
+    Runs one (target, sequence) case 'repeats' times after 'warmup' untimed runs.
+
+    The evaluator's StageRecorder instrumentation splits each run into model time (the
+    'predict_proba' stages) and feature-building time (everything else: window enumeration,
+    frame construction and ranking).
+
+    With --concurrency N, every run is N calls on the same sequence from N threads at once, as
+    concurrent requests would make them; latencies are then per call and throughput is over
+    the wall time of the runs.
+
+    With --pairwise, the 'evaluate' target runs the second stage; its time (the 'pairwise'
+    stages) is reported apart, and an untimed run without it gives the first-pass hit count.
+
+    :param target: A zone name to call _evaluate_<zone> directly, or 'evaluate' for the full call.
+    """
+    scan = args.scan if target in SCANNED_TARGETS else "exhaustive"
+    strands = args.strands if target == "evaluate" else "forward"
+    second_stage = args.pairwise and target == "evaluate"
+    call = target_call(evaluator, target, scan, strands, second_stage)
+
+    def run_once():
+        recorder = StageRecorder()
+        start = time.perf_counter()
+        hits = call(sequence, args.method, args.max_predictions, args.threshold, recorder=recorder)
+        elapsed = time.perf_counter() - start
+        model_stages = [stage for stage in recorder.stages if stage.name == "predict_proba"]
+        predict_seconds = sum(stage.seconds for stage in model_stages)
+        pairwise_seconds = sum(stage.seconds for stage in recorder.stages if stage.name == "pairwise")
+        windows = sum(stage.windows for stage in model_stages)
+        return elapsed, predict_seconds, pairwise_seconds, windows, recorder.summary(), hits
+
+    def run_concurrently():
+        start = time.perf_counter()
+        if args.concurrency == 1:
+            runs = [run_once()]
+            return runs, runs[0][0]
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            runs = list(pool.map(lambda _: run_once(), range(args.concurrency)))
+        return runs, time.perf_counter() - start
+
+    for _ in range(args.warmup):
+        run_concurrently()
+
+    latencies, predict_times, pairwise_times, windows, stages, hits, wall = [], [], [], 0, {}, {}, 0.0
+    for _ in range(args.repeats):
+        runs, seconds = run_concurrently()
+        wall += seconds
+        for elapsed, predict_seconds, pairwise_seconds, windows, stages, hits in runs:
+            latencies.append(elapsed)
+            predict_times.append(predict_seconds)
+            pairwise_times.append(pairwise_seconds)
+
+    comparison = {}
+    if scan == "cascade":
+        # Untimed exhaustive reference run for recall and model-call reduction.
+        recorder = StageRecorder()
+        reference = target_call(evaluator, target, "exhaustive", strands)(
+            sequence, args.method, args.max_predictions, args.threshold, recorder=recorder
+        )
+        exhaustive_windows = sum(s.windows for s in recorder.stages if s.name == "predict_proba")
+        comparison = {
+            "recall_vs_exhaustive": scan_recall(hits, reference),
+            "exhaustive_windows": exhaustive_windows,
+            "window_reduction": exhaustive_windows / windows if windows else None,
+        }
+
+    mean_latency = float(np.mean(latencies))
+    mean_predict = float(np.mean(predict_times))
+    mean_pairwise = float(np.mean(pairwise_times))
+    if second_stage:
+        first_pass = target_call(evaluator, target, scan, strands)(
+            sequence, args.method, args.max_predictions, args.threshold, recorder=StageRecorder()
+        )
+        first_pass_hits, second_stage_hits = count_hits(first_pass), count_hits(hits)
+        comparison.update(
+            pairwise_s=mean_pairwise,
+            pairwise_share=mean_pairwise / mean_latency if mean_latency else None,
+            first_pass_hits=first_pass_hits,
+            second_stage_hits=second_stage_hits,
+            rejected_share=1 - second_stage_hits / first_pass_hits if first_pass_hits else None,
+        )
+    return {
+        "target": target,
+        "scan": scan,
+        "strands": strands,
+        "length": len(sequence),
+        "repeats": args.repeats,
+        "concurrency": args.concurrency,
+        "windows": windows,
+        "windows_per_sec": windows * len(latencies) / wall if wall > 0 else None,
+        "calls_per_sec": len(latencies) / wall if wall > 0 else None,
+        "latency_s": percentiles(latencies),
+        "feature_s": mean_latency - mean_predict - mean_pairwise,
+        "predict_proba_s": mean_predict,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+        **comparison,
+    }
+
+
+def generate_snvs(sequence, count, seed=0):
+    """
+    Returns 'count' random SNVs (api.variants.Variant) of a sequence, at distinct positions.
+    """
+    rng = np.random.default_rng(seed)
+    positions = np.sort(rng.choice(len(sequence), size=min(count, len(sequence)), replace=False))
+    return [
+        Variant(int(position), sequence[position], NUCLEOTIDES[(NUCLEOTIDES.index(sequence[position]) + int(step)) % 4])
+        for position, step in zip(positions, rng.integers(1, 4, size=len(positions)))
+    ]
+
+
+def run_variants_case(evaluator, sequence, args):
+    """
+    Times score_variants on --variants random SNVs with cached reference scores, as
+    /predict/variants runs once the reference is cached, against full evaluate() calls on the
+    edited sequences (one timed call per variant for up to 'repeats' variants, extrapolated).
+    """
+    variants = generate_snvs(sequence, args.variants, seed=args.seed)
+    start = time.perf_counter()
+    reference = evaluator.score_reference(sequence)
+    reference_seconds = time.perf_counter() - start
+
+    call = lambda: evaluator.score_variants(
+        sequence, variants, args.method, args.max_predictions, args.threshold, reference=reference
+    )
+    for _ in range(args.warmup):
+        call()
+    latencies = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+
+    full = []
+    for variant in variants[: args.repeats]:
+        edited = sequence[: variant.position] + variant.alt + sequence[variant.position + len(variant.ref):]
+        start = time.perf_counter()
+        evaluator.evaluate(edited, args.method, args.max_predictions, args.threshold)
+        full.append(time.perf_counter() - start)
+    full_seconds = float(np.mean(full)) * len(variants)
+    latency = percentiles(latencies)
+    return {
+        "target": "variants",
+        "length": len(sequence),
+        "repeats": args.repeats,
+        "variants": len(variants),
+        "latency_s": latency,
+        "reference_s": reference_seconds,
+        "full_evaluate_s": full_seconds,
+        "speedup": full_seconds / latency["mean"] if latency["mean"] else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark GeneticZoneEvaluator throughput and latency.")
+    parser.add_argument("--lengths", default="1k,10k,100k",
+                        help="Comma separated sequence lengths, e.g. '1k,10k,1M,10M'.")
+    parser.add_argument("--zones", default=",".join(ZONE_WINDOW_SIZES),
+                        help="Comma separated zones to benchmark individually.")
+    parser.add_argument("--no-end-to-end", action="store_true",
+                        help="Skip the full evaluate() call and only benchmark single zones.")
+    parser.add_argument("--models", choices=["stand-in", "real"], default="stand-in",
+                        help="'stand-in' uses small synthetic models, 'real' loads MODEL_PATHS from api/config.py.")
+    parser.add_argument("--compile", action="store_true",
+                        help="With --models real, compile the predictors to the fast path (api/fast_inference.py).")
+    parser.add_argument("--distilled", default="",
+                        help="Comma separated zones (ze, ez) served by the students of training/distill_models.py.")
+    parser.add_argument("--scan", choices=["exhaustive", "cascade"], default="exhaustive",
+                        help="ZE/EZ scan strategy. 'cascade' also reports recall against an exhaustive run.")
+    parser.add_argument("--strands", choices=["forward", "both"], default="forward",
+                        help="Strands scanned by the full evaluate() call.")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Calls made at once from separate threads in every run.")
+    parser.add_argument("--variants", type=int, default=0,
+                        help="Also time delta scoring of this many random SNVs per length (score_variants).")
+    parser.add_argument("--pairwise", action="store_true",
+                        help="Load the pairwise models and run the second stage in the full evaluate() call.")
+    parser.add_argument("--batch-max-windows", type=int, default=0,
+                        help="Enable micro-batching of concurrent model calls up to this many windows (0: off).")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--method", choices=["top_n", "percentage"], default="top_n")
+    parser.add_argument("--max-predictions", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None,
+                        help="JSON file to write. Defaults to benchmarks/results/<timestamp>-<commit>.json.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    lengths = [parse_length(v) for v in args.lengths.split(",") if v.strip()]
+    zones = [z.strip() for z in args.zones.split(",") if z.strip()]
+    unknown = set(zones) - set(ZONE_WINDOW_SIZES)
+    if unknown:
+        raise SystemExit(f"Unknown zones: {', '.join(sorted(unknown))}")
+
+    distilled = [z.strip() for z in args.distilled.split(",") if z.strip()]
+    evaluator = load_evaluator(
+        args.models, zones, args.seed, compile_models=args.compile, distilled_zones=distilled,
+        batch_max_windows=args.batch_max_windows, pairwise=args.pairwise,
+    )
+
+    targets = list(zones)
+    if not args.no_end_to_end:
+        targets.append("evaluate")
+
+    results = []
+    for length in lengths:
+        sequence = generate_sequence(length, seed=args.seed)
+        for target in targets:
+            result = run_case(evaluator, target, sequence, args)
+            results.append(result)
+            print(
+                f"{target:>8} {length:>10} bp  "
+                f"p50 {result['latency_s']['p50'] * 1000:10.2f} ms  "
+                f"p99 {result['latency_s']['p99'] * 1000:10.2f} ms  "
+                f"{result['windows_per_sec'] or 0:12.0f} windows/s  "
+                f"features {result['feature_s'] * 1000:9.2f} ms  "
+                f"predict {result['predict_proba_s'] * 1000:9.2f} ms  "
+                f"rss {result['peak_rss_mb']:8.1f} MiB"
+                + (f"  {result['calls_per_sec']:.1f} calls/s" if args.concurrency > 1 else "")
+                + (f"  recall {result['recall_vs_exhaustive']:.3f}  "
+                   f"{result['window_reduction'] or 0:.1f}x fewer windows" if "recall_vs_exhaustive" in result else "")
+                + (f"  second stage {result['pairwise_s'] * 1000:.2f} ms ({result['pairwise_share']:.1%}), "
+                   f"hits {result['first_pass_hits']} -> {result['second_stage_hits']} ({result['rejected_share'] or 0:.1%} rejected)"
+                   if "pairwise_s" in result else "")
+            )
+        if args.variants:
+            result = run_variants_case(evaluator, sequence, args)
+            results.append(result)
+            print(
+                f"variants {length:>10} bp  "
+                f"p50 {result['latency_s']['p50'] * 1000:10.2f} ms  "
+                f"p99 {result['latency_s']['p99'] * 1000:10.2f} ms  "
+                f"{result['variants']} SNVs, reference {result['reference_s'] * 1000:.2f} ms, "
+                f"full evaluate {result['full_evaluate_s'] * 1000:.2f} ms ({result['speedup'] or 0:.1f}x)"
+            )
+
+    commit = git_commit()
+    timestamp = datetime.datetime.now(datetime.timezone.utc)
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": timestamp.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "models": args.models,
+            "compiled": sorted(evaluator.compiled),
+            "distilled": distilled,
+            "concurrency": args.concurrency,
+            "batch_max_windows": args.batch_max_windows,
+            "batch_stats": evaluator.batch_stats(),
+            "pairwise": sorted(evaluator.pairwise),
+            "variants": args.variants,
+            "method": args.method,
+            "scan": args.scan,
+            "strands": args.strands,
+            "max_predictions": args.max_predictions,
+            "threshold": args.threshold,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_OUTPUT_DIR, f"{timestamp:%Y%m%dT%H%M%S}-{commit or 'nogit'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Startup benchmark for the API.
+
+Measures, in fresh processes, how long importing api.main takes, how long uvicorn takes to
+answer /healthz (time to listen) and how long until /readyz reports every zone loaded and
+warmed up (time to ready). While the models load it also times the 503 answer of /predict.
+
+Usage (from the project root):
+
+    python -m benchmarks.benchmark_startup --repeats 5
+    GENETIC_ZONE_MODEL_BACKEND=exported python -m benchmarks.benchmark_startup --repeats 3
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# Make the 'benchmarks' package importable when running this file directly.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.benchmark_evaluator import DEFAULT_OUTPUT_DIR, git_commit, percentiles
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import api.main; print(time.perf_counter() - start)"
+POLL_INTERVAL = 0.01
+
+
+def measure_import():
+    """
+    :return: (seconds spent importing api.main, wall seconds of the whole interpreter run)
+    """
+    start = time.perf_counter()
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL)
+    process_seconds = time.perf_counter() - start
+    return float(output.decode().strip().splitlines()[-1]), process_seconds
+
+
+def request(url, data=None):
+    """
+    :return: (status code, decoded JSON body or None); status 0 when nothing listens yet
+    """
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=5) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return 0, None
+
+
+def measure_launch(port, timeout):
+    """
+    Starts uvicorn on the app, polls /healthz until it answers, probes /predict once while the
+    models load, then polls /readyz until it reports ready or failed.
+
+    :return: Dictionary with listen_s, predict_503_ms, ready_s (None if not ready in time) and
+             the last /readyz body
+    """
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    result = {"listen_s": None, "predict_503_ms": None, "ready_s": None, "readyz": None}
+    try:
+        while time.perf_counter() - start < timeout:
+            if request(f"{base}/healthz")[0] == 200:
+                result["listen_s"] = time.perf_counter() - start
+                break
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode} before listening")
+            time.sleep(POLL_INTERVAL)
+        if result["listen_s"] is None:
+            return result
+
+        probe = time.perf_counter()
+        code, _ = request(f"{base}/predict", data=json.dumps({"sequence": "acgt" * 150}).encode())
+        if code == 503:
+            result["predict_503_ms"] = (time.perf_counter() - probe) * 1000
+
+        while time.perf_counter() - start < timeout:
+            code, body = request(f"{base}/readyz")
+            result["readyz"] = body
+            if code == 200:
+                result["ready_s"] = time.perf_counter() - start
+                break
+            if body and body.get("status") == "failed":
+                break
+            time.sleep(POLL_INTERVAL)
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summary(samples):
+    samples = [sample for sample in samples if sample is not None]
+    return percentiles(samples) if samples else None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark API import, time to listen and time to ready.")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh processes per measurement.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=600.0,
+                        help="Seconds to wait for /healthz and then /readyz in each launch.")
+    parser.add_argument("--no-launch", action="store_true", help="Only measure the import time.")
+    parser.add_argument("--output", default=None,
+                        help="JSON file to write. Defaults to benchmarks/results/startup-<timestamp>-<commit>.json.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    imports = [measure_import() for _ in range(args.repeats)]
+    results = {
+        "import_s": summary([seconds for seconds, _ in imports]),
+        "process_import_s": summary([seconds for _, seconds in imports]),
+    }
+    print(f"import api.main      p50 {results['import_s']['p50'] * 1000:9.1f} ms  "
+          f"(interpreter + import {results['process_import_s']['p50'] * 1000:9.1f} ms)")
+
+    if not args.no_launch:
+        launches = [measure_launch(args.port, args.timeout) for _ in range(args.repeats)]
+        results.update(
+            listen_s=summary([launch["listen_s"] for launch in launches]),
+            predict_503_ms=summary([launch["predict_503_ms"] for launch in launches]),
+            ready_s=summary([launch["ready_s"] for launch in launches]),
+            readyz=launches[-1]["readyz"],
+        )
+        for name, unit in (("listen_s", "s"), ("predict_503_ms", "ms"), ("ready_s", "s")):
+            value = results[name]
+            print(f"{name:<20} " + (f"p50 {value['p50']:9.3f} {unit}" if value else "n/a"))
+        if results["ready_s"] is None:
+            print(f"Models did not become ready: {results['readyz']}")
+
+    commit = git_commit()
+    timestamp = datetime.datetime.now(datetime.timezone.utc)
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": timestamp.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeats": args.repeats,
+            "backend": os.environ.get("GENETIC_ZONE_MODEL_BACKEND", "autogluon"),
+        },
+        "results": results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_OUTPUT_DIR, f"startup-{timestamp:%Y%m%dT%H%M%S}-{commit or 'nogit'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
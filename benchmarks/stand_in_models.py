@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+# Window width seen by each zone model (number of B{i} columns).
+ZONE_WINDOW_SIZES = {
+    "ei": 12,
+    "ie": 105,
+    "ze": 550,
+    "ez": 550,
+}
+
+# Pairwise models: (window width, (other zone, zone the model confirms)).
+PAIRWISE_CLASSES = {
+    "ei-ie": (12, ("ie", "ei")),
+    "ie-ei": (105, ("ei", "ie")),
+    "ze-ez": (550, ("ez", "ze")),
+}
+
+NUCLEOTIDES = "acgt"
+
+
+class StandInPredictor:
+    """
+    Small deterministic replacement for an AutoGluon TabularPredictor.
+
+    The model is a random position weight matrix: every (position, nucleotide) pair has a
+    fixed weight, a window's score is the sum of its weights and the probability is the
+    logistic of that score. It reads the same B1..Bn columns as the real models and returns
+    the same 'false'/'true' probability columns, so GeneticZoneEvaluator can run end-to-end
+    without the trained models in models/. With other 'classes' it stands in for a pairwise
+    model, whose columns are zone names.
+    """
+    def __init__(self, window_size, seed=0, classes=("false", "true")):
+        self.window_size = window_size
+        self.classes = classes
+        self.features = [f"B{i + 1}" for i in range(window_size)]
+        rng = np.random.default_rng(seed)
+        # Scaled so that the score has roughly unit variance regardless of the window width.
+        self.weights = rng.normal(0.0, 1.0 / np.sqrt(window_size), size=(window_size, len(NUCLEOTIDES)))
+        self.bias = -1.0
+
+        # Lookup table from nucleotide byte to column index in the weight matrix.
+        self._codes = np.zeros(256, dtype=np.intp)
+        for code, nucleotide in enumerate(NUCLEOTIDES):
+            self._codes[ord(nucleotide)] = code
+            self._codes[ord(nucleotide.upper())] = code
+
+    def predict_proba(self, df, as_pandas=True):
+        values = df[self.features].to_numpy(dtype="U1")
+        codes = self._codes[values.view(np.uint32)]
+        scores = self.weights[np.arange(self.window_size), codes].sum(axis=1) + self.bias
+        proba_true = 1.0 / (1.0 + np.exp(-scores))
+        if not as_pandas:
+            return np.column_stack([1.0 - proba_true, proba_true])
+        return pd.DataFrame({self.classes[0]: 1.0 - proba_true, self.classes[1]: proba_true}, index=df.index)
+
+
+def build_stand_in_predictors(zones=None, seed=0):
+    """
+    Builds one StandInPredictor per zone, keyed like MODEL_PATHS.
+
+    :param zones: Iterable of zone names to build. Defaults to all four zones.
+    :param seed: Base seed; each zone gets its own weights derived from it.
+    :return: Dictionary zone -> StandInPredictor
+    """
+    zones = list(zones or ZONE_WINDOW_SIZES)
+    return {
+        zone: StandInPredictor(ZONE_WINDOW_SIZES[zone], seed=seed + i)
+        for i, zone in enumerate(zones)
+    }
+
+
+def build_stand_in_pairwise(names=None, seed=100):
+    """
+    Builds one pairwise StandInPredictor per pairwise model, keyed like PAIRWISE_MODEL_PATHS.
+
+    :param names: Iterable of pairwise model names. Defaults to all three.
+    :param seed: Base seed, distinct from the zone models' by default.
+    :return: Dictionary name -> StandInPredictor
+    """
+    pairwise = {}
+    for i, name in enumerate(names or PAIRWISE_CLASSES):
+        width, classes = PAIRWISE_CLASSES[name]
+        pairwise[name] = StandInPredictor(width, seed=seed + i, classes=classes)
+        # Unlike a zone model, a pairwise model has no rare class: it splits the hits evenly.
+        pairwise[name].bias = 0.0
+    return pairwise
@@ -0,0 +1,34 @@
+"""
+Shared fixtures: an evaluator on the stand-in models of benchmarks/stand_in_models.py, and an
+API client serving it.
+"""
+import numpy as np
+import pytest
+
+from benchmarks.stand_in_models import build_stand_in_predictors
+
+
+def random_sequence(length, seed=0):
+    rng = np.random.default_rng(seed)
+    return "".join(rng.choice(list("acgt"), size=length))
+
+
+@pytest.fixture(scope="session")
+def stand_in_evaluator():
+    from api.GeneticZoneEvaluator import GeneticZoneEvaluator
+
+    return GeneticZoneEvaluator(predictors=build_stand_in_predictors())
+
+
+@pytest.fixture
+def client(stand_in_evaluator, monkeypatch):
+    """
+    TestClient of the API with the stand-in evaluator in place of the configured models (the
+    startup load does not run outside a 'with' block).
+    """
+    from fastapi.testclient import TestClient
+
+    import api.main as main
+
+    monkeypatch.setattr(main, "evaluator", stand_in_evaluator)
+    return TestClient(main.app)
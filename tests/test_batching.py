@@ -0,0 +1,136 @@
+"""
+MicroBatcher (api/batching.py) with a fake model: each window is one row whose first column
+identifies it, and the model returns that column as its probability.
+"""
+import threading
+import time
+
+import numpy as np
+
+from api.batching import Concurrency, MicroBatcher
+
+
+class Model:
+    """
+    Records the number of rows of every call. The calls made while gate is clear block until
+    it is set, holding the batcher's worker busy so that other callers queue up.
+    """
+    def __init__(self, error=None):
+        self.sizes = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.error = error
+
+    def __call__(self, inputs):
+        self.sizes.append(len(inputs))
+        assert self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return inputs[:, 0].astype(float)
+
+
+def windows(first, count):
+    return np.arange(first, first + count, dtype=np.uint8).reshape(-1, 1).repeat(3, axis=1)
+
+
+def call_in_thread(batcher, inputs, outcomes, key):
+    def run():
+        try:
+            outcomes[key] = batcher(inputs)
+        except Exception as e:
+            outcomes[key] = e
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def queue_behind_blocker(batcher, model, callers):
+    """
+    Holds the worker in a model call and queues callers behind it.
+
+    :param callers: Dictionary key -> inputs
+    :return: Outcomes dictionary (filled as the calls return) and the caller threads
+    """
+    outcomes = {}
+    model.gate.clear()
+    threads = [call_in_thread(batcher, windows(200, 1), outcomes, "blocker")]
+    wait_until(lambda: model.sizes)
+    for key, inputs in callers.items():
+        threads.append(call_in_thread(batcher, inputs, outcomes, key))
+    wait_until(lambda: batcher._queue.qsize() == len(callers))
+    return outcomes, threads
+
+
+def test_concurrent_calls_share_one_model_call_and_get_their_own_rows():
+    model = Model()
+    concurrency = Concurrency()
+    batcher = MicroBatcher(model, concurrency, max_windows=64, max_wait=0.5)
+    callers = {index: windows(10 * index, index + 1) for index in range(5)}
+
+    concurrency.active = 6
+    outcomes, threads = queue_behind_blocker(batcher, model, callers)
+    model.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert model.sizes == [1, sum(len(inputs) for inputs in callers.values())]
+    for key, inputs in callers.items():
+        np.testing.assert_array_equal(outcomes[key], inputs[:, 0].astype(float))
+    assert batcher.stats() == {"calls": 6, "model_calls": 2, "windows": 16}
+
+
+def test_calls_of_max_windows_bypass_the_queue():
+    model = Model()
+    batcher = MicroBatcher(model, Concurrency(), max_windows=4)
+
+    np.testing.assert_array_equal(batcher(windows(0, 4)), np.arange(4.0))
+    assert batcher._queue is None
+
+
+def test_lone_call_does_not_wait_for_others():
+    batcher = MicroBatcher(Model(), Concurrency(), max_windows=64, max_wait=2.0)
+
+    with batcher.concurrency:
+        start = time.perf_counter()
+        np.testing.assert_array_equal(batcher(windows(0, 3)), np.arange(3.0))
+    assert time.perf_counter() - start < 0.5
+
+
+def test_model_error_reaches_every_caller_of_the_batch():
+    model = Model(error=RuntimeError("model failed"))
+    batcher = MicroBatcher(model, Concurrency(), max_windows=64, max_wait=0.5)
+
+    outcomes, threads = queue_behind_blocker(batcher, model, {index: windows(10 * index, 2) for index in range(3)})
+    model.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert model.sizes == [1, 6]
+    assert len(outcomes) == 4
+    assert all(isinstance(outcome, RuntimeError) and str(outcome) == "model failed" for outcome in outcomes.values())
+
+
+def test_close_releases_queued_callers_and_later_calls_run_directly():
+    model = Model()
+    batcher = MicroBatcher(model, Concurrency(), max_windows=64, max_wait=0.5)
+    callers = {index: windows(10 * index, 2) for index in range(3)}
+
+    outcomes, threads = queue_behind_blocker(batcher, model, callers)
+    batcher.close()
+    model.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert not any(thread.is_alive() for thread in threads)
+    for key, inputs in callers.items():
+        np.testing.assert_array_equal(outcomes[key], inputs[:, 0].astype(float))
+    np.testing.assert_array_equal(batcher(windows(50, 2)), [50.0, 51.0])
+    assert model.sizes == [1, 6, 2]
+
@@ -0,0 +1,70 @@
+"""
+Cancelled evaluations: CancellationToken (api/cancellation.py) stopping an evaluation between
+work units, and how the API answers cancelled requests (api/main.py).
+"""
+import json
+
+import pytest
+
+import api.main as main
+from api.cancellation import CancellationToken, EvaluationCancelled
+from api.GeneticZoneEvaluator import GeneticZoneEvaluator
+from benchmarks.stand_in_models import build_stand_in_predictors
+from tests.conftest import random_sequence
+
+SEQUENCE = random_sequence(3000, seed=6)
+
+
+def test_passed_deadline_is_answered_with_504(client):
+    response = client.post("/predict", json={"sequence": SEQUENCE, "deadline_seconds": 1e-6})
+
+    assert response.status_code == 504
+
+
+def test_passed_deadline_ends_the_stream_in_band(client):
+    with client.stream("POST", "/predict/stream", json={"sequence": SEQUENCE, "deadline_seconds": 1e-6}) as response:
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert lines[-1] == {"type": "cancelled", "reason": "deadline"}
+
+
+def test_disconnect_ends_the_request_without_an_error():
+    response = main.cancelled_response(EvaluationCancelled("disconnect"))
+
+    assert response.status_code == 204 and response.body == b""
+
+
+def test_token_deadline_and_first_reason():
+    assert not CancellationToken.after(None).cancelled
+    token = CancellationToken.after(-1)
+    assert token.cancelled and token.reason == "deadline"
+    token.cancel("disconnect")
+    with pytest.raises(EvaluationCancelled, match="deadline"):
+        token.check()
+
+
+def test_evaluation_stops_at_the_work_unit_after_the_cancellation():
+    predictors = build_stand_in_predictors()
+    cancel = CancellationToken()
+    calls = []
+    predict_proba = predictors["ze"].predict_proba
+
+    def cancelling(df, *args, **kwargs):
+        calls.append(len(df))
+        if len(calls) == 3:
+            cancel.cancel("disconnect")
+        return predict_proba(df, *args, **kwargs)
+
+    predictors["ze"].predict_proba = cancelling
+    evaluator = GeneticZoneEvaluator(predictors=predictors, batch_max_windows=0)
+    sequence = random_sequence(5000, seed=6)
+
+    with pytest.raises(EvaluationCancelled, match="disconnect"):
+        evaluator.evaluate(sequence, "percentage", threshold=0.6, work_unit=500, cancel=cancel)
+    assert calls == [500, 500, 500]
+    assert 0 < cancel.done < evaluator.estimate_cost(sequence)
+
+    calls.clear()
+    evaluator.evaluate(sequence, "percentage", threshold=0.6, work_unit=500, cancel=CancellationToken())
+    assert len(calls) == 9  # 4451 window starts
@@ -0,0 +1,37 @@
+"""
+Cascade scan (GeneticZoneEvaluator._scan_cascade) against the exhaustive scan, with a ZE model
+whose score is smooth along the sequence, as the cascade assumes.
+"""
+import pytest
+
+from api.GeneticZoneEvaluator import GeneticZoneEvaluator
+from benchmarks.stand_in_models import build_stand_in_predictors
+from tests.conftest import random_sequence
+
+PEAK = 1512  # Half a CASCADE_STRIDE from the nearest coarse offsets (1500, 1525)
+
+
+@pytest.fixture(scope="module")
+def evaluator():
+    predictors = build_stand_in_predictors()
+    # Counts the g of a window: 0.5 for 545 of them, about 0.3 for a window 12 bases off a
+    # block of 550, where the coarse pass scores it.
+    predictors["ze"].weights[:] = [0.0, 0.0, 0.2, 0.0]
+    predictors["ze"].bias = -0.2 * 545
+    return GeneticZoneEvaluator(predictors=predictors)
+
+
+@pytest.fixture(scope="module")
+def sequence():
+    background = random_sequence(4000, seed=4)
+    return background[:PEAK] + "g" * 550 + background[PEAK + 550 :]
+
+
+@pytest.mark.parametrize("regions", [None, {"ze": [(1400, 1700)]}])
+@pytest.mark.parametrize("max_predictions", [1, 3])
+def test_top_n_cascade_finds_a_peak_between_coarse_offsets(evaluator, sequence, regions, max_predictions):
+    exhaustive = evaluator.evaluate(sequence, "top_n", max_predictions, 0.5, regions=regions)["ze"]
+    cascade = evaluator.evaluate(sequence, "top_n", max_predictions, 0.5, scan="cascade", regions=regions)["ze"]
+
+    assert exhaustive and all(abs(hit - PEAK) < 5 for hit in exhaustive)
+    assert sorted(cascade) == sorted(exhaustive)
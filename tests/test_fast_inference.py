@@ -0,0 +1,113 @@
+"""
+The fast path (api/fast_inference.py) must reproduce TabularPredictor.predict_proba. These
+tests fit tiny AutoGluon predictors on random windows, compile them and compare both scorers.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("autogluon.tabular")
+from autogluon.tabular import TabularPredictor
+
+from api.fast_inference import compile_predictor, verify_compiled
+from api.sequence import NUCLEOTIDES, UNKNOWN_CODE
+
+WIDTH = 12
+TOLERANCE = 1e-6
+
+
+def training_frame(rows, seed):
+    """
+    Random windows labelled by a logistic model with one effect per position and nucleotide.
+    """
+    rng = np.random.default_rng(seed)
+    windows = rng.integers(0, len(NUCLEOTIDES), size=(rows, WIDTH))
+    effects = np.random.default_rng(42).normal(0, 1, size=(WIDTH, len(NUCLEOTIDES)))
+    logit = effects[np.arange(WIDTH), windows].sum(axis=1)
+    alphabet = np.array(list(NUCLEOTIDES), dtype=object)
+    df = pd.DataFrame(alphabet[windows], columns=[f"B{i + 1}" for i in range(WIDTH)])
+    df["label"] = np.where(rng.random(rows) < 1 / (1 + np.exp(-logit)), "true", "false")
+    return df
+
+
+def fit(path, hyperparameters):
+    # With fewer than 1000 validation rows the weighted ensemble only considers the best
+    # model of each type, i.e. a single LightGBM.
+    return TabularPredictor(label="label", path=str(path), eval_metric="log_loss", verbosity=0).fit(
+        training_frame(800, seed=0), tuning_data=training_frame(1000, seed=1),
+        hyperparameters=hyperparameters, num_cpus=1, num_gpus=0,
+    )
+
+
+@pytest.fixture(scope="module")
+def plain_predictor(tmp_path_factory):
+    predictor = fit(tmp_path_factory.mktemp("plain"), {"GBM": [{"num_boost_round": 40}]})
+    predictor.set_model_best("LightGBM")
+    return predictor
+
+
+@pytest.fixture(scope="module")
+def ensemble_predictor(tmp_path_factory):
+    # Two single deep trees grown on different row samples: their errors are independent
+    # enough that the greedy ensemble blends them instead of keeping the better one.
+    tree = {"num_boost_round": 1, "learning_rate": 1.0, "num_leaves": 64, "min_data_in_leaf": 2,
+            "bagging_fraction": 0.3, "bagging_freq": 1}
+    predictor = fit(tmp_path_factory.mktemp("ensemble"), {"GBM": [
+        {**tree, "bagging_seed": 1},
+        {**tree, "bagging_seed": 2, "ag_args": {"name_suffix": "B"}},
+    ]})
+    predictor.set_model_best("WeightedEnsemble_L2")
+    return predictor
+
+
+def random_windows(rows, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, len(NUCLEOTIDES), size=(rows, WIDTH), dtype=np.uint8)
+
+
+def window_frame(windows):
+    alphabet = np.array(list(NUCLEOTIDES) + [None], dtype=object)
+    return pd.DataFrame(alphabet[windows], columns=[f"B{i + 1}" for i in range(WIDTH)])
+
+
+def expected_proba(predictor, windows):
+    return predictor.predict_proba(window_frame(windows))[predictor.positive_class].to_numpy()
+
+
+@pytest.mark.parametrize("name", ["plain_predictor", "ensemble_predictor"])
+def test_compiled_matches_predict_proba(name, request):
+    predictor = request.getfixturevalue(name)
+    compiled = compile_predictor(predictor)
+    windows = random_windows(2000)
+
+    assert np.max(np.abs(compiled.predict_true_proba(windows) - expected_proba(predictor, windows))) <= TOLERANCE
+    assert verify_compiled(predictor, compiled, rows=1000, seed=2) <= TOLERANCE
+
+
+@pytest.mark.parametrize("name", ["plain_predictor", "ensemble_predictor"])
+def test_compiled_predict_proba_frame(name, request):
+    predictor = request.getfixturevalue(name)
+    compiled = compile_predictor(predictor)
+    windows = random_windows(300, seed=3)
+    df = window_frame(windows)
+
+    got = compiled.predict_proba(df)
+    expected = predictor.predict_proba(df)
+    assert list(got.columns) == list(expected.columns)
+    assert np.max(np.abs(got.to_numpy() - expected.to_numpy())) <= TOLERANCE
+
+
+def test_ensemble_compiles_every_weighted_member(ensemble_predictor):
+    compiled = compile_predictor(ensemble_predictor)
+    weights = ensemble_predictor._trainer.load_model("WeightedEnsemble_L2")._get_model_weights()
+
+    assert len(compiled.members) == sum(weight > 0 for weight in weights.values()) == 2
+    assert sum(member.weight for member in compiled.members) == pytest.approx(1.0)
+
+
+def test_unknown_bases_match_missing_values(plain_predictor):
+    compiled = compile_predictor(plain_predictor)
+    windows = random_windows(500, seed=4)
+    windows[::3, 3] = UNKNOWN_CODE
+
+    assert np.max(np.abs(compiled.predict_true_proba(windows) - expected_proba(plain_predictor, windows))) <= TOLERANCE
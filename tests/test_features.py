@@ -0,0 +1,64 @@
+"""
+Feature encoders (api/features.py): the incremental scan of a contiguous segment must give
+the features encode() builds window by window, and specs must survive save/load.
+"""
+import numpy as np
+import pytest
+
+from api.features import KmerCountEncoder, get_encoder, load_encoder, save_encoder
+from api.sequence import UNKNOWN_CODE, window_matrix
+
+SPECS = [
+    "kmer:k=1",
+    "kmer:k=3",
+    "kmer:k=3,chunk_size=7",  # Several scan blocks, with windows spanning block edges
+    "gc:size=50",
+    "gc:size=40",  # The last sub-window of a 105 or 550 base window is shorter
+    "onehot",
+    "kmer:k=2,chunk_size=5+gc:size=50+onehot",
+]
+
+
+@pytest.fixture(scope="module")
+def codes():
+    codes = np.random.default_rng(3).integers(0, 4, size=1500).astype(np.uint8)
+    codes[[10, 11, 300, 1499]] = UNKNOWN_CODE
+    return codes
+
+
+@pytest.mark.parametrize("spec", SPECS)
+@pytest.mark.parametrize("width", [12, 105, 550])
+def test_scan_equals_encode_of_every_window(codes, spec, width):
+    encoder = get_encoder(spec)
+    windows = window_matrix(codes, np.arange(len(codes) - width + 1), width)
+
+    scanned = encoder.scan(codes, width)
+
+    assert scanned.shape == (len(windows), len(encoder.feature_names(width)))
+    np.testing.assert_array_equal(scanned, encoder.encode(windows))
+
+
+@pytest.mark.parametrize("spec", SPECS + ["kmer:k=4,chunk_size=16384"])
+def test_save_and_load_keep_the_spec(tmp_path, spec):
+    save_encoder(get_encoder(spec), tmp_path)
+    loaded = load_encoder(tmp_path)
+
+    assert loaded.spec() == get_encoder(spec).spec()
+
+
+def test_directory_without_encoder_file_loads_none(tmp_path):
+    assert load_encoder(tmp_path) is None
+
+
+def test_load_restores_the_kmer_chunk_size(tmp_path):
+    save_encoder(get_encoder("kmer:k=3,chunk_size=512+gc:size=50"), tmp_path)
+    kmer = load_encoder(tmp_path).parts[0]
+
+    assert isinstance(kmer, KmerCountEncoder) and (kmer.k, kmer.chunk_size) == (3, 512)
+    assert get_encoder("kmer:k=3").spec() == "kmer:k=3"  # The default chunk size is left out
+
+
+@pytest.mark.parametrize("spec", ["kmers:k=3", "kmer:q=3", "gc:size=50+unknown"])
+def test_invalid_spec(spec):
+    with pytest.raises(ValueError):
+        get_encoder(spec)
@@ -0,0 +1,91 @@
+"""
+Region-limited evaluation: merge_intervals / interval_mask (api/sequence.py), the regions
+validator of PredictionRequest, and evaluate(regions=...) against a full evaluation.
+"""
+import numpy as np
+import pytest
+
+from api.sequence import interval_mask, merge_intervals
+from tests.conftest import random_sequence
+
+LENGTH = 3000
+THRESHOLD = 0.3  # Low enough for the stand-ins to hit every zone inside and outside its regions
+REGIONS = {
+    "ei": [(100, 400), (350, 900), (2990, 5000)],  # Overlapping, and past the end
+    "ie": [(0, 700), (700, 1200)],  # Adjacent
+    "ze": [(1200, 1300), (10, 20)],  # Unsorted
+    "ez": [(2400, 2450)],  # Only the last windows of the strand fit
+}
+
+
+@pytest.fixture(scope="module")
+def sequence():
+    return random_sequence(LENGTH, seed=8)
+
+
+@pytest.mark.parametrize("intervals, merged", [
+    ([], []),
+    ([(5, 10)], [(5, 10)]),
+    ([(20, 30), (5, 10)], [(5, 10), (20, 30)]),
+    ([(5, 10), (8, 12)], [(5, 12)]),  # Overlapping
+    ([(5, 10), (10, 12)], [(5, 12)]),  # Adjacent
+    ([(5, 20), (8, 12)], [(5, 20)]),  # Nested
+    ([(5, 5), (9, 7), (1, 2)], [(1, 2)]),  # Empty
+])
+def test_merge_intervals(intervals, merged):
+    assert merge_intervals(intervals) == merged
+
+
+def test_interval_mask_uses_half_open_intervals():
+    positions = np.arange(-2, 30)
+    intervals = merge_intervals([(0, 3), (10, 12), (12, 14), (25, 100)])
+
+    expected = [position for position in positions if any(start <= position < end for start, end in intervals)]
+    assert positions[interval_mask(positions, intervals)].tolist() == expected
+    assert not interval_mask(positions, []).any()
+
+
+@pytest.mark.parametrize("regions", [
+    {"ze": [[-1, 10]]},
+    {"ze": [[10, 10]]},
+    {"ei": [[0, 5], [20, 10]]},
+    {"xx": [[0, 10]]},
+    {"ze": [[0, 10, 20]]},
+])
+def test_invalid_regions_are_rejected(client, sequence, regions):
+    response = client.post("/predict", json={"sequence": sequence, "regions": regions})
+
+    assert response.status_code == 422
+
+
+def inside(hits, intervals):
+    return sorted(hit for hit in hits if any(start <= hit < end for start, end in intervals))
+
+
+@pytest.mark.parametrize("strands", ["forward", "both"])
+def test_regions_give_the_full_evaluation_filtered_to_them(stand_in_evaluator, sequence, strands):
+    full = stand_in_evaluator.evaluate(sequence, "percentage", threshold=THRESHOLD, strands=strands)
+    limited = stand_in_evaluator.evaluate(sequence, "percentage", threshold=THRESHOLD, strands=strands, regions=REGIONS)
+
+    for result, expected in [(limited, full)] + ([(limited["reverse"], full["reverse"])] if strands == "both" else []):
+        for zone, intervals in REGIONS.items():
+            assert sorted(result[zone]) == inside(expected[zone], intervals), zone
+    assert all(0 < len(limited[zone]) < len(full[zone]) for zone in REGIONS)
+
+
+def test_top_n_ranks_only_the_windows_inside_the_regions(stand_in_evaluator, sequence):
+    candidates = stand_in_evaluator.evaluate(sequence, "percentage", threshold=THRESHOLD, regions=REGIONS)
+    limited = stand_in_evaluator.evaluate(sequence, "top_n", max_predictions=3, threshold=THRESHOLD, regions=REGIONS)
+
+    for zone in REGIONS:
+        assert set(limited[zone]) <= set(candidates[zone])
+        assert len(limited[zone]) == min(3, len(candidates[zone])) > 0
+
+
+def test_zones_without_regions_scan_the_whole_sequence(stand_in_evaluator, sequence):
+    full = stand_in_evaluator.evaluate(sequence, "percentage", threshold=THRESHOLD)
+    limited = stand_in_evaluator.evaluate(sequence, "percentage", threshold=THRESHOLD, regions={"ze": REGIONS["ze"]})
+
+    assert sorted(limited["ze"]) == inside(full["ze"], REGIONS["ze"])
+    for zone in ("ei", "ie", "ez"):
+        assert sorted(limited[zone]) == sorted(full[zone])
@@ -0,0 +1,66 @@
+"""
+Partial reloads: GeneticZoneEvaluator.with_zones and the pairwise models api.main loads with
+the reloaded zones.
+"""
+from api.GeneticZoneEvaluator import GeneticZoneEvaluator
+from benchmarks.stand_in_models import build_stand_in_pairwise, build_stand_in_predictors
+
+
+def evaluator(zones, pairwise_names=(), seed=0):
+    return GeneticZoneEvaluator(
+        predictors=build_stand_in_predictors(zones, seed=seed),
+        pairwise=build_stand_in_pairwise(pairwise_names) if pairwise_names else None,
+        batch_max_windows=4096,
+    )
+
+
+def test_with_zones_replaces_reloaded_pairwise_models_and_keeps_the_others():
+    live = evaluator(None, ["ze-ez", "ei-ie", "ie-ei"])
+    reloaded = evaluator(["ze", "ez"], ["ze-ez"], seed=7)
+    merged = live.with_zones(reloaded)
+
+    assert merged.predictor["ze"] is reloaded.predictor["ze"]
+    assert merged.predictor["ei"] is live.predictor["ei"]
+    assert merged.pairwise["ze-ez"] is reloaded.pairwise["ze-ez"]
+    assert merged.pairwise["ei-ie"] is live.pairwise["ei-ie"]
+    assert merged.missing_pairwise() == []
+
+
+def test_with_zones_keeps_a_pairwise_model_that_failed_to_reload():
+    live = evaluator(None, ["ze-ez", "ei-ie", "ie-ei"])
+    live.load_report["ze-ez"] = {"load_seconds": 1.0}
+    reloaded = evaluator(["ze", "ez"], seed=7)
+    reloaded.load_report["ze-ez"] = {"error": "missing"}
+    merged = live.with_zones(reloaded)
+
+    assert merged.pairwise["ze-ez"] is live.pairwise["ze-ez"]
+    assert merged.load_report["ze-ez"] == {"load_seconds": 1.0}
+
+
+def test_reload_loads_pairwise_models_with_every_zone_they_serve(monkeypatch):
+    import api.GeneticZoneEvaluator as module
+    import api.main as main
+
+    captured = {}
+
+    class Recorder:
+        def __init__(self, *args, pairwise_paths=None, **kwargs):
+            captured["pairwise"] = sorted(pairwise_paths or {})
+
+        def warm_up(self, windows):
+            pass
+
+    monkeypatch.setattr(module, "GeneticZoneEvaluator", Recorder)
+    monkeypatch.setattr(main, "PAIRWISE_ENABLED", True)
+    monkeypatch.setattr(main, "WARMUP_WINDOWS", 0)
+
+    expected = {
+        None: ["ei-ie", "ie-ei", "ze-ez"],
+        ("ei", "ie", "ze", "ez"): ["ei-ie", "ie-ei", "ze-ez"],
+        ("ze", "ez"): ["ze-ez"],
+        ("ze",): [],
+        ("ie",): ["ie-ei"],
+    }
+    for zones, names in expected.items():
+        main.build_evaluator(list(zones) if zones else None)
+        assert captured["pairwise"] == names, zones
@@ -0,0 +1,100 @@
+"""
+InferenceScheduler (api/scheduler.py) driven with fake evaluation generators: each unit of
+work yields an event naming its job, then a Checkpoint.
+"""
+import threading
+import time
+
+import pytest
+
+from api.GeneticZoneEvaluator import Checkpoint
+from api.scheduler import InferenceScheduler
+
+LARGE = 2 ** 40
+SMALL = 100
+
+
+def job(name, units, cost, log, gate=None, duration=0.0):
+    """
+    :param gate: threading.Event the first unit waits for, to hold a worker busy
+    """
+    def steps():
+        for unit in range(units):
+            if gate is not None and unit == 0:
+                assert gate.wait(5)
+            time.sleep(duration)
+            yield name
+            yield Checkpoint(cost // units)
+    return steps(), cost, log.append
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_small_job_overtakes_queued_large_job():
+    scheduler = InferenceScheduler(workers=1, reserved_workers=0, aging_half_life=60, small_cost=SMALL)
+    log, gate = [], threading.Event()
+    blocker = scheduler.submit(*job("blocker", 1, SMALL, log, gate))
+    large = scheduler.submit(*job("large", 3, LARGE, log))
+    small = scheduler.submit(*job("small", 1, SMALL, log))
+    gate.set()
+    for future in (blocker, large, small):
+        future.result(5)
+
+    assert log == ["blocker", "small", "large", "large", "large"]
+
+
+def test_reserved_worker_runs_small_job_while_large_jobs_wait():
+    scheduler = InferenceScheduler(workers=2, reserved_workers=1, aging_half_life=60, small_cost=SMALL)
+    log, gate = [], threading.Event()
+    first = scheduler.submit(*job("large-1", 1, LARGE, log, gate))
+    wait_until(lambda: scheduler.stats()["queued"] == 0)  # large-1 holds the only large slot
+    second = scheduler.submit(*job("large-2", 1, LARGE, log))
+    small = scheduler.submit(*job("small", 1, SMALL, log))
+
+    small.result(5)
+    assert log == ["small"]
+    assert not second.done()
+    gate.set()
+    first.result(5)
+    second.result(5)
+    assert log == ["small", "large-1", "large-2"]
+
+
+@pytest.mark.parametrize("half_life, starved", [(0.002, False), (60, True)])
+def test_aging_eventually_runs_large_job(half_life, starved):
+    # A steady stream of short jobs keeps the single worker busy; the large job only runs
+    # before the stream ends if aging lifts its priority.
+    scheduler = InferenceScheduler(workers=1, reserved_workers=0, aging_half_life=half_life, small_cost=SMALL)
+    log, gate = [], threading.Event()
+    scheduler.submit(*job("blocker", 1, SMALL, log, gate))
+    large = scheduler.submit(*job("large", 1, LARGE, log))
+    smalls = [scheduler.submit(*job("small", 1, SMALL, log, duration=0.002)) for _ in range(5)]
+    gate.set()
+    for _ in range(100):
+        smalls.append(scheduler.submit(*job("small", 1, SMALL, log, duration=0.002)))
+        time.sleep(0.001)
+    for future in smalls + [large]:
+        future.result(10)
+
+    position = log.index("large")
+    if starved:
+        assert position > len(log) - 10
+    else:
+        assert position < len(log) - 20
+
+
+def test_job_exception_reaches_its_future():
+    scheduler = InferenceScheduler(workers=1, reserved_workers=0)
+
+    def steps():
+        yield Checkpoint(1)
+        raise RuntimeError("model failed")
+
+    with pytest.raises(RuntimeError, match="model failed"):
+        scheduler.submit(steps(), 10, lambda event: None).result(5)
+    assert scheduler.submit(*job("after", 1, SMALL, [])).result(5) is None
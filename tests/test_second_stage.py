@@ -0,0 +1,44 @@
+"""
+Pairwise second stage (GeneticZoneEvaluator second_stage=True): it only drops first-pass hits,
+and /predict refuses it while a zone has no pairwise model.
+"""
+import pytest
+
+from api.GeneticZoneEvaluator import GeneticZoneEvaluator
+from benchmarks.stand_in_models import build_stand_in_pairwise, build_stand_in_predictors
+from tests.conftest import random_sequence
+
+
+@pytest.fixture(scope="module")
+def pairwise_evaluator():
+    return GeneticZoneEvaluator(predictors=build_stand_in_predictors(), pairwise=build_stand_in_pairwise())
+
+
+@pytest.fixture(scope="module")
+def sequence():
+    return random_sequence(3000, seed=9)
+
+
+@pytest.mark.parametrize("method, max_predictions, threshold, strands", [
+    ("top_n", 10, 0.5, "forward"),
+    ("percentage", 10, 0.4, "forward"),
+    ("percentage", 10, 0.4, "both"),
+])
+def test_second_stage_only_drops_hits(pairwise_evaluator, sequence, method, max_predictions, threshold, strands):
+    first = pairwise_evaluator.evaluate(sequence, method, max_predictions, threshold, strands=strands)
+    second = pairwise_evaluator.evaluate(sequence, method, max_predictions, threshold, strands=strands, second_stage=True)
+
+    for first_hits, second_hits in [(first, second)] + ([(first["reverse"], second["reverse"])] if strands == "both" else []):
+        for zone in ("ei", "ie", "ze", "ez"):
+            assert set(second_hits[zone]) <= set(first_hits[zone]), zone
+    assert 0 < sum(len(second[zone]) for zone in ("ei", "ie", "ze", "ez")) < sum(len(first[zone]) for zone in ("ei", "ie", "ze", "ez"))
+
+
+def test_second_stage_without_pairwise_models_is_a_conflict(client, sequence):
+    body = {"sequence": sequence, "second_stage": True}
+
+    for path in ("/predict", "/predict/stream"):
+        response = client.post(path, json=body)
+        assert response.status_code == 409, path
+        assert "ei, ie, ze, ez" in response.json()["detail"]
+    assert client.post("/predict", json={**body, "second_stage": False}).status_code == 200
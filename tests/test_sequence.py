@@ -0,0 +1,63 @@
+"""
+Sequence encoding and validation (api/sequence.py) and the 422 /predict answers for invalid
+sequences.
+"""
+import numpy as np
+import pytest
+
+from api.sequence import ENCODE_TABLE, UNKNOWN_CODE, InvalidSequenceError, encode_sequence, normalize_sequence
+from tests.conftest import random_sequence
+
+
+def test_encode_table_maps_both_cases_and_nothing_else():
+    expected = np.full(256, UNKNOWN_CODE)
+    for code, nucleotides in enumerate(("aA", "cC", "gG", "tT")):
+        for nucleotide in nucleotides:
+            expected[ord(nucleotide)] = code
+
+    np.testing.assert_array_equal(ENCODE_TABLE, expected)
+
+
+@pytest.mark.parametrize("sequence", ["acgt", "ACGT", "AcGt", b"aCgT", bytearray(b"ACgt")])
+def test_normalize_sequence_is_case_insensitive(sequence):
+    np.testing.assert_array_equal(normalize_sequence(sequence).codes, [0, 1, 2, 3])
+
+
+def test_unknown_bases_encode_to_the_unknown_code():
+    np.testing.assert_array_equal(encode_sequence("acnNgt-"), [0, 1, UNKNOWN_CODE, UNKNOWN_CODE, 2, 3, UNKNOWN_CODE])
+
+
+@pytest.mark.parametrize("sequence, position, character", [
+    ("nacgt", 0, "n"),
+    ("acgtN", 4, "N"),
+    ("acgnnnnt", 3, "n"),  # An N run is reported at its first base
+    ("acg tac", 3, " "),
+    ("acgéxa", 3, "é"),  # Non-ASCII
+    ("acgxéa", 3, "x"),  # ASCII before non-ASCII
+    (b"acgtu", 4, "u"),
+])
+def test_first_invalid_position_and_character(sequence, position, character):
+    with pytest.raises(InvalidSequenceError) as raised:
+        normalize_sequence(sequence)
+
+    assert (raised.value.position, raised.value.character) == (position, character)
+    assert f"found {character!r} at position {position}" in str(raised.value)
+
+
+def test_empty_sequence_is_rejected():
+    with pytest.raises(ValueError, match="empty"):
+        normalize_sequence("")
+
+
+@pytest.mark.parametrize("invalid", ["n", "x"])
+def test_invalid_sequence_answer_does_not_repeat_the_sequence(client, invalid):
+    sequence = random_sequence(5000, seed=2)
+    sequence = sequence[:1234] + invalid + sequence[1235:]
+    response = client.post("/predict", json={"sequence": sequence, "method": "top_n"})
+
+    assert response.status_code == 422
+    (error,) = response.json()["detail"]
+    assert f"found '{invalid}' at position 1234" in error["msg"]
+    assert "input" not in error
+    assert response.json()["body"] == {"sequence": "<5000 characters>", "method": "top_n"}
+    assert sequence[1000:1100] not in response.text
@@ -0,0 +1,47 @@
+"""
+Reverse-strand scanning (strands="both"): a motif planted on the minus strand is found there
+and reported at the forward-strand index of the base the forward scan would report.
+"""
+import numpy as np
+import pytest
+
+from benchmarks.stand_in_models import NUCLEOTIDES, build_stand_in_predictors
+from tests.conftest import random_sequence
+
+COMPLEMENT = str.maketrans("acgt", "tgca")
+# Zone -> offset in its window of the reported position, and the dinucleotide found there.
+ANCHORS = {"ei": (5, "gt"), "ie": (99, "ag"), "ze": (0, ""), "ez": (0, "")}
+PLANTED = 1000  # Lowest forward-strand index of the planted window
+
+
+def reverse_complement(sequence):
+    return sequence.translate(COMPLEMENT)[::-1]
+
+
+def best_window(zone):
+    """
+    The window the zone's stand-in model scores highest, with the zone's dinucleotide in place.
+    """
+    weights = build_stand_in_predictors()[zone].weights  # The weights of the stand_in_evaluator fixture
+    window = [NUCLEOTIDES[code] for code in np.argmax(weights, axis=1)]
+    offset, dinucleotide = ANCHORS[zone]
+    window[offset : offset + len(dinucleotide)] = dinucleotide
+    return "".join(window)
+
+
+@pytest.mark.parametrize("zone", ["ei", "ie", "ze", "ez"])
+def test_motif_on_the_reverse_strand_is_reported_in_forward_coordinates(stand_in_evaluator, zone):
+    motif = best_window(zone)
+    background = random_sequence(3000, seed=12)
+    sequence = background[:PLANTED] + reverse_complement(motif) + background[PLANTED + len(motif) :]
+    offset, _ = ANCHORS[zone]
+
+    result = stand_in_evaluator.evaluate(sequence, "top_n", max_predictions=1, threshold=0.5, strands="both")
+
+    # On the minus strand the window reads from PLANTED + len(motif) - 1 down to PLANTED.
+    position = PLANTED + len(motif) - 1 - offset
+    assert result["reverse"][zone] == [position]
+    assert result[zone] != [position]
+    # The forward scan of the reverse complement reports the same bases.
+    flipped = stand_in_evaluator.evaluate(reverse_complement(sequence), "top_n", max_predictions=1, threshold=0.5)
+    assert flipped[zone] == [len(sequence) - 1 - position]
@@ -0,0 +1,45 @@
+"""
+/predict/stream must deliver the hits /predict returns, also when its bounded event queue
+makes the evaluation wait for the client.
+"""
+import json
+
+import pytest
+
+import api.main as main
+from tests.conftest import random_sequence
+
+
+def read_stream(client, body):
+    with client.stream("POST", "/predict/stream", json=body) as response:
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+    hits = {}
+    for line in lines:
+        if line["type"] == "hits":
+            hits.setdefault(line["strand"], {}).setdefault(line["zone"], []).extend(line["positions"])
+    return lines, hits
+
+
+@pytest.mark.parametrize("queue_events", [1, 16])
+@pytest.mark.parametrize("body", [
+    {"method": "top_n", "max_number_of_predictions": 5},
+    {"method": "percentage", "threshold": 0.6},
+    {"method": "percentage", "threshold": 0.6, "strands": "both"},
+])
+def test_stream_hits_equal_predict(client, monkeypatch, queue_events, body):
+    monkeypatch.setattr(main, "STREAM_QUEUE_EVENTS", queue_events)
+    monkeypatch.setattr(main, "STREAM_TILE_SIZE", 300)  # Several tiles per ZE/EZ strand
+    body = {"sequence": random_sequence(2000, seed=5), **body}
+
+    expected = client.post("/predict", json=body).json()
+    lines, hits = read_stream(client, body)
+
+    assert lines[-1]["type"] == "complete"
+    for zone in ("ei", "ie", "ze", "ez"):
+        assert sorted(hits.get("forward", {}).get(zone, [])) == sorted(expected[zone])
+        if body.get("strands") == "both":
+            assert sorted(hits.get("reverse", {}).get(zone, [])) == sorted(expected["reverse"][zone])
+    completed = [line for line in lines if line["type"] == "zone_complete"]
+    assert [line["zone"] for line in completed] == ["ei", "ie", "ze", "ez"]
+    assert all(sum(line["hits"].values()) == sum(len(hits[strand].get(line["zone"], [])) for strand in hits) for line in completed)
@@ -0,0 +1,149 @@
+"""
+SequenceDecoder (api/upload.py) must decode FASTA and 2-bit bodies, in any chunking and with
+any supported Content-Encoding, to the codes normalize_sequence gives for the same sequence.
+"""
+import gzip
+
+import numpy as np
+import pytest
+
+from api.sequence import InvalidSequenceError, normalize_sequence
+from api.upload import (
+    PACKED_CONTENT_TYPE,
+    SequenceDecoder,
+    UnsupportedUploadError,
+    UploadError,
+    UploadTooLargeError,
+    pack_sequence,
+)
+from tests.conftest import random_sequence
+
+SEQUENCE = random_sequence(1001, seed=11)
+
+
+def fasta(sequence, header=">chr1 test record", line_width=60):
+    lines = [sequence[start : start + line_width] for start in range(0, len(sequence), line_width)]
+    return (header + "\n" + "\n".join(lines) + "\n").encode("ascii")
+
+
+def decode(body, content_type="text/x-fasta", content_encoding=None, chunk_size=None, max_bases=None):
+    decoder = SequenceDecoder.for_request(content_type, content_encoding, max_bases)
+    chunk_size = chunk_size or max(len(body), 1)
+    for start in range(0, len(body), chunk_size):
+        decoder.feed(body[start : start + chunk_size])
+    return decoder.finish()
+
+
+def assert_decodes_to(encoded, sequence):
+    np.testing.assert_array_equal(encoded.codes, normalize_sequence(sequence).codes)
+
+
+@pytest.mark.parametrize("length", [1, 3, 4, 5, 1001])
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, None])
+def test_packed_round_trip(length, chunk_size):
+    sequence = SEQUENCE[:length]
+    assert_decodes_to(decode(pack_sequence(sequence), PACKED_CONTENT_TYPE, chunk_size=chunk_size), sequence)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64, None])
+def test_fasta_in_any_chunking(chunk_size):
+    sequence = SEQUENCE[:300].upper() + SEQUENCE[300:]  # Mixed case
+    body = fasta(sequence).replace(b"\n", b"\r\n")
+    assert_decodes_to(decode(body, chunk_size=chunk_size), sequence)
+
+
+def test_fasta_without_header_is_plain_text():
+    assert_decodes_to(decode(SEQUENCE.encode("ascii"), "text/plain; charset=utf-8"), SEQUENCE)
+
+
+def test_multi_record_fasta_is_rejected():
+    body = fasta(SEQUENCE[:500]) + fasta(SEQUENCE[500:], header=">chr2")
+
+    with pytest.raises(UploadError, match="Only one FASTA record"):
+        decode(body, chunk_size=97)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 61, None])
+def test_n_run_is_reported_at_its_first_base(chunk_size):
+    sequence = SEQUENCE[:450] + "nnnnn" + SEQUENCE[455:]
+    with pytest.raises(InvalidSequenceError) as expected:
+        normalize_sequence(sequence)
+
+    with pytest.raises(InvalidSequenceError) as raised:
+        decode(fasta(sequence), chunk_size=chunk_size)
+    assert (raised.value.position, raised.value.character) == (expected.value.position, expected.value.character) == (450, "n")
+
+
+def test_pack_sequence_rejects_unknown_bases():
+    with pytest.raises(InvalidSequenceError) as raised:
+        pack_sequence("acgN")
+    assert (raised.value.position, raised.value.character) == (3, "N")
+
+
+@pytest.mark.parametrize("body, message", [
+    (b"", "shorter than its 8-byte header"),
+    (pack_sequence(SEQUENCE)[:5], "shorter than its 8-byte header"),
+    (pack_sequence(SEQUENCE)[:-3], "header announces 1001"),
+    (pack_sequence(SEQUENCE) + b"\x00", "longer than the 1001 bases"),
+])
+def test_malformed_packed_body(body, message):
+    with pytest.raises(UploadError, match=message):
+        decode(body, PACKED_CONTENT_TYPE, chunk_size=3)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_max_bases(packed):
+    body = pack_sequence(SEQUENCE) if packed else fasta(SEQUENCE)
+    content_type = PACKED_CONTENT_TYPE if packed else "text/x-fasta"
+    assert_decodes_to(decode(body, content_type, max_bases=len(SEQUENCE)), SEQUENCE)
+
+    with pytest.raises(UploadTooLargeError):
+        decode(body, content_type, chunk_size=100, max_bases=len(SEQUENCE) - 1)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 10, 333, None])
+def test_gzip_split_across_chunks(chunk_size):
+    assert_decodes_to(decode(gzip.compress(fasta(SEQUENCE)), content_encoding="gzip", chunk_size=chunk_size), SEQUENCE)
+
+
+@pytest.mark.parametrize("chunk_size", [7, None])
+def test_multi_member_gzip(chunk_size):
+    # bgzip writes one gzip member per block; a member boundary may fall anywhere in a chunk.
+    body = fasta(SEQUENCE)
+    members = b"".join(gzip.compress(body[start : start + 250]) for start in range(0, len(body), 250))
+    assert_decodes_to(decode(members, content_encoding="gzip", chunk_size=chunk_size), SEQUENCE)
+
+
+def test_packed_gzip():
+    body = gzip.compress(pack_sequence(SEQUENCE))
+    assert_decodes_to(decode(body, PACKED_CONTENT_TYPE, "gzip", chunk_size=16), SEQUENCE)
+
+
+@pytest.mark.parametrize("body, message", [
+    (gzip.compress(fasta(SEQUENCE))[:-10], "truncated"),
+    (b"not gzip at all", "Invalid gzip body"),
+])
+def test_broken_gzip(body, message):
+    with pytest.raises(UploadError, match=message):
+        decode(body, content_encoding="gzip", chunk_size=50)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 50, None])
+def test_zstd(chunk_size):
+    zstandard = pytest.importorskip("zstandard")
+    body = zstandard.ZstdCompressor().compress(fasta(SEQUENCE))
+    assert_decodes_to(decode(body, content_encoding="zstd", chunk_size=chunk_size), SEQUENCE)
+
+
+def test_zstd_without_zstandard_is_unsupported(monkeypatch):
+    import sys
+
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    with pytest.raises(UnsupportedUploadError, match="zstandard"):
+        SequenceDecoder.for_request("text/x-fasta", "zstd")
+
+
+@pytest.mark.parametrize("content_type, content_encoding", [("application/json", None), ("text/x-fasta", "br")])
+def test_unsupported_content(content_type, content_encoding):
+    with pytest.raises(UnsupportedUploadError):
+        SequenceDecoder.for_request(content_type, content_encoding)
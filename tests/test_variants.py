@@ -0,0 +1,138 @@
+"""
+Delta scoring of variants (api/variants.py, GeneticZoneEvaluator.score_variants) must give the
+hits a full evaluate() of each edited sequence gives.
+"""
+import numpy as np
+import pytest
+
+from api.sequence import normalize_sequence
+from api.variants import ReferenceCache, ReferenceScores, Variant, sequence_digest
+from tests.conftest import random_sequence
+
+LENGTH = 1400
+METHODS = [("top_n", 10, 0.5), ("top_n", 3, 0.6), ("percentage", 10, 0.6)]
+
+
+def edits(sequence):
+    """
+    SNVs, insertions and deletions at the ends of the sequence (within one ZE/EZ window of
+    them), around the middle and across the EI/IE window widths.
+    """
+    n = len(sequence)
+    result = []
+    for position in (0, 11, 104, 549, n // 2, n - 550, n - 12, n - 3):
+        base = sequence[position]
+        result.append(Variant(position, base, "a" if base != "a" else "c"))  # SNV
+        result.append(Variant(position, "", "gtaag"))  # Insertion
+        result.append(Variant(position, sequence[position : position + 3], ""))  # Deletion
+        result.append(Variant(position, sequence[position : position + 2], "ttt"))  # Substitution with a shift
+    result.append(Variant(n, "", "ag"))  # Insertion after the last base
+    result.append(Variant(n - 2, sequence[n - 2 :], ""))  # Deletion of the last bases
+    return result
+
+
+def apply(sequence, variant):
+    return sequence[: variant.position] + variant.alt + sequence[variant.position + len(variant.ref) :]
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return random_sequence(LENGTH, seed=3)
+
+
+@pytest.mark.parametrize("method, max_predictions, threshold", METHODS)
+def test_deltas_match_full_evaluation_of_edited_sequences(stand_in_evaluator, reference, method, max_predictions, threshold):
+    variants = edits(reference)
+    scores, deltas = stand_in_evaluator.score_variants(reference, variants, method, max_predictions, threshold)
+
+    expected_reference = stand_in_evaluator.evaluate(reference, method, max_predictions, threshold)
+    assert scores.hits(method, max_predictions, threshold) == {zone: sorted(hits) for zone, hits in expected_reference.items()}
+    for variant, delta in zip(variants, deltas):
+        expected = stand_in_evaluator.evaluate(apply(reference, variant), method, max_predictions, threshold)
+        for zone, zone_delta in delta.items():
+            label = f"{zone} {variant.position} {variant.ref!r}>{variant.alt!r}"
+            assert zone_delta["hits"] == sorted(expected[zone]), label
+            mapped = variant.to_variant(np.array(sorted(expected_reference[zone]), dtype=int))
+            assert zone_delta["gained"] == [hit for hit in zone_delta["hits"] if hit not in set(mapped.tolist())], label
+            assert zone_delta["lost"] == [
+                hit for hit, moved in zip(sorted(expected_reference[zone]), mapped.tolist()) if moved not in set(zone_delta["hits"])
+            ], label
+
+
+def test_cached_reference_gives_the_same_deltas(stand_in_evaluator, reference):
+    variants = edits(reference)[:8]
+    scores, first = stand_in_evaluator.score_variants(reference, variants)
+    again, second = stand_in_evaluator.score_variants(reference, variants, reference=scores)
+
+    assert again is scores
+    assert first == second
+
+
+def test_min_delta_only_hides_small_changes(stand_in_evaluator, reference):
+    variant = Variant(1000, reference[1000], "g" if reference[1000] != "g" else "t")
+    _, (everything,) = stand_in_evaluator.score_variants(reference, [variant], min_delta=0.0)
+    _, (large,) = stand_in_evaluator.score_variants(reference, [variant], min_delta=0.05)
+
+    for zone in everything:
+        assert large[zone]["hits"] == everything[zone]["hits"]
+        assert large[zone]["windows"] == [
+            window for window in everything[zone]["windows"]
+            if window["reference"] is None or window["variant"] is None or abs(window["variant"] - window["reference"]) >= 0.05
+        ]
+
+
+def test_sequence_digest_ignores_case_and_separates_sequences(reference):
+    assert sequence_digest(normalize_sequence(reference)) == sequence_digest(normalize_sequence(reference.upper()))
+    assert sequence_digest(normalize_sequence(reference)) != sequence_digest(normalize_sequence("c" + reference[1:]))
+
+
+def test_reference_cache_evicts_least_recently_used():
+    cache = ReferenceCache(max_entries=2)
+    a, b, c = (ReferenceScores(0, {}) for _ in range(3))
+    cache.put("a", a)
+    cache.put("b", b)
+    assert cache.get("a") is a
+    cache.put("c", c)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is a and cache.get("c") is c
+    assert cache.stats()["entries"] == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_disabled_reference_cache_keeps_nothing():
+    cache = ReferenceCache(max_entries=0)
+    cache.put("a", ReferenceScores(0, {}))
+
+    assert cache.get("a") is None
+
+
+def test_variant_endpoint_caches_the_reference(client, stand_in_evaluator, reference):
+    body = {"sequence": reference, "variants": [{"position": 700, "ref": reference[700:702], "alt": ""}], "min_delta": 0.0}
+    first = client.post("/predict/variants", json=body)
+    second = client.post("/predict/variants", json=body)
+    assert first.status_code == second.status_code == 200
+    assert second.json()["reference_cached"]
+    assert first.json()["variants"] == second.json()["variants"]
+    edited = ("c" if reference[0] != "c" else "g") + reference[1:]
+    other = client.post("/predict/variants", json={**body, "sequence": edited})
+    assert other.status_code == 200
+    assert not other.json()["reference_cached"]
+
+    expected = stand_in_evaluator.evaluate(reference[:700] + reference[702:])
+    assert {zone: delta["hits"] for zone, delta in first.json()["variants"][0]["zones"].items()} == {
+        zone: sorted(hits) for zone, hits in expected.items()
+    }
+
+
+@pytest.mark.parametrize("variant, message", [
+    ({"position": 5, "alt": "a"}, "does not match the sequence"),
+    ({"position": LENGTH - 1, "ref": "aa", "alt": "c"}, "extends past the end"),
+    ({"position": LENGTH + 1, "ref": "", "alt": "c"}, "extends past the end"),
+])
+def test_variant_endpoint_rejects_variants_not_on_the_reference(client, reference, variant, message):
+    variant.setdefault("ref", "c" if reference[5] != "c" else "g")
+    response = client.post("/predict/variants", json={"sequence": reference, "variants": [variant]})
+
+    assert response.status_code == 422
+    assert message in response.text
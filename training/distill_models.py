@@ -0,0 +1,253 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Make the project packages importable when running this file from training/.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from api.config import DISTILLED_MODEL_PATHS, EXPORTED_MODEL_PATHS, MODEL_PATHS
+from api.distilled import DistilledScorer
+from api.features import frame_to_codes
+from api.sequence import DECODE_ALPHABET, NUCLEOTIDES, UNKNOWN_CODE
+from training.train_models import JOBS, read_zone_data
+
+WINDOW_SIZE = 550
+
+
+def load_teacher(zone, backend="autogluon"):
+    """
+    Loads the model to distill as a function scoring encoded windows.
+
+    Args:
+        zone (str): 'ze' or 'ez'
+        backend (str): 'autogluon' loads MODEL_PATHS (compiled to the fast path when supported),
+                       'exported' loads EXPORTED_MODEL_PATHS
+
+    Returns:
+        callable: uint8 windows (n, 550) -> probability of the 'true' class
+    """
+    from api.fast_inference import UnsupportedModelError, compile_predictor, load_exported
+
+    if backend == "exported":
+        return load_exported(EXPORTED_MODEL_PATHS[zone]).predict_true_proba
+
+    from autogluon.tabular import TabularPredictor
+
+    paths = MODEL_PATHS[zone]
+    predictor = TabularPredictor.load(paths[0] if isinstance(paths, list) else paths, require_py_version_match=False)
+    try:
+        return compile_predictor(predictor).predict_true_proba
+    except UnsupportedModelError:
+        columns = [f"B{i + 1}" for i in range(WINDOW_SIZE)]
+        return lambda windows: predictor.predict_proba(
+            pd.DataFrame(DECODE_ALPHABET[windows], columns=columns), as_pandas=True
+        )["true"].to_numpy()
+
+
+def extracted_windows(zone, data_dir):
+    """
+    The zone's extracted training windows: the true examples and the negative sample.
+
+    Returns:
+        tuple: (uint8 windows (n, 550), labels (1 for true examples, 0 for counter examples))
+    """
+    job = JOBS[zone]
+    true_windows = frame_to_codes(read_zone_data(os.path.join(data_dir, job["true_file"]), WINDOW_SIZE))
+    counter_windows = [
+        frame_to_codes(read_zone_data(os.path.join(data_dir, path), WINDOW_SIZE))
+        for path in job["counter_files"].values()
+    ]
+    windows = np.concatenate([true_windows] + counter_windows)
+    labels = np.zeros(len(windows), dtype=np.int8)
+    labels[:len(true_windows)] = 1
+    return windows, labels
+
+
+def random_windows(rows, width=WINDOW_SIZE, seed=0):
+    """
+    Uniform random a/c/g/t windows covering the background a sliding scan mostly sees.
+    """
+    return np.random.default_rng(seed).integers(0, len(NUCLEOTIDES), size=(rows, width), dtype=np.uint8)
+
+
+def score_windows(teacher, windows, batch_size=50_000):
+    return np.concatenate([teacher(windows[i : i + batch_size]) for i in range(0, len(windows), batch_size)])
+
+
+def fit_student(windows, targets, l2=1e-4, max_iter=200, chunk_rows=4096):
+    """
+    Fits a logistic model on one-hot nucleotides to the teacher's probabilities (soft-label
+    cross-entropy with an L2 penalty, L-BFGS). The one-hot matrix is never built: logits are
+    gathered from the weight matrix and gradients accumulated with bincount, chunk by chunk.
+
+    Args:
+        windows (np.ndarray): uint8 windows (n, width)
+        targets (np.ndarray): Teacher probabilities of the 'true' class
+        l2 (float): Weight of the L2 penalty on the position weights
+        max_iter (int): Maximum number of L-BFGS iterations
+
+    Returns:
+        DistilledScorer
+    """
+    from scipy.optimize import minimize
+
+    n_rows, width = windows.shape
+    n_codes = UNKNOWN_CODE + 1
+    offsets = np.arange(width, dtype=np.intp) * n_codes
+    targets = np.clip(targets, 1e-6, 1 - 1e-6)
+
+    def loss_and_grad(params):
+        flat_weights, bias = params[:-1], params[-1]
+        loss, grad_weights, grad_bias = 0.0, np.zeros(width * n_codes), 0.0
+        for start in range(0, n_rows, chunk_rows):
+            index = windows[start : start + chunk_rows].astype(np.intp) + offsets
+            target = targets[start : start + chunk_rows]
+            logits = flat_weights[index].sum(axis=1) + bias
+            loss += np.sum(np.logaddexp(0.0, logits) - target * logits)
+            residual = 1.0 / (1.0 + np.exp(-logits)) - target
+            grad_weights += np.bincount(index.ravel(), weights=np.repeat(residual, width), minlength=width * n_codes)
+            grad_bias += residual.sum()
+        loss = loss / n_rows + l2 * np.dot(flat_weights, flat_weights)
+        grad = np.append(grad_weights / n_rows + 2 * l2 * flat_weights, grad_bias / n_rows)
+        return loss, grad
+
+    prior = float(np.mean(targets))
+    x0 = np.append(np.zeros(width * n_codes), np.log(prior / (1 - prior)))
+    result = minimize(loss_and_grad, x0, jac=True, method="L-BFGS-B", options={"maxiter": max_iter})
+    return DistilledScorer(result.x[:-1].reshape(width, n_codes), result.x[-1])
+
+
+def agreement(teacher_proba, student_proba, labels=None, threshold=0.5, top_fraction=0.01):
+    """
+    Compares student and teacher probabilities on the same windows.
+
+    Args:
+        labels (np.ndarray): Optional ground-truth labels (1/0) of the windows
+        threshold (float): Decision threshold of the 'percentage' method
+        top_fraction (float): Share of windows compared by rank, as the 'top_n' method does
+
+    Returns:
+        dict: Agreement metrics
+    """
+    from scipy.stats import pearsonr, spearmanr
+    from sklearn.metrics import f1_score
+
+    top_k = max(1, int(len(teacher_proba) * top_fraction))
+    teacher_top = set(np.argsort(-teacher_proba, kind="stable")[:top_k].tolist())
+    student_top = set(np.argsort(-student_proba, kind="stable")[:top_k].tolist())
+    report = {
+        "windows": len(teacher_proba),
+        "mean_abs_diff": float(np.mean(np.abs(teacher_proba - student_proba))),
+        "max_abs_diff": float(np.max(np.abs(teacher_proba - student_proba))),
+        "pearson": float(pearsonr(teacher_proba, student_proba)[0]),
+        "spearman": float(spearmanr(teacher_proba, student_proba)[0]),
+        "decision_agreement": float(np.mean((teacher_proba >= threshold) == (student_proba >= threshold))),
+        f"top_{top_fraction:g}_overlap": len(teacher_top & student_top) / top_k,
+    }
+    if labels is not None:
+        report["teacher_f1"] = float(f1_score(labels, teacher_proba >= threshold))
+        report["student_f1"] = float(f1_score(labels, student_proba >= threshold))
+    return report
+
+
+def distill(teacher, windows, labels=None, random_rows=50_000, holdout=0.2, l2=1e-4, max_iter=200, seed=0):
+    """
+    Scores the windows (plus random background windows) with the teacher, fits the student on
+    one part and reports its agreement with the teacher on the held-out rest.
+
+    Args:
+        teacher (callable): uint8 windows -> probability of the 'true' class
+        windows (np.ndarray): Extracted uint8 windows (n, width)
+        labels (np.ndarray): Optional labels of the extracted windows, for the f1 comparison
+
+    Returns:
+        tuple: (DistilledScorer, report dictionary)
+    """
+    width = windows.shape[1]
+    background = random_windows(random_rows, width, seed=seed)
+    all_windows = np.concatenate([windows, background])
+    is_extracted = np.arange(len(all_windows)) < len(windows)
+
+    start = time.perf_counter()
+    targets = score_windows(teacher, all_windows)
+    teacher_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    test = rng.random(len(all_windows)) < holdout
+    start = time.perf_counter()
+    student = fit_student(all_windows[~test], targets[~test], l2=l2, max_iter=max_iter)
+    fit_seconds = time.perf_counter() - start
+    student_proba = student.predict_true_proba(all_windows[test])
+
+    # Scan speed over one contiguous random sequence with as many window starts as were scored.
+    sequence = random_windows(1, len(all_windows) + width - 1, seed=seed + 1)[0]
+    start = time.perf_counter()
+    student.scan_true_proba(sequence)
+    scan_seconds = time.perf_counter() - start
+
+    extracted_test = test & is_extracted
+    report = {
+        "train_windows": int((~test).sum()),
+        "holdout": agreement(targets[test], student_proba),
+        "holdout_extracted": agreement(
+            targets[extracted_test],
+            student.predict_true_proba(all_windows[extracted_test]),
+            labels[extracted_test[:len(windows)]] if labels is not None else None,
+        ) if extracted_test.any() else None,
+        "teacher_windows_per_sec": len(all_windows) / teacher_seconds,
+        "student_scan_windows_per_sec": len(all_windows) / scan_seconds,
+        "fit_seconds": fit_seconds,
+        "l2": l2,
+    }
+    return student, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Distill the ZE/EZ models into position weight matrices for the 'distilled' serving backend."
+    )
+    parser.add_argument("--zones", default="ze,ez", help="Comma separated zones to distill (ze, ez).")
+    parser.add_argument("--teacher", choices=["autogluon", "exported"], default="autogluon",
+                        help="Teacher models: MODEL_PATHS or the exported LightGBM models.")
+    parser.add_argument("--data-dir", default=os.path.join(PROJECT_ROOT, "data"),
+                        help="Folder with the extracted zone CSVs used as distillation windows.")
+    parser.add_argument("--random-windows", type=int, default=50_000,
+                        help="Random background windows added to the extracted ones.")
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--max-iter", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for zone in [z.strip() for z in args.zones.split(",") if z.strip()]:
+        if zone not in DISTILLED_MODEL_PATHS:
+            raise SystemExit(f"Only ZE/EZ can be distilled, got '{zone}'")
+        windows, labels = extracted_windows(zone, args.data_dir)
+        student, report = distill(
+            load_teacher(zone, args.teacher), windows, labels,
+            random_rows=args.random_windows, holdout=args.holdout, l2=args.l2, max_iter=args.max_iter, seed=args.seed,
+        )
+        student.metadata = {"zone": zone, "teacher": args.teacher, **report}
+        student.save(DISTILLED_MODEL_PATHS[zone])
+
+        holdout = report["holdout"]
+        print(
+            f"{zone}: spearman {holdout['spearman']:.4f}, mean |diff| {holdout['mean_abs_diff']:.4f}, "
+            f"decisions agree {holdout['decision_agreement']:.2%} over {holdout['windows']} held-out windows; "
+            f"teacher {report['teacher_windows_per_sec']:.0f} windows/s, "
+            f"student scan {report['student_scan_windows_per_sec']:.0f} windows/s"
+        )
+        if report["holdout_extracted"] and "student_f1" in report["holdout_extracted"]:
+            extracted = report["holdout_extracted"]
+            print(f"{zone}: f1 on held-out extracted windows, teacher {extracted['teacher_f1']:.4f}, "
+                  f"student {extracted['student_f1']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
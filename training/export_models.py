@@ -0,0 +1,103 @@
+import argparse
+import os
+import sys
+import time
+
+# Make the project packages importable when running this file from training/.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from api.config import EXPORTED_MODEL_PATHS, MODEL_PATHS
+from api.fast_inference import UnsupportedModelError, compile_predictor, load_exported, verify_compiled
+
+
+def directory_size(path):
+    """
+    Total size in bytes of the files under a directory.
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def export_zone(zone, model_path, export_path, verify_rows=10000, tolerance=1e-6):
+    """
+    Exports the best model of one zone predictor to the lean serving format and verifies the
+    exported copy against the original predict_proba.
+
+    Args:
+        zone (str): Zone name ('ei', 'ie', 'ze', 'ez')
+        model_path (str): Path to the saved AutoGluon predictor
+        export_path (str): Output directory for the exported model
+        verify_rows (int): Number of random windows scored by both models
+        tolerance (float): Maximum accepted absolute probability difference
+
+    Returns:
+        dict: Export report for the zone
+    """
+    from autogluon.tabular import TabularPredictor
+
+    predictor = TabularPredictor.load(model_path, require_py_version_match=False)
+    compiled = compile_predictor(predictor, tolerance=tolerance)
+    compiled.save(export_path, metadata={
+        "zone": zone,
+        "source": os.path.abspath(model_path),
+        "model_best": predictor.model_best,
+    })
+
+    # Verify the copy that was written, not the in-memory one.
+    start = time.perf_counter()
+    exported = load_exported(export_path)
+    load_seconds = time.perf_counter() - start
+    max_error = verify_compiled(predictor, exported, rows=verify_rows, seed=1)
+    if max_error > tolerance:
+        raise UnsupportedModelError(
+            f"exported {zone} model differs from predict_proba by up to {max_error:.3g}"
+        )
+
+    return {
+        "zone": zone,
+        "model_best": predictor.model_best,
+        "boosters": len(exported.members),
+        "max_abs_diff": max_error,
+        "verify_rows": verify_rows,
+        "source_mb": directory_size(model_path) / 2**20,
+        "exported_mb": directory_size(export_path) / 2**20,
+        "load_seconds": load_seconds,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export the zone models to LightGBM text models for the 'exported' serving backend."
+    )
+    parser.add_argument("--zones", default=",".join(MODEL_PATHS),
+                        help="Comma separated zones to export.")
+    parser.add_argument("--verify-rows", type=int, default=10000)
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args(argv)
+
+    failed = []
+    for zone in [z.strip() for z in args.zones.split(",") if z.strip()]:
+        paths = MODEL_PATHS[zone]
+        model_path = paths[0] if isinstance(paths, list) else paths
+        try:
+            report = export_zone(zone, model_path, EXPORTED_MODEL_PATHS[zone], args.verify_rows, args.tolerance)
+        except UnsupportedModelError as e:
+            print(f"{zone}: not exported, {e}")
+            failed.append(zone)
+            continue
+        print(
+            f"{zone}: {report['model_best']} -> {report['boosters']} boosters, "
+            f"max |diff| {report['max_abs_diff']:.3g} over {report['verify_rows']} windows, "
+            f"{report['source_mb']:.1f} MiB -> {report['exported_mb']:.1f} MiB, "
+            f"loads in {report['load_seconds']:.2f}s"
+        )
+    if failed:
+        sys.exit(f"Zones not exported: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,476 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+# Make the project packages importable when running this file from training/.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from api.features import frame_to_codes, get_encoder, save_encoder
+from api.sequence import DECODE_ALPHABET
+
+# Every B column holds one nucleotide; reading it with a fixed categorical dtype stores one byte
+# per cell instead of a Python string, and keeps the categories identical across files.
+NUCLEOTIDE_DTYPE = pd.CategoricalDtype(categories=list(DECODE_ALPHABET))
+
+DEFAULT_PRESETS = ["optimize_for_deployment"]
+COMPLETE_FILE = "training_complete.json"
+SPEED_REPORT_FILE = "speed_report.json"
+# Rows of the synthetic batch every leaderboard model predicts to measure rows/sec. The batch has
+# the task's window width, i.e. 550 features for the ZE/EZ models.
+SPEED_BATCH_ROWS = 10_000
+
+# The training runs of training/model_generation.ipynb. Each counter file is trained as its own
+# predictor under models/<prefix>/<key>.
+JOBS = {
+    "ei": {
+        "prefix": "ei",
+        "true_file": "ei/data_ei.csv",
+        "counter_files": {"combined": "ei/data_ei_negative_sample.csv"},
+        "max_index": 12,
+        "time_limit": 21600,
+    },
+    "ie": {
+        "prefix": "ie",
+        "true_file": "ie/data_ie.csv",
+        "counter_files": {"combined": "ie/data_ie_negative_sample.csv"},
+        "max_index": 105,
+        "time_limit": 21000,
+    },
+    "ez": {
+        "prefix": "ez",
+        "true_file": "ez/data_ez.csv",
+        "counter_files": {"combined": "ez/data_ez_negative_sample.csv"},
+        "max_index": 550,
+        "time_limit": 21000,
+    },
+    "ze": {
+        "prefix": "ze",
+        "true_file": "ze/data_ze.csv",
+        "counter_files": {"combined": "ze/data_ze_negative_sample.csv"},
+        "max_index": 550,
+        "time_limit": 21000,
+    },
+    "ze-ez": {
+        "prefix": "ze-ez",
+        "true_file": "ze/data_ze.csv",
+        "counter_files": {"ZE-EZ": "ez/data_ez.csv"},
+        "max_index": 550,
+        "true_label": "ze",
+        "false_label": "ez",
+        "time_limit": 11000,
+    },
+    "ei-ie": {
+        "prefix": "ei-ie",
+        "true_file": "ei/data_ei.csv",
+        "counter_files": {"EI-IE": "ei/data_ie_true_counter_example.csv"},
+        "max_index": 12,
+        "true_label": "ei",
+        "false_label": "ie",
+        "time_limit": 11000,
+    },
+    "ie-ei": {
+        "prefix": "ie-ei",
+        "true_file": "ie/data_ie.csv",
+        "counter_files": {"IE-EI": "ie/data_ei_true_counter_example.csv"},
+        "max_index": 105,
+        "true_label": "ie",
+        "false_label": "ei",
+        "time_limit": 11000,
+    },
+}
+
+
+def read_zone_data(path, max_index):
+    """
+    Reads the B1..B<max_index> columns of an extracted zone CSV as categorical nucleotides.
+
+    Args:
+        path (str): CSV written by data_extraction
+        max_index (int): Number of B columns (window width)
+
+    Returns:
+        pd.DataFrame: Only the B columns, each with NUCLEOTIDE_DTYPE
+    """
+    cols = [f"B{i}" for i in range(1, max_index + 1)]
+    return pd.read_csv(path, usecols=cols, dtype={col: NUCLEOTIDE_DTYPE for col in cols})[cols]
+
+
+def prepare_data(true_data, counter_files, max_index, true_label="true", false_label="false"):
+    """
+    Combines the true examples with each counter-example set.
+
+    Args:
+        true_data (pd.DataFrame): True examples (B columns)
+        counter_files (dict): Key -> counter-example DataFrame (B columns)
+        max_index (int): Number of B columns
+        true_label (str): Label of the true examples
+        false_label (str): Label of the counter examples
+
+    Returns:
+        dict: Key -> labelled DataFrame with the B columns and 'label'
+    """
+    cols = [f"B{i}" for i in range(1, max_index + 1)]
+    true_data = true_data[cols].assign(label=true_label)
+
+    combined_data = {}
+    for key, df_counter in counter_files.items():
+        df_counter = df_counter[cols].assign(label=false_label)
+        combined_data[key] = pd.concat([true_data, df_counter], ignore_index=True)
+    return combined_data
+
+
+def speed_batch(max_index, rows=SPEED_BATCH_ROWS, seed=0):
+    """
+    Random nucleotide windows with the same columns and dtypes as the training data.
+
+    Args:
+        max_index (int): Number of B columns
+        rows (int): Number of windows
+        seed (int): Random seed, fixed so every model is timed on the same batch
+
+    Returns:
+        pd.DataFrame: rows x max_index categorical frame
+    """
+    codes = np.random.default_rng(seed).integers(0, 4, size=(rows, max_index))
+    return pd.DataFrame({
+        f"B{i + 1}": pd.Categorical.from_codes(codes[:, i], dtype=NUCLEOTIDE_DTYPE) for i in range(max_index)
+    })
+
+
+def measure_speed(predictor, models, batch, repeats=3):
+    """
+    Measures the bulk inference speed of each model on the same batch.
+
+    Models are persisted in memory first, as they are when serving, so the timings do not
+    include loading them from disk.
+
+    Args:
+        predictor (TabularPredictor): Trained predictor
+        models (list): Model names to time
+        batch (pd.DataFrame): Batch from speed_batch
+        repeats (int): Timed runs per model; the fastest one is kept
+
+    Returns:
+        dict: Model name -> rows per second
+    """
+    predictor.persist(models=models, max_memory=None)
+    speeds = {}
+    try:
+        for model in models:
+            predictor.predict_proba(batch.iloc[:100], model=model)  # Warm-up
+            seconds = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                predictor.predict_proba(batch, model=model)
+                seconds.append(time.perf_counter() - start)
+            speeds[model] = len(batch) / min(seconds)
+    finally:
+        predictor.unpersist()
+    return speeds
+
+
+def select_model(leaderboard, accuracy_tolerance):
+    """
+    Picks the fastest model whose validation score is within accuracy_tolerance of the best one.
+
+    The choice uses score_val, not score_test, so the held-out test split stays an unbiased
+    estimate of the selected model.
+
+    Args:
+        leaderboard (pd.DataFrame): Leaderboard with a rows_per_sec column
+        accuracy_tolerance (float): Accepted drop in validation f1
+
+    Returns:
+        str: Name of the selected model
+    """
+    candidates = leaderboard.dropna(subset=["rows_per_sec"])
+    eligible = candidates[candidates["score_val"] >= candidates["score_val"].max() - accuracy_tolerance]
+    return eligible.sort_values(["rows_per_sec", "score_val"], ascending=False)["model"].iloc[0]
+
+
+def expand_tasks(job_names, data_dir, models_dir, time_limit=None):
+    """
+    Expands the selected jobs into one training task per counter file.
+
+    Returns:
+        list: Task dictionaries, longest time limit first so the slow 550-column models start early
+    """
+    tasks = []
+    for name in job_names:
+        job = JOBS[name]
+        for key, counter_file in job["counter_files"].items():
+            tasks.append({
+                "name": f"{job['prefix']}/{key}",
+                "true_file": os.path.join(data_dir, job["true_file"]),
+                "counter_file": os.path.join(data_dir, counter_file),
+                "key": key,
+                "max_index": job["max_index"],
+                "true_label": job.get("true_label", "true"),
+                "false_label": job.get("false_label", "false"),
+                "time_limit": time_limit or job["time_limit"],
+                "output_folder": os.path.join(models_dir, job["prefix"], key),
+                "results_folder": os.path.join(models_dir, job["prefix"], "results"),
+            })
+    return sorted(tasks, key=lambda task: -task["time_limit"])
+
+
+def is_complete(task):
+    return os.path.exists(os.path.join(task["output_folder"], COMPLETE_FILE))
+
+
+def encode_frame(df, encoder):
+    """
+    Replaces the categorical B columns of a frame by the encoder's features (other columns,
+    such as 'label', are kept).
+
+    Args:
+        df (pd.DataFrame): Frame with B1..Bn columns from read_zone_data
+        encoder (FeatureEncoder): Encoder from api.features, or None to keep the B columns
+
+    Returns:
+        pd.DataFrame
+    """
+    if encoder is None:
+        return df
+    b_cols = [col for col in df.columns if col.startswith("B")]
+    features = encoder.frame(encoder.encode(frame_to_codes(df[b_cols])), len(b_cols))
+    features.index = df.index
+    return pd.concat([features, df.drop(columns=b_cols)], axis=1)
+
+
+def train_task(task, num_cpus, presets, infer_limit=None, infer_limit_batch_size=None, accuracy_tolerance=None,
+               features=None):
+    """
+    Trains and evaluates one predictor. Runs in a worker process of run_pipeline.
+
+    Every leaderboard model is timed on a speed_batch and the results are saved next to the
+    predictor (speed_report.json). With accuracy_tolerance, the fastest model within the
+    tolerance replaces AutoGluon's choice as the predictor's best model.
+
+    The completion marker is written last, so a task interrupted at any point is retrained
+    from scratch on the next run while completed tasks are skipped.
+
+    Args:
+        task (dict): Task from expand_tasks
+        num_cpus (int): CPU quota of this task
+        presets (list): AutoGluon presets
+        infer_limit (float): Inference time budget in seconds per row, enforced during fit
+        infer_limit_batch_size (int): Batch size the infer_limit applies to
+        accuracy_tolerance (float): Accepted drop in validation f1 for a faster model
+        features (str): Feature encoder spec (api.features.get_encoder), None for the B columns
+
+    Returns:
+        dict: Training report, also stored in the completion marker
+    """
+    from autogluon.tabular import TabularPredictor
+    from autogluon.tabular.configs.presets_configs import tabular_presets_dict
+    from sklearn.model_selection import train_test_split
+
+    started = time.time()
+    encoder = get_encoder(features) if features else None
+    output_folder = task["output_folder"]
+    if os.path.exists(output_folder):
+        # Leftover of an interrupted run
+        shutil.rmtree(output_folder)
+    os.makedirs(output_folder)
+
+    true_data = read_zone_data(task["true_file"], task["max_index"])
+    counter_data = read_zone_data(task["counter_file"], task["max_index"])
+    df = prepare_data(
+        true_data, {task["key"]: counter_data}, task["max_index"], task["true_label"], task["false_label"]
+    )[task["key"]]
+
+    # Split data into features and label; train-test split: 70% train, 30% test.
+    feature_cols = [f"B{i}" for i in range(1, task["max_index"] + 1)]
+    X_train, X_test, y_train, y_test = train_test_split(df[feature_cols], df["label"], test_size=0.3, random_state=42)
+    train_data = encode_frame(pd.concat([X_train, y_train], axis=1), encoder)
+    test_data = encode_frame(pd.concat([X_test, y_test], axis=1), encoder)
+
+    # Keep every model until the speed measurements are done; the presets' keep_only_best is
+    # applied afterwards to the selected model.
+    keep_only_best = any(tabular_presets_dict.get(preset, {}).get("keep_only_best") for preset in presets)
+    predictor = TabularPredictor(label="label", path=output_folder, eval_metric="f1").fit(
+        train_data,
+        presets=presets,
+        time_limit=task["time_limit"],
+        num_cpus=num_cpus,
+        num_gpus=0,
+        infer_limit=infer_limit,
+        infer_limit_batch_size=infer_limit_batch_size,
+        keep_only_best=False,
+    )
+
+    leaderboard = predictor.leaderboard(test_data, silent=True)
+    inferable = leaderboard.loc[leaderboard["can_infer"], "model"].tolist()
+    speeds = measure_speed(predictor, inferable, encode_frame(speed_batch(task["max_index"]), encoder))
+    leaderboard["rows_per_sec"] = leaderboard["model"].map(speeds)
+
+    autogluon_best = predictor.model_best
+    selected = autogluon_best if accuracy_tolerance is None else select_model(leaderboard, accuracy_tolerance)
+    if selected != autogluon_best:
+        predictor.set_model_best(selected, save_trainer=True)
+    if keep_only_best:
+        predictor.delete_models(models_to_keep=[selected], dry_run=False)
+        predictor.save_space()
+    if encoder is not None:
+        # Read by GeneticZoneEvaluator to build the same features at inference.
+        save_encoder(encoder, output_folder)
+
+    os.makedirs(task["results_folder"], exist_ok=True)
+    leaderboard_path = os.path.join(task["results_folder"], f"{task['key']}_leaderboard.csv")
+    leaderboard.to_csv(leaderboard_path, index=False)
+
+    selected_row = leaderboard.set_index("model").loc[selected]
+    speed_report = {
+        "selected": selected,
+        "autogluon_best": autogluon_best,
+        "accuracy_tolerance": accuracy_tolerance,
+        "infer_limit": infer_limit,
+        "infer_limit_batch_size": infer_limit_batch_size,
+        "batch": {"rows": SPEED_BATCH_ROWS, "width": task["max_index"], "features": len(train_data.columns) - 1},
+        "feature_encoder": encoder.spec() if encoder is not None else None,
+        "num_cpus": num_cpus,
+        "models": [
+            {
+                "model": row["model"],
+                "score_val": float(row["score_val"]),
+                "score_test": float(row["score_test"]),
+                "rows_per_sec": None if pd.isna(row["rows_per_sec"]) else float(row["rows_per_sec"]),
+            }
+            for _, row in leaderboard.iterrows()
+        ],
+    }
+    with open(os.path.join(output_folder, SPEED_REPORT_FILE), "w") as f:
+        json.dump(speed_report, f, indent=2)
+
+    report = {
+        "task": task["name"],
+        "model_best": selected,
+        "score_test": float(selected_row["score_test"]),
+        "rows_per_sec": float(selected_row["rows_per_sec"]),
+        "train_rows": len(train_data),
+        "test_rows": len(test_data),
+        "num_cpus": num_cpus,
+        "presets": presets,
+        "feature_encoder": encoder.spec() if encoder is not None else None,
+        "time_limit": task["time_limit"],
+        "seconds": time.time() - started,
+        "leaderboard": os.path.relpath(leaderboard_path, PROJECT_ROOT),
+    }
+    with open(os.path.join(output_folder, COMPLETE_FILE), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def run_pipeline(tasks, parallel_jobs, cpus_per_job, presets, **fit_options):
+    """
+    Trains the pending tasks concurrently, each in its own process with a fixed CPU quota.
+
+    Args:
+        fit_options: infer_limit, infer_limit_batch_size, accuracy_tolerance and features of train_task
+
+    Returns:
+        list: Names of the tasks that failed
+    """
+    pending = [task for task in tasks if not is_complete(task)]
+    for task in tasks:
+        if is_complete(task):
+            print(f"{task['name']}: already trained, skipping.")
+    if not pending:
+        return []
+
+    print(f"Training {len(pending)} model(s), {parallel_jobs} at a time with {cpus_per_job} CPU(s) each.")
+    failed = []
+    # 'spawn' gives every task a clean interpreter (no inherited OpenMP/Ray state).
+    with ProcessPoolExecutor(max_workers=parallel_jobs, mp_context=get_context("spawn")) as executor:
+        futures = {executor.submit(train_task, task, cpus_per_job, presets, **fit_options): task for task in pending}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                print(f"{task['name']}: failed, {e!r}")
+                failed.append(task["name"])
+                continue
+            print(
+                f"{report['task']}: {report['model_best']} f1 {report['score_test']:.4f}, "
+                f"{report['rows_per_sec']:.0f} rows/s, trained in {report['seconds'] / 60:.1f} min"
+            )
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Train the zone models of model_generation.ipynb concurrently on CPUs, resuming interrupted runs."
+    )
+    parser.add_argument("--jobs", default=",".join(JOBS),
+                        help=f"Comma separated jobs to train ({', '.join(JOBS)}).")
+    parser.add_argument("--parallel", type=int, default=None,
+                        help="Number of models trained at the same time (default: number of pending tasks, at most the CPU count).")
+    parser.add_argument("--cpus-per-job", type=int, default=None,
+                        help="CPU quota of each training process (default: CPU count / parallel).")
+    parser.add_argument("--time-limit", type=int, default=None,
+                        help="Seconds per model, overriding the notebook's per-zone limits.")
+    parser.add_argument("--presets", default=",".join(DEFAULT_PRESETS))
+    parser.add_argument("--infer-limit", type=float, default=None,
+                        help="Inference budget in seconds per row; AutoGluon skips models that predict slower.")
+    parser.add_argument("--infer-limit-batch-size", type=int, default=None,
+                        help="Batch size the --infer-limit applies to (AutoGluon's default: 10000).")
+    parser.add_argument("--accuracy-tolerance", type=float, default=None,
+                        help="Select the fastest model whose validation f1 is at most this much below the best "
+                             "(default: keep AutoGluon's best model).")
+    parser.add_argument("--features", default=None,
+                        help="Feature encoder replacing the B1..Bn columns, e.g. 'kmer:k=3+gc:size=50' "
+                             "(see api/features.py). The API builds the same features at inference.")
+    parser.add_argument("--data-dir", default=os.path.join(PROJECT_ROOT, "data"))
+    parser.add_argument("--models-dir", default=os.path.join(PROJECT_ROOT, "models"))
+    parser.add_argument("--restart", action="store_true",
+                        help="Retrain every selected job, ignoring completion markers.")
+    args = parser.parse_args(argv)
+
+    job_names = [name.strip() for name in args.jobs.split(",") if name.strip()]
+    unknown = set(job_names) - set(JOBS)
+    if unknown:
+        raise SystemExit(f"Unknown jobs: {', '.join(sorted(unknown))}")
+
+    if args.features:
+        try:
+            get_encoder(args.features)
+        except ValueError as e:
+            raise SystemExit(str(e))
+
+    tasks = expand_tasks(job_names, args.data_dir, args.models_dir, args.time_limit)
+    if args.restart:
+        for task in tasks:
+            marker = os.path.join(task["output_folder"], COMPLETE_FILE)
+            if os.path.exists(marker):
+                os.remove(marker)
+
+    cpus = os.cpu_count() or 1
+    pending = sum(not is_complete(task) for task in tasks)
+    parallel = args.parallel or max(1, min(pending, cpus))
+    cpus_per_job = args.cpus_per_job or max(1, cpus // parallel)
+
+    failed = run_pipeline(
+        tasks, parallel, cpus_per_job, [p.strip() for p in args.presets.split(",") if p.strip()],
+        infer_limit=args.infer_limit,
+        infer_limit_batch_size=args.infer_limit_batch_size,
+        accuracy_tolerance=args.accuracy_tolerance,
+        features=args.features,
+    )
+    if failed:
+        sys.exit(f"Failed: {', '.join(failed)}. Run again to retry them; completed models are kept.")
+
+
+if __name__ == "__main__":
+    main()